@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Microbenchmark of the assertion success path.
+
+Compares AssertionMixin with a variant reporting success the way it was done
+before, i.e. by walking the whole stack with inspect.stack() and formatting
+the log message eagerly. Run from the repository root:
+
+    python -m benchmarks.bench_assertions
+'''
+
+import inspect
+import logging
+import timeit
+from testing_selenium_extras.assertions import AssertionMixin, LEVEL_ASSERT_SUCCEEDED, logger
+
+NUMBER = 2000
+
+
+class StubDriver(object):
+    title = 'Stack Overflow'
+    current_url = 'http://stackoverflow.com/#questions'
+
+
+class StackInspectingMixin(AssertionMixin):
+    def _success(self, params, caller=None):
+        caller_method_name = inspect.stack()[1][3]
+        logger.log(LEVEL_ASSERT_SUCCEEDED, 'Assertion {0} succeeded {1}'.format(caller_method_name, params))
+
+
+def run(assertions, driver):
+    assertions.assert_document_title_equal(driver, 'Stack Overflow')
+    assertions.assert_urlhash_matches(driver, r'quest')
+
+
+def bench(label, assertions, driver):
+    seconds = timeit.timeit(lambda: run(assertions, driver), number=NUMBER)
+    print('{0:<40} {1:8.2f} us/assertion'.format(label, seconds / (2 * NUMBER) * 1e6))
+    return seconds
+
+
+if __name__ == '__main__':
+    driver = StubDriver()
+    for level, label in [(logging.ERROR, 'success not logged'), (LEVEL_ASSERT_SUCCEEDED, 'success logged')]:
+        logger.setLevel(level)
+        logger.addHandler(logging.NullHandler())
+        before = bench('inspect.stack(), ' + label, StackInspectingMixin(), driver)
+        after = bench('frame lookup, ' + label, AssertionMixin(), driver)
+        print('{0:<40} {1:8.1f}x'.format('speedup', before / after))
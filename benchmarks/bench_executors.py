@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Wall time, TCP connections and response bytes of Selenium's default remote connection
+compared with PooledRemoteConnection, against FakeWebDriverServer on localhost.
+Run from the repository root:
+
+    python -m benchmarks.bench_executors [number of iterations]
+
+Localhost connections are cheap, so connection counts and transferred bytes say more about
+a remote grid than the wall times do.
+'''
+
+import logging
+import sys
+from timeit import default_timer
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+from testing_selenium_extras.executors import PooledRemoteConnection
+from testing_selenium_extras.fake import FakeWebDriverServer
+from testing_selenium_extras.page_objects import PageObject, PageElement, PageElements
+
+URL = 'http://example.com/'
+
+HTML = '<html><head><title>Benchmark</title></head><body><h1 id="title">Rows</h1>{0}</body></html>'.format(
+    ''.join('<p class="row" data-rect="0,{0},100,20">Row {1}</p>'.format(i * 20, i) for i in range(2000)))
+
+
+class BenchmarkPage(PageObject):
+    title = PageElement('#title')
+    rows = PageElements('.row')
+
+
+def scenario(driver):
+    driver.get(URL)
+    page = BenchmarkPage.load(driver, batched=True)
+    page.title.text
+    page.rows.extract(properties=('text', 'rect'))
+    driver.page_source
+    driver.get_screenshot_as_base64()
+
+
+EXECUTORS = [
+    ('RemoteConnection', lambda url: RemoteConnection(url, resolve_ip=False)),
+    ('RemoteConnection keep-alive', lambda url: RemoteConnection(url, keep_alive=True, resolve_ip=False)),
+    ('PooledRemoteConnection no gzip', lambda url: PooledRemoteConnection(url, compress=False)),
+    ('PooledRemoteConnection', lambda url: PooledRemoteConnection(url)),
+]
+
+
+def run(iterations):
+    # Selenium 3 passes its default timeout sentinel to urllib3, which newer urllib3 rejects
+    RemoteConnection.set_timeout(300)
+    results = []
+    with FakeWebDriverServer({URL: HTML}) as server:
+        for name, factory in EXECUTORS:
+            connections = server.connections
+            driver = WebDriver(factory(server.url), desired_capabilities={})
+            bytes_sent = server.bytes_sent
+            started = default_timer()
+            for _ in range(iterations):
+                scenario(driver)
+            elapsed = default_timer() - started
+            results.append((name, elapsed / iterations, server.connections - connections,
+                            (server.bytes_sent - bytes_sent) // iterations))
+            driver.quit()
+    RemoteConnection.reset_timeout()
+    return results
+
+
+if __name__ == '__main__':
+    logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print('{0:<32} {1:>10} {2:>12} {3:>14}'.format('executor', 'wall [ms]', 'connections', 'bytes/iter'))
+    for name, seconds, connections, size in run(iterations):
+        print('{0:<32} {1:>10.1f} {2:>12} {3:>14}'.format(name, seconds * 1000, connections, size))
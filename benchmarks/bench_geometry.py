@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Benchmark of layout overlap detection.
+
+Compares the sweep-line overlap detection of the geometry module with checking
+all pairs of rectangles in pure Python, for page-like layouts of increasing size
+(rows of boxes with a few overlapping ones). Run from the repository root:
+
+    python -m benchmarks.bench_geometry
+'''
+
+import random
+import timeit
+from testing_selenium_extras import geometry
+
+SIZES = (100, 500, 2000)
+NUMBER = 3
+
+
+def make_layout(count, seed=1):
+    generator = random.Random(seed)
+    rects = []
+    for index in range(count):
+        row, column = divmod(index, 10)
+        rects.append([column * 100 + generator.randint(0, 15), row * 40 + generator.randint(0, 10),
+                      90, 30])
+    return rects
+
+
+def pairwise_overlaps(rects):
+    result = []
+    for i in range(len(rects)):
+        x1, y1, w1, h1 = rects[i]
+        for j in range(i + 1, len(rects)):
+            x2, y2, w2, h2 = rects[j]
+            if min(x1 + w1, x2 + w2) > max(x1, x2) and min(y1 + h1, y2 + h2) > max(y1, y2):
+                result.append((i, j))
+    return result
+
+
+if __name__ == '__main__':
+    for size in SIZES:
+        rects = make_layout(size)
+        assert geometry.find_overlaps(rects, epsilon=0) == pairwise_overlaps(rects)
+        before = timeit.timeit(lambda: pairwise_overlaps(rects), number=NUMBER) / NUMBER
+        after = timeit.timeit(lambda: geometry.find_overlaps(rects), number=NUMBER) / NUMBER
+        print('{0:>5} rects: pairwise {1:8.2f} ms, sweep line {2:8.2f} ms, {3:6.1f}x'.format(
+            size, before * 1e3, after * 1e3, before / after))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Round-trip counts and wall time of page object loads, element assertions and wait
+conditions, measured with the fake driver simulating a fixed per-command latency.
+Run from the repository root:
+
+    python -m benchmarks.bench_round_trips [latency in milliseconds]
+'''
+
+import logging
+import sys
+from timeit import default_timer
+from testing_selenium_extras import waits
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement
+
+URL = 'http://example.com/'
+
+# number of components on the page and of elements in each of them
+COMPONENTS = 8
+ELEMENTS = 5
+
+
+def build_html():
+    sections = []
+    for component in range(COMPONENTS):
+        items = ''.join(
+            '<a class="item-{0}" href="#" style="color: red" data-rect="0,{1},100,20">Item {0}</a>'.format(
+                element, element * 20)
+            for element in range(ELEMENTS))
+        sections.append('<section id="section-{0}">{1}</section>'.format(component, items))
+    return '<html><head><title>Benchmark</title></head><body>{0}</body></html>'.format(''.join(sections))
+
+
+def build_page_class():
+    section_class = type('Section', (PageComponent,), dict(
+        ('item_{0}'.format(element), PageElement('.item-{0}'.format(element))) for element in range(ELEMENTS)))
+    return type('BenchmarkPage', (PageObject,), dict(
+        ('section_{0}'.format(component), section_class('#section-{0}'.format(component)))
+        for component in range(COMPONENTS)))
+
+
+BenchmarkPage = build_page_class()
+
+
+def load_sequential(driver):
+    BenchmarkPage.load(driver)
+
+
+def load_batched(driver):
+    BenchmarkPage.load(driver, batched=True)
+
+
+def repeated_access(driver):
+    page = BenchmarkPage(driver)
+    for _ in range(5):
+        page.section_0.item_0
+
+
+def repeated_access_cached(driver):
+    page = BenchmarkPage(driver, cache_elements=True)
+    for _ in range(5):
+        page.section_0.item_0
+
+
+def element_assertions(driver):
+    assertions = AssertionMixin()
+    element = BenchmarkPage(driver).section_0.item_0
+    assertions.assert_element_visible(element)
+    assertions.assert_element_enabled(element)
+    assertions.assert_element_text_equal(element, 'Item 0')
+    assertions.assert_element_tag_name_equal(element, 'a')
+    assertions.assert_element_css_class_contains(element, 'item-0')
+    assertions.assert_element_css_property_equal(element, 'color', 'red')
+    assertions.assert_element_rect_includes_point(element, (10, 10))
+
+
+def element_assertions_snapshot(driver):
+    assertions = AssertionMixin()
+    element = BenchmarkPage(driver).section_0.item_0
+    assertions.assert_element_properties_equal(
+        element, dict(displayed=True, enabled=True, text='Item 0', tag_name='a',
+                      rect=dict(x=0, y=0, width=100, height=20)),
+        attributes={'class': 'item-0'}, css_properties={'color': 'red'})
+
+
+def wait_conditions(driver):
+    waits.ajax_call_is_pending()(driver)
+    waits.animation_is_running()(driver)
+
+
+SCENARIOS = [
+    load_sequential,
+    load_batched,
+    repeated_access,
+    repeated_access_cached,
+    element_assertions,
+    element_assertions_snapshot,
+    wait_conditions,
+]
+
+
+def run(latency):
+    driver = create_fake_driver({URL: build_html()}, latency=latency)
+    executor = driver.command_executor
+    results = []
+    for scenario in SCENARIOS:
+        executor.navigate(URL)
+        executor.reset_counts()
+        started = default_timer()
+        scenario(driver)
+        results.append((scenario.__name__, executor.round_trips, default_timer() - started))
+    return results
+
+
+if __name__ == '__main__':
+    logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.005
+    print('{0:<32} {1:>11} {2:>10}'.format('scenario', 'round-trips', 'wall [ms]'))
+    for name, round_trips, seconds in run(latency):
+        print('{0:<32} {1:>11} {2:>10.1f}'.format(name, round_trips, seconds * 1000))
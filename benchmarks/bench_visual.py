@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Benchmark of visual checks of page components, end to end.
+
+A fake driver returns browser-like screenshots of a 1280x800 page: RGB, with every
+scanline filtered by up or Paeth, as browsers mostly choose. Each check takes a screenshot,
+decodes it and compares the component with its baseline, in three ways:
+
+- naively, decoding the whole screenshot of the page and the baseline and diffing all pixels
+- with visual.capture() and BaselineStore.compare() on a driver without element
+  screenshots, decoding the page screenshot only up to the component and skipping
+  unchanged tiles by their hashes
+- the same with element screenshots, cropped by the browser; the fake driver returns
+  them precomputed, as the time the browser takes is not the client's
+
+Run from the repository root:
+
+    python -m benchmarks.bench_visual
+'''
+
+import base64
+import logging
+import shutil
+import tempfile
+import timeit
+import numpy as np
+from testing_selenium_extras import images, visual
+from testing_selenium_extras.fake import create_fake_driver
+
+URL = 'http://example.com/'
+
+# component selectors and their boxes on the page
+COMPONENTS = [
+    ('header', (0, 0, 1280, 70)),
+    ('card', (900, 200, 300, 400)),
+    ('page', (0, 0, 1280, 800)),
+]
+
+NUMBER = 5
+
+
+def make_page(height=800, width=1280, seed=1):
+    # flat background with noisy widgets, compressing like a rendered page
+    generator = np.random.RandomState(seed)
+    image = np.full((height, width, 3), 245, dtype=np.uint8)
+    for _ in range(40):
+        y, x = generator.randint(0, height - 40), generator.randint(0, width - 120)
+        image[y:y + 40, x:x + 120] = generator.randint(0, 256, size=(40, 120, 3))
+    return image
+
+
+def make_screenshot(image, seed=2):
+    filters = np.random.RandomState(seed).choice([2, 4], size=image.shape[0])
+    return images.encode_png(image, filter_type=filters)
+
+
+def naive_check(driver, element, baseline_path):
+    rect = element.rect
+    screenshot = images.decode_png(driver.get_screenshot_as_png())
+    actual = images.crop(screenshot, (rect['x'], rect['y'], rect['width'], rect['height']))
+    with open(baseline_path, 'rb') as fp:
+        expected = images.decode_png(fp.read())
+    return (np.abs(actual.astype(np.int16) - expected).max(axis=-1) > visual.PIXEL_TOLERANCE).mean()
+
+
+def visual_check(store, element, name):
+    return store.compare(name, visual.capture(element), record=False)
+
+
+def element_screenshots(image, elements):
+    '''
+    Returns handler of the element screenshot command answering with crops of the image.
+    '''
+    screenshots = dict(
+        (element.id, base64.b64encode(make_screenshot(images.crop(image, box))).decode('ascii'))
+        for element, box in elements)
+    return lambda params: screenshots[params['id']]
+
+
+if __name__ == '__main__':
+    logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+    html = '<html><body>{0}</body></html>'.format(''.join(
+        '<div id="{0}" data-rect="{1}"></div>'.format(name, ','.join(map(str, box)))
+        for name, box in COMPONENTS))
+    driver = create_fake_driver({URL: html})
+    driver.get(URL)
+    executor = driver.command_executor
+    elements = [(driver.find_element_by_id(name), box) for name, box in COMPONENTS]
+    page = make_page()
+    changed = page.copy()
+    changed[210:220, 910:940] = 0
+    directory = tempfile.mkdtemp()
+    try:
+        store = visual.BaselineStore(directory)
+        for label, image in (('unchanged', page), ('changed', changed)):
+            executor.screenshot = make_screenshot(image)
+            for (element, box), (name, _) in zip(elements, COMPONENTS):
+                if label == 'unchanged':
+                    store.save(name, images.crop(page, box))
+                naive = timeit.timeit(lambda: naive_check(driver, element, store.path(name)), number=NUMBER)
+                visual._page_screenshot_drivers.add(driver)
+                cropped = timeit.timeit(lambda: visual_check(store, element, name), number=NUMBER)
+                visual._page_screenshot_drivers.discard(driver)
+                executor._command_elementScreenshot = element_screenshots(image, elements)
+                element_screenshot = timeit.timeit(lambda: visual_check(store, element, name), number=NUMBER)
+                del executor._command_elementScreenshot
+                print('{0:>7} {1:>9}: naive {2:7.1f} ms, page screenshot {3:7.1f} ms, '
+                      'element screenshot {4:7.1f} ms'.format(
+                          name, label, naive * 1e3 / NUMBER, cropped * 1e3 / NUMBER,
+                          element_screenshot * 1e3 / NUMBER))
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,655 @@
+# -*- coding: utf-8 -*-
+
+'''
+asyncio front-end: page objects and assertions driving many sessions from one event loop.
+
+Commands are sent by AsyncCommandExecutor, a non-blocking HTTP/1.1 client keeping
+connections to the WebDriver server alive, so a single thread can keep dozens of
+sessions busy instead of dedicating a thread (and a blocking connection) to each:
+
+    class HomePage(AsyncPageObject):
+        logo = PageElement('.logo')
+
+    class HomePageTest(AsyncAssertionMixin):
+        async def check(self, executor):
+            driver = await AsyncWebDriver.start(executor)
+            try:
+                await driver.get('https://example.com/')
+                page = await HomePage.load(driver, batched=True)
+                await self.assert_element_visible(await page.logo)
+            finally:
+                await driver.quit()
+
+    executor = AsyncCommandExecutor('http://localhost:4444/wd/hub')
+    loop.run_until_complete(asyncio.gather(*[test.check(executor) for _ in range(20)]))
+
+Page objects are declared with the usual descriptors; accessing an element descriptor of
+an AsyncPageObject returns an awaitable. Element state is read by the scripts used by
+ElementSnapshot, which work the same with the JSON wire and W3C protocols.
+
+Requires Python 3.5 or newer.
+'''
+
+import asyncio
+import json
+import logging
+import string
+import time
+from six.moves.urllib.parse import urlparse
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from .assertions import AssertionMixin
+from .page_objects import (
+    LOAD_POLL_FREQUENCY, LOAD_TIMEOUT, PageComponent, PageElement, PageObject, _COLLECTION_CHUNK_SCRIPT,
+    _FIND_SCRIPT, _LOAD_PROBE_SCRIPT, _get_load_probe)
+from .snapshot import (
+    PROPERTIES, ElementSnapshot, _SNAPSHOT_SCRIPT, _check_properties, _selector_chain, take_columns)
+
+logger = logging.getLogger(__name__)
+
+
+# default maximum number of connections kept open to the WebDriver server
+MAX_CONNECTIONS = 32
+
+# keys of element references in the JSON wire and W3C protocols
+_ELEMENT_KEY = 'ELEMENT'
+_W3C_ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+
+class _NoResponse(ConnectionError):
+    '''
+    Raised when the connection is closed before any part of the response was read, e.g. when
+    the server has closed an idle keep-alive connection.
+    '''
+
+
+class _Connection(object):
+    '''
+    HTTP/1.1 connection to the WebDriver server.
+    '''
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+    async def request(self, method, host, path, body):
+        '''
+        Sends a request and reads the response.
+
+        :return: (HTTP status, response body, whether the connection can be reused)
+        '''
+        head = '{0} {1} HTTP/1.1\r\nHost: {2}\r\nAccept: application/json\r\n' \
+               'Content-Type: application/json;charset=UTF-8\r\nContent-Length: {3}\r\n' \
+               'Connection: keep-alive\r\n\r\n'.format(method, path, host, len(body))
+        try:
+            self.writer.write(head.encode('latin-1') + body)
+            await self.writer.drain()
+            status_line = await self.reader.readline()
+        except ConnectionError as error:
+            raise _NoResponse('Connection closed by the WebDriver server: {0}'.format(error))
+        if not status_line:
+            raise _NoResponse('Connection closed by the WebDriver server')
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if not size:
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            keep_alive = False
+        return int(status), body, keep_alive
+
+
+class AsyncCommandExecutor(object):
+    '''
+    Non-blocking counterpart of Selenium's RemoteConnection.
+
+    Commands are mapped to HTTP requests with the command table of RemoteConnection and
+    sent over a pool of keep-alive connections, at most max_connections of them at a time.
+    One executor can be shared by all sessions talking to the same server.
+    '''
+
+    def __init__(self, remote_server_addr, max_connections=MAX_CONNECTIONS, timeout=None):
+        '''
+        :param remote_server_addr: URL of the WebDriver server, e.g. http://localhost:4444/wd/hub
+        :param max_connections: maximum number of connections open at the same time
+        :param timeout: number of seconds a command may take, None for no limit
+        '''
+        parsed = urlparse(remote_server_addr)
+        if parsed.scheme != 'http':
+            raise ValueError('Only http:// WebDriver servers are supported')
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path.rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.w3c = False
+        self._commands = RemoteConnection(remote_server_addr, resolve_ip=False)._commands
+        self._idle = []
+        self._slots = None
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return _Connection(reader, writer)
+
+    async def _request(self, method, path, body):
+        if self._slots is None:
+            # created lazily, in the event loop the executor is used in
+            self._slots = asyncio.Semaphore(self.max_connections)
+        host = '{0}:{1}'.format(self.host, self.port)
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                try:
+                    status, data, keep_alive = await connection.request(method, host, path, body)
+                except _NoResponse:
+                    if not connection.reused:
+                        raise
+                    # the server closed the idle connection before answering; errors after a
+                    # part of the response was read are not retried, the command may have run
+                    connection.close()
+                    connection = await self._connect()
+                    status, data, keep_alive = await connection.request(method, host, path, body)
+            except BaseException:
+                connection.close()
+                raise
+            if keep_alive:
+                connection.reused = True
+                self._idle.append(connection)
+            else:
+                connection.close()
+        return status, data
+
+    async def execute(self, command, params):
+        '''
+        Sends the command to the server, returning the decoded response like RemoteConnection.
+        '''
+        method, template = self._commands[command]
+        path = self.path + string.Template(template).substitute(params)
+        if self.w3c and 'sessionId' in params:
+            params = dict(params)
+            del params['sessionId']
+        body = json.dumps(params).encode('utf-8')
+        request = self._request(method, path, body)
+        if self.timeout is not None:
+            request = asyncio.wait_for(request, self.timeout)
+        status, data = await request
+        data = data.decode('utf-8')
+        try:
+            response = json.loads(data) if data else None
+        except ValueError:
+            if 299 < status < 600:
+                return dict(status=status, value=data)
+            raise
+        if not isinstance(response, dict) or 'value' not in response:
+            response = dict(status=0, value=response)
+        return response
+
+    def close(self):
+        '''
+        Closes all idle connections.
+        '''
+        while self._idle:
+            self._idle.pop().close()
+
+
+def _find_params(by, value, w3c):
+    '''
+    Returns parameters of element lookup commands, translating strategies W3C lacks to CSS.
+    '''
+    if w3c:
+        if by == By.ID:
+            by, value = By.CSS_SELECTOR, '[id="{0}"]'.format(value)
+        elif by == By.TAG_NAME:
+            by = By.CSS_SELECTOR
+        elif by == By.CLASS_NAME:
+            by, value = By.CSS_SELECTOR, '.' + value
+        elif by == By.NAME:
+            by, value = By.CSS_SELECTOR, '[name="{0}"]'.format(value)
+    return dict(using=by, value=value)
+
+
+class AsyncWebDriver(object):
+    '''
+    WebDriver session driven by coroutines.
+
+    Only the commands used by page objects and assertions are provided; any other command
+    can be sent with execute().
+    '''
+
+    def __init__(self, executor, session_id, capabilities, w3c=False):
+        self.command_executor = executor
+        self.session_id = session_id
+        self.capabilities = capabilities
+        self.w3c = w3c
+        self.error_handler = ErrorHandler()
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.session_id)
+
+    @classmethod
+    async def start(cls, executor, desired_capabilities=None):
+        '''
+        Starts a new session.
+
+        :param executor: AsyncCommandExecutor, or URL of the WebDriver server
+        :param desired_capabilities: dictionary of desired capabilities
+        :return: AsyncWebDriver
+        '''
+        if not isinstance(executor, AsyncCommandExecutor):
+            executor = AsyncCommandExecutor(executor)
+        capabilities = dict(desired_capabilities or {})
+        response = await executor.execute(Command.NEW_SESSION, dict(
+            capabilities=dict(firstMatch=[{}], alwaysMatch=capabilities),
+            desiredCapabilities=capabilities))
+        ErrorHandler().check_response(response)
+        if 'sessionId' in response:
+            return cls(executor, response['sessionId'], response['value'], w3c=False)
+        value = response['value']
+        executor.w3c = True
+        return cls(executor, value['sessionId'], value.get('capabilities'), w3c=True)
+
+    def _wrap(self, value):
+        if isinstance(value, AsyncWebElement):
+            return {_ELEMENT_KEY: value.id, _W3C_ELEMENT_KEY: value.id}
+        elif isinstance(value, ElementSnapshot):
+            return self._wrap(value.element)
+        elif isinstance(value, dict):
+            return dict((key, self._wrap(item)) for key, item in value.items())
+        elif isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, dict):
+            for key in (_W3C_ELEMENT_KEY, _ELEMENT_KEY):
+                if key in value:
+                    return AsyncWebElement(self, value[key])
+            return dict((key, self._unwrap(item)) for key, item in value.items())
+        elif isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        return value
+
+    async def execute(self, command, params=None):
+        '''
+        Sends the command, raising the matching WebDriverException on errors.
+
+        :return: value of the response, with element references converted to AsyncWebElements
+        '''
+        params = self._wrap(dict(params or {}))
+        params['sessionId'] = self.session_id
+        response = await self.command_executor.execute(command, params)
+        self.error_handler.check_response(response)
+        return self._unwrap(response.get('value'))
+
+    async def get(self, url):
+        await self.execute(Command.GET, dict(url=url))
+
+    async def title(self):
+        return await self.execute(Command.GET_TITLE)
+
+    async def current_url(self):
+        return await self.execute(Command.GET_CURRENT_URL)
+
+    async def page_source(self):
+        return await self.execute(Command.GET_PAGE_SOURCE)
+
+    async def execute_script(self, script, *args):
+        command = Command.W3C_EXECUTE_SCRIPT if self.w3c else Command.EXECUTE_SCRIPT
+        return await self.execute(command, dict(script=script, args=list(args)))
+
+    async def find_element(self, by=By.ID, value=None):
+        return await self.execute(Command.FIND_ELEMENT, _find_params(by, value, self.w3c))
+
+    async def find_elements(self, by=By.ID, value=None):
+        return await self.execute(Command.FIND_ELEMENTS, _find_params(by, value, self.w3c)) or []
+
+    async def find_element_by_css_selector(self, css_selector):
+        return await self.find_element(By.CSS_SELECTOR, css_selector)
+
+    async def quit(self):
+        try:
+            await self.execute(Command.QUIT)
+        finally:
+            self.session_id = None
+
+
+class AsyncWebElement(object):
+    '''
+    Element of a page driven by AsyncWebDriver.
+
+    Properties are read with the ElementSnapshot script; snapshot() reads several of them
+    with one round-trip.
+    '''
+
+    def __init__(self, parent, id_):
+        self.parent = parent
+        self.id = id_
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncWebElement) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.id)
+
+    async def _execute(self, command, params=None):
+        params = dict(params or {})
+        params['id'] = self.id
+        return await self.parent.execute(command, params)
+
+    async def snapshot(self, properties=PROPERTIES, attributes=(), css_properties=()):
+        '''
+        Reads properties of the element with a single script call.
+
+        :return: ElementSnapshot, see ElementSnapshot.take
+        '''
+        return (await snapshot_elements([self], properties, attributes, css_properties))[0]
+
+    async def text(self):
+        return (await self.snapshot(('text',))).text
+
+    async def tag_name(self):
+        return (await self.snapshot(('tag_name',))).tag_name
+
+    async def rect(self):
+        return (await self.snapshot(('rect',))).rect
+
+    async def is_displayed(self):
+        return (await self.snapshot(('displayed',))).is_displayed()
+
+    async def is_enabled(self):
+        return (await self.snapshot(('enabled',))).is_enabled()
+
+    async def is_selected(self):
+        return (await self.snapshot(('selected',))).is_selected()
+
+    async def get_attribute(self, name):
+        return (await self.snapshot((), [name])).get_attribute(name)
+
+    async def value_of_css_property(self, property_name):
+        return (await self.snapshot((), (), [property_name])).value_of_css_property(property_name)
+
+    async def click(self):
+        await self._execute(Command.CLICK_ELEMENT)
+
+    async def send_keys(self, *value):
+        text = ''.join(value)
+        params = dict(text=text, value=list(text))
+        await self._execute(Command.SEND_KEYS_TO_ELEMENT, params)
+
+    async def find_element(self, by=By.ID, value=None):
+        return await self._execute(Command.FIND_CHILD_ELEMENT, _find_params(by, value, self.parent.w3c))
+
+    async def find_elements(self, by=By.ID, value=None):
+        return await self._execute(Command.FIND_CHILD_ELEMENTS, _find_params(by, value, self.parent.w3c)) or []
+
+
+async def snapshot_elements(elements, properties=PROPERTIES, attributes=(), css_properties=()):
+    '''
+    Captures properties of many elements with one script call, see ElementSnapshot.take_all.
+
+    :param elements: list of AsyncWebElements, all from the same page
+    :return: list of ElementSnapshots, in the order of elements
+    '''
+    _check_properties(properties)
+    if not elements:
+        return []
+    values = await elements[0].parent.execute_script(
+        _SNAPSHOT_SCRIPT, list(elements), list(properties), list(attributes), list(css_properties))
+    return [
+        ElementSnapshot(element, value['properties'], value['attributes'], value['css'])
+        for element, value in zip(elements, values)
+    ]
+
+
+class AsyncElementCollection(object):
+    '''
+    Elements matching a CSS selector or a chain of selectors, the AsyncPageObject counterpart
+    of ElementCollection.
+    '''
+
+    def __init__(self, driver, selector):
+        self.driver = driver
+        self.selector = _selector_chain(selector)
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self.selector)
+
+    async def count(self):
+        return (await self.driver.execute_script(_COLLECTION_CHUNK_SCRIPT, self.selector, 0, 0))[0]
+
+    async def elements(self):
+        '''
+        Returns handles of all matching elements.
+        '''
+        return (await self.driver.execute_script(_COLLECTION_CHUNK_SCRIPT, self.selector, 0, None))[1]
+
+    async def extract(self, properties=('text',), attributes=(), css_properties=()):
+        '''
+        Reads properties of all elements with a single script call, see ElementCollection.extract.
+        '''
+        return await take_columns(self.driver, self.selector, properties, attributes, css_properties)
+
+
+class AsyncPageObject(PageObject):
+    '''
+    PageObject whose elements are found by coroutines.
+
+    Element descriptors, and the element property of components, evaluate to awaitables:
+
+        logo = await page.header.logo
+
+    Element handles are not cached; cache_elements is ignored.
+    '''
+
+    async def _find_element(self, path):
+        '''
+        Finds element or component with given path, see page_objects._find_in_chain.
+        '''
+        chain = self._selectors[path]
+        if len(chain) == 1:
+            return await self.driver.find_element_by_css_selector(chain[0])
+        element = await self.driver.execute_script(_FIND_SCRIPT, list(chain))
+        if element is None:
+            element = self.driver
+            for selector in chain:
+                element = await element.find_element(By.CSS_SELECTOR, selector)
+        return element
+
+    def _collection(self, selector, chunk_size):
+        return AsyncElementCollection(self.driver, selector)
+
+    async def wait_to_load(self, batched=False, timeout=LOAD_TIMEOUT, poll_frequency=LOAD_POLL_FREQUENCY):
+        '''
+        Waits until all components and elements are found on the page, see PageObject.wait_to_load.
+        '''
+        if not batched:
+            await _wait_for_descriptors(self)
+            return
+        nodes = _get_load_probe(self.__class__)
+        deadline = time.time() + timeout
+        while True:
+            missing = await self.driver.execute_script(_LOAD_PROBE_SCRIPT, nodes)
+            if not missing:
+                return
+            if time.time() >= deadline:
+                raise TimeoutException('Elements not found: {0}'.format(', '.join(missing)))
+            await asyncio.sleep(poll_frequency)
+
+    def snapshot(self):
+        raise NotImplementedError('Snapshots of asynchronous page objects are not supported')
+
+    @classmethod
+    async def load(cls, driver, batched=False, timeout=LOAD_TIMEOUT, poll_frequency=LOAD_POLL_FREQUENCY,
+                   **kwargs):
+        result = cls(driver, **kwargs)
+        await result.wait_to_load(batched=batched, timeout=timeout, poll_frequency=poll_frequency)
+        return result
+
+
+async def _wait_for_descriptors(container):
+    '''
+    Looks up all elements declared in the page object or component, one by one.
+    '''
+    for attr, value in container._descriptors:
+        if isinstance(value, PageElement):
+            await getattr(container, attr)
+        elif isinstance(value, PageComponent):
+            await _wait_for_descriptors(getattr(container, attr))
+
+
+class _DocumentState(object):
+    '''
+    Title and URL of the document, read before a document assertion is checked.
+    '''
+
+    def __init__(self, title, current_url):
+        self.title = title
+        self.current_url = current_url
+
+
+def _document_assertion(name, title=False, url=False):
+    check = getattr(AssertionMixin, name)
+
+    async def assertion(self, driver, *args):
+        state = _DocumentState(
+            await driver.title() if title else None,
+            await driver.current_url() if url else None)
+        check(self, state, *args)
+
+    assertion.__name__ = name
+    assertion.__doc__ = check.__doc__
+    return assertion
+
+
+def _element_assertion(name, properties=(), attribute=None, css_property=None):
+    '''
+    Returns coroutine checking the assertion against a snapshot of the element.
+
+    :param attribute: name of the attribute to read, or the index of the argument naming it
+    :param css_property: index of the argument naming the CSS property to read
+    '''
+    check = getattr(AssertionMixin, name)
+
+    async def assertion(self, element, *args):
+        if not isinstance(element, ElementSnapshot):
+            attributes = [args[attribute] if isinstance(attribute, int) else attribute] \
+                if attribute is not None else []
+            css_properties = [args[css_property]] if css_property is not None else []
+            element = await element.snapshot(properties, attributes, css_properties)
+        check(self, element, *args)
+
+    assertion.__name__ = name
+    assertion.__doc__ = check.__doc__
+    return assertion
+
+
+class AsyncAssertionMixin(AssertionMixin):
+    '''
+    AssertionMixin for AsyncWebDrivers and AsyncWebElements; assertions are coroutines.
+
+    Each assertion reads what it needs with one round-trip (an element snapshot, or the
+    title or URL of the document) and then checks it exactly like AssertionMixin, so
+    reporting through _failure() and _success() is unchanged. Assertions that need
+    several round-trips on their own (alerts, presence of elements, parents of elements,
+    clickability and screenshots of elements) are not available.
+    '''
+
+    assert_document_title_equal = _document_assertion('assert_document_title_equal', title=True)
+    assert_document_title_not_equal = _document_assertion('assert_document_title_not_equal', title=True)
+    assert_document_title_matches = _document_assertion('assert_document_title_matches', title=True)
+    assert_document_title_not_matches = _document_assertion('assert_document_title_not_matches', title=True)
+    assert_urlhash_equal = _document_assertion('assert_urlhash_equal', url=True)
+    assert_urlhash_not_equal = _document_assertion('assert_urlhash_not_equal', url=True)
+    assert_urlhash_matches = _document_assertion('assert_urlhash_matches', url=True)
+    assert_urlhash_not_matches = _document_assertion('assert_urlhash_not_matches', url=True)
+
+    assert_element_visible = _element_assertion('assert_element_visible', ('displayed',))
+    assert_element_not_visible = _element_assertion('assert_element_not_visible', ('displayed',))
+    assert_element_enabled = _element_assertion('assert_element_enabled', ('enabled',))
+    assert_element_disabled = _element_assertion('assert_element_disabled', ('enabled',))
+    assert_element_selected = _element_assertion('assert_element_selected', ('selected',))
+    assert_element_not_selected = _element_assertion('assert_element_not_selected', ('selected',))
+    assert_element_text_equal = _element_assertion('assert_element_text_equal', ('text',))
+    assert_element_text_not_equal = _element_assertion('assert_element_text_not_equal', ('text',))
+    assert_element_tag_name_equal = _element_assertion('assert_element_tag_name_equal', ('tag_name',))
+    assert_element_tag_name_not_equal = _element_assertion('assert_element_tag_name_not_equal', ('tag_name',))
+    assert_element_rect_empty = _element_assertion('assert_element_rect_empty', ('rect',))
+    assert_element_rect_not_empty = _element_assertion('assert_element_rect_not_empty', ('rect',))
+    assert_element_rect_includes_point = _element_assertion('assert_element_rect_includes_point', ('rect',))
+    assert_element_rect_not_includes_point = _element_assertion(
+        'assert_element_rect_not_includes_point', ('rect',))
+    assert_element_attr_equal = _element_assertion('assert_element_attr_equal', attribute=0)
+    assert_element_attr_not_equal = _element_assertion('assert_element_attr_not_equal', attribute=0)
+    assert_element_css_class_contains = _element_assertion('assert_element_css_class_contains', attribute='class')
+    assert_element_css_class_not_contains = _element_assertion(
+        'assert_element_css_class_not_contains', attribute='class')
+    assert_element_css_property_equal = _element_assertion('assert_element_css_property_equal', css_property=0)
+    assert_element_css_property_not_equal = _element_assertion(
+        'assert_element_css_property_not_equal', css_property=0)
+
+    async def assert_element_properties_equal(self, element, expected, attributes=None, css_properties=None):
+        if not isinstance(element, ElementSnapshot):
+            element = await element.snapshot(list(expected), list(attributes or ()), list(css_properties or ()))
+        AssertionMixin.assert_element_properties_equal(self, element, expected, attributes, css_properties)
+
+    async def assert_elements_not_overlapping(self, elements):
+        AssertionMixin.assert_elements_not_overlapping(self, await _rect_snapshots(elements))
+
+    async def assert_elements_inside_element(self, elements, container):
+        if not isinstance(container, ElementSnapshot):
+            container = await container.snapshot(('rect',))
+        AssertionMixin.assert_elements_inside_element(self, await _rect_snapshots(elements), container)
+
+
+async def _rect_snapshots(elements):
+    if isinstance(elements, AsyncElementCollection):
+        elements = await elements.elements()
+    pending = [element for element in elements if not isinstance(element, ElementSnapshot)]
+    snapshots = iter(await snapshot_elements(pending, ('rect',)))
+    return [element if isinstance(element, ElementSnapshot) else next(snapshots) for element in elements]
+
+
+def _unsupported(name):
+    def assertion(self, *args, **kwargs):
+        raise NotImplementedError('{0} is not available for asynchronous drivers'.format(name))
+    assertion.__name__ = name
+    return assertion
+
+
+for _name in ('assert_alert_is_present', 'assert_alert_is_not_present', 'assert_element_present',
+              'assert_element_not_present', 'assert_element_clickable', 'assert_element_not_clickable',
+              'assert_element_child_of', 'assert_element_not_child_of', 'assert_element_visually_equal',
+              'assert_element_visually_not_equal'):
+    setattr(AsyncAssertionMixin, _name, _unsupported(_name))
+del _name
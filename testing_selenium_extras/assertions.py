@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import inspect
 import logging
-import re
+import sys
 from selenium.webdriver.support import expected_conditions
-from . import utils
+from . import geometry, utils, visual
+from .snapshot import ElementSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -16,28 +16,43 @@ LEVEL_ASSERT_FAILED = logging.WARNING + 2
 class AssertionMixin(object):
     '''
     Mixin class with Selenium-specific assertions. Intended to be mixed in to concrete test case classes.
+
+    Element assertions that only read element state also accept an ElementSnapshot in place of
+    the element; several of them can then be checked after a single WebDriver round-trip.
+
+    Visual assertions compare screenshots of elements with baselines in visual_baselines,
+    a visual.BaselineStore.
     '''
 
-    def _failure(self, params):
+    visual_baselines = None
+
+    def _failure(self, params, caller=None):
         '''
         Should report assertion failure in some way. Default behaviour is to log it using the
         package logger and then raise the AssertionError exception.
 
         Override in subclasses to perform additional actions (e.g. verbose logging).
+
+        :param params: dictionary describing the assertion
+        :param caller: name of the assertion method, by default the name of the calling function
         '''
-        caller_method_name = inspect.stack()[1][3]
-        logger.log(LEVEL_ASSERT_FAILED, 'Assertion {0} failed {1}'.format(caller_method_name, params))
-        raise AssertionError(caller_method_name, params)
+        caller = caller or sys._getframe(1).f_code.co_name
+        logger.log(LEVEL_ASSERT_FAILED, 'Assertion %s failed %s', caller, params)
+        raise AssertionError(caller, params)
 
-    def _success(self, params):
+    def _success(self, params, caller=None):
         '''
         Should report that assertion succeeded. Default behaviour is to log it using the
         package logger.
 
         Override in subclasses to perform additional actions.
+
+        :param params: dictionary describing the assertion
+        :param caller: name of the assertion method, by default the name of the calling function
         '''
-        caller_method_name = inspect.stack()[1][3]
-        logger.log(LEVEL_ASSERT_SUCCEEDED, 'Assertion {0} succeeded {1}'.format(caller_method_name, params))
+        if logger.isEnabledFor(LEVEL_ASSERT_SUCCEEDED):
+            caller = caller or sys._getframe(1).f_code.co_name
+            logger.log(LEVEL_ASSERT_SUCCEEDED, 'Assertion %s succeeded %s', caller, params)
 
     def assert_alert_is_present(self, driver):
         method_params = dict(alert_is_present=True)
@@ -74,7 +89,7 @@ class AssertionMixin(object):
     def assert_document_title_matches(self, driver, pattern):
         actual = driver.title
         method_params = dict(pattern=pattern, actual=actual)
-        if not re.match(pattern, driver.title) is None:
+        if utils.compile_pattern(pattern).match(actual) is None:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -82,7 +97,7 @@ class AssertionMixin(object):
     def assert_document_title_not_matches(self, driver, pattern):
         actual = driver.title
         method_params = dict(pattern=pattern, actual=actual)
-        if re.match(pattern, driver.title) is None:
+        if utils.compile_pattern(pattern).match(actual) is not None:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -106,7 +121,7 @@ class AssertionMixin(object):
     def assert_urlhash_matches(self, driver, pattern):
         actual = utils.get_urlhash(driver)
         method_params = dict(actual=actual, pattern=pattern)
-        if not re.match(pattern, actual):
+        if utils.compile_pattern(pattern).match(actual) is None:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -114,7 +129,7 @@ class AssertionMixin(object):
     def assert_urlhash_not_matches(self, driver, pattern):
         actual = utils.get_urlhash(driver)
         method_params = dict(actual=actual, pattern=pattern)
-        if re.match(pattern, actual):
+        if utils.compile_pattern(pattern).match(actual) is not None:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -152,7 +167,7 @@ class AssertionMixin(object):
 
     def assert_element_enabled(self, element):
         method_params = dict()
-        if element.is_disabled():
+        if not element.is_enabled():
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -198,7 +213,7 @@ class AssertionMixin(object):
         if actual != expected:
             self._failure(method_params)
         else:
-            self._failure(method_params)
+            self._success(method_params)
 
     def assert_element_text_not_equal(self, element, expected):
         actual = element.text
@@ -206,7 +221,7 @@ class AssertionMixin(object):
         if actual == expected:
             self._failure(method_params)
         else:
-            self._failure(method_params)
+            self._success(method_params)
 
     def assert_element_tag_name_equal(self, element, expected):
         actual = element.tag_name
@@ -219,7 +234,7 @@ class AssertionMixin(object):
     def assert_element_tag_name_not_equal(self, element, expected):
         actual = element.tag_name
         method_params = dict(actual=actual, expected=expected)
-        if actual != expected:
+        if actual == expected:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -227,7 +242,7 @@ class AssertionMixin(object):
     def assert_element_rect_empty(self, element):
         rect = element.rect
         method_params = dict(rect=rect)
-        if rect['width'] < utils.EPSILON or rect['height'] < utils.EPSILON:
+        if not geometry.empty_rects([rect])[0]:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -235,7 +250,7 @@ class AssertionMixin(object):
     def assert_element_rect_not_empty(self, element):
         rect = element.rect
         method_params = dict(rect=rect)
-        if rect['width'] >= utils.EPSILON and rect['height'] >= utils.EPSILON:
+        if geometry.empty_rects([rect])[0]:
             self._failure(method_params)
         else:
             self._success(method_params)
@@ -256,6 +271,78 @@ class AssertionMixin(object):
         else:
             self._success(method_params)
 
+    def assert_elements_not_overlapping(self, elements):
+        '''
+        Checks that no two of the elements overlap, reading all their rects with one script call.
+
+        :param elements: ElementCollection, or list of WebElements or ElementSnapshots
+        '''
+        overlaps = geometry.find_overlaps(geometry.get_rects(elements))
+        method_params = dict(overlapping_indexes=overlaps)
+        if overlaps:
+            self._failure(method_params)
+        else:
+            self._success(method_params)
+
+    def assert_elements_inside_element(self, elements, container):
+        '''
+        Checks that all elements lie entirely within the rect of the container element.
+
+        :param elements: ElementCollection, or list of WebElements or ElementSnapshots
+        :param container: WebElement or ElementSnapshot
+        '''
+        rect = container.rect
+        inside = geometry.rects_inside_rect(geometry.get_rects(elements), rect)
+        outside = [index for index, value in enumerate(inside) if not value]
+        method_params = dict(rect=rect, outside_indexes=outside)
+        if outside:
+            self._failure(method_params)
+        else:
+            self._success(method_params)
+
+    def _visual_diff(self, element, baseline, pixel_tolerance, record=True):
+        if self.visual_baselines is None:
+            raise ValueError('visual_baselines must be set to make visual assertions')
+        return self.visual_baselines.compare(baseline, visual.capture(element), pixel_tolerance, record)
+
+    def assert_element_visually_equal(self, element, baseline, pixel_tolerance=visual.PIXEL_TOLERANCE,
+                                      max_diff_ratio=0.0):
+        '''
+        Checks that the screenshot of the element matches its baseline image, which is created
+        if it does not exist yet.
+
+        :param element: WebElement or PageComponent
+        :param baseline: name of the baseline image
+        :param pixel_tolerance: largest difference of a channel value not counted as a change
+        :param max_diff_ratio: largest fraction of differing pixels still considered a match
+        '''
+        diff = self._visual_diff(element, baseline, pixel_tolerance)
+        method_params = dict(baseline=baseline, status=diff.status, diff_ratio=diff.diff_ratio,
+                             changed_tiles=diff.changed_tiles)
+        if diff.status == visual.RESIZED or diff.diff_ratio > max_diff_ratio:
+            self._failure(method_params)
+        else:
+            self._success(method_params)
+
+    def assert_element_visually_not_equal(self, element, baseline, pixel_tolerance=visual.PIXEL_TOLERANCE,
+                                          max_diff_ratio=0.0):
+        '''
+        Checks that the screenshot of the element differs from the baseline image, e.g. of the
+        element in another state. The baseline must exist, and is never created or updated.
+
+        :param element: WebElement or PageComponent
+        :param baseline: name of the baseline image
+        :param pixel_tolerance: largest difference of a channel value not counted as a change
+        :param max_diff_ratio: largest fraction of differing pixels still considered a match
+        '''
+        diff = self._visual_diff(element, baseline, pixel_tolerance, record=False)
+        method_params = dict(baseline=baseline, status=diff.status, diff_ratio=diff.diff_ratio,
+                             changed_tiles=diff.changed_tiles)
+        if diff.status != visual.RESIZED and diff.diff_ratio <= max_diff_ratio:
+            self._failure(method_params)
+        else:
+            self._success(method_params)
+
     def assert_element_attr_equal(self, element, attr_name, expected_value):
         actual_value = element.get_attribute(attr_name)
         method_params = dict(attr_name=attr_name, expected_value=expected_value, actual_value=actual_value)
@@ -319,3 +406,31 @@ class AssertionMixin(object):
             self._failure(method_params)
         else:
             self._success(method_params)
+
+    def assert_element_properties_equal(self, element, expected, attributes=None, css_properties=None):
+        '''
+        Checks several properties of the element at once, reading them with a single script call.
+
+        :param element: WebElement or ElementSnapshot
+        :param expected: dictionary mapping names from snapshot.PROPERTIES to expected values
+        :param attributes: dictionary mapping attribute names to expected values
+        :param css_properties: dictionary mapping CSS property names to expected values
+        '''
+        attributes = attributes or {}
+        css_properties = css_properties or {}
+        if not isinstance(element, ElementSnapshot):
+            element = ElementSnapshot.take(element, list(expected), list(attributes), list(css_properties))
+        actual = dict(
+            (name, getattr(element, name) if name in ('text', 'tag_name', 'rect')
+                else getattr(element, 'is_' + name)())
+            for name in expected)
+        actual_attributes = dict((name, element.get_attribute(name)) for name in attributes)
+        actual_css_properties = dict((name, element.value_of_css_property(name)) for name in css_properties)
+        method_params = dict(
+            expected=expected, actual=actual,
+            expected_attributes=attributes, actual_attributes=actual_attributes,
+            expected_css_properties=css_properties, actual_css_properties=actual_css_properties)
+        if actual != expected or actual_attributes != attributes or actual_css_properties != css_properties:
+            self._failure(method_params)
+        else:
+            self._success(method_params)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import weakref
+from selenium.common.exceptions import StaleElementReferenceException
+
+logger = logging.getLogger(__name__)
+
+
+class ElementCache(object):
+    '''
+    Cache of resolved WebElement handles owned by a single page object.
+
+    Handles are resolved once and then reused until they turn stale, or until
+    the cache is explicitly invalidated (e.g. after navigating to another page).
+    '''
+
+    __slots__ = ('_entries', 'hits', 'misses', 'stale', '__weakref__')
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, resolve):
+        '''
+        Returns cached element handle for the given key, resolving it on a miss.
+
+        :param key: hashable key identifying the element within the page object
+        :param resolve: callable with no arguments that looks the element up
+        :return: CachedElement
+        '''
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = CachedElement(self, key, resolve)
+            self._entries[key] = entry
+        else:
+            self.hits += 1
+        return entry
+
+    def discard(self, key):
+        '''
+        Removes single entry from the cache.
+        '''
+        self._entries.pop(key, None)
+
+    def invalidate(self):
+        '''
+        Removes all entries from the cache.
+        '''
+        self._entries.clear()
+
+    def stats(self):
+        '''
+        Returns cache counters.
+
+        :return: dictionary with keys hits, misses, stale and size
+        '''
+        return dict(hits=self.hits, misses=self.misses, stale=self.stale, size=len(self._entries))
+
+
+class CachedElement(object):
+    '''
+    Proxy of a WebElement that transparently re-resolves the element when the
+    wrapped handle raises StaleElementReferenceException.
+
+    The proxy refers to its cache weakly, so page objects, their caches and cached
+    elements never form reference cycles and are freed as soon as the page object is.
+    '''
+
+    __slots__ = ('_cache', '_key', '_resolve', 'wrapped_element')
+
+    def __init__(self, cache, key, resolve):
+        self._cache = weakref.ref(cache)
+        self._key = key
+        self._resolve = resolve
+        self.wrapped_element = resolve()
+
+    def _revalidate(self):
+        cache = self._cache()
+        if cache is not None:
+            cache.stale += 1
+        try:
+            self.wrapped_element = self._resolve()
+        except Exception:
+            if cache is not None:
+                cache.discard(self._key)
+            raise
+        return self.wrapped_element
+
+    def __getattr__(self, name):
+        try:
+            value = getattr(self.wrapped_element, name)
+        except StaleElementReferenceException:
+            value = getattr(self._revalidate(), name)
+        if not callable(value):
+            return value
+
+        def method(*args, **kwargs):
+            try:
+                return value(*args, **kwargs)
+            except StaleElementReferenceException:
+                return getattr(self._revalidate(), name)(*args, **kwargs)
+        return method
+
+    def __eq__(self, other):
+        return self.wrapped_element == unwrap_element(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.wrapped_element)
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self.wrapped_element)
+
+
+def unwrap_element(element):
+    '''
+    Returns WebElement wrapped by CachedElement, or the element itself if it is not wrapped.
+
+    Needed when passing elements to Selenium APIs that serialize them, e.g. execute_script.
+    '''
+    return getattr(element, 'wrapped_element', element)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import heapq
+import io
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import WebDriverException
+from .utils import write_file_atomically
+
+logger = logging.getLogger(__name__)
+
+
+# number of seconds a check is assumed to take when there are no recorded durations at all
+DEFAULT_DURATION = 5.0
+
+# weight of the latest duration in the moving average kept by DurationHistory
+SMOOTHING = 0.3
+
+
+class PageCheck(object):
+    '''
+    Opens URL, loads page object on it and runs check callables against it.
+
+    Each check is called with the loaded page object and its return value is collected
+    into the result; checks report problems by raising exceptions, typically the
+    AssertionError raised by AssertionMixin.
+    '''
+
+    def __init__(self, url, page_class, checks=(), name=None, load_options=None):
+        '''
+        :param url: address of the page
+        :param page_class: PageObject subclass describing the page
+        :param checks: callables accepting the page object
+        :param name: name of the check used in reports, the URL by default
+        :param load_options: keyword arguments of PageObject.load, e.g. batched=True
+        '''
+        self.url = url
+        self.page_class = page_class
+        self.checks = tuple(checks)
+        self.name = name or url
+        self.load_options = load_options or {}
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.name)
+
+    def run(self, driver):
+        '''
+        Runs the check using given driver.
+
+        :return: CheckResult
+        '''
+        started = time.time()
+        values = []
+        try:
+            driver.get(self.url)
+            page = self.page_class.load(driver, **self.load_options)
+            for check in self.checks:
+                values.append(check(page))
+        except Exception as error:
+            logger.info('Check %s failed: %r', self.name, error)
+            return CheckResult(self, False, error, time.time() - started, values)
+        return CheckResult(self, True, None, time.time() - started, values)
+
+
+# outcome of a single page check: the check, whether it passed, exception that made
+# it fail, number of seconds it took and return values of check callables
+CheckResult = collections.namedtuple('CheckResult', 'check passed error duration values')
+
+
+class PageCheckExecutor(object):
+    '''
+    Runs page checks concurrently, one thread per pooled driver.
+    '''
+
+    def __init__(self, pool, max_workers=None):
+        '''
+        :param pool: DriverPool providing drivers
+        :param max_workers: number of threads, the pool size by default
+        '''
+        self.pool = pool
+        self.max_workers = max_workers or pool.max_size
+
+    def run_check(self, check):
+        '''
+        Runs single check on a driver taken from the pool.
+        '''
+        driver = self.pool.acquire()
+        try:
+            result = check.run(driver)
+        except BaseException:
+            self.pool.release(driver, failed=True)
+            raise
+        self.pool.release(driver, failed=isinstance(result.error, WebDriverException))
+        return result
+
+    def run(self, checks):
+        '''
+        Runs all checks, returning their results in order of the checks.
+
+        :param checks: iterable of PageChecks
+        :return: list of CheckResults
+        '''
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.run_check, checks))
+
+
+class DurationHistory(object):
+    '''
+    Durations of page checks recorded in previous runs, keyed by check names and kept as
+    exponential moving averages, optionally persisted in a JSON file.
+    '''
+
+    def __init__(self, path=None, smoothing=SMOOTHING):
+        '''
+        :param path: JSON file to load durations from and save them to
+        :param smoothing: weight of the latest duration in the average, between 0 and 1
+        '''
+        self.path = path
+        self.smoothing = smoothing
+        self.durations = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with io.open(path, encoding='utf-8') as fp:
+                self.durations = json.load(fp)
+
+    def estimate(self, check):
+        '''
+        Returns expected duration of the check in seconds. Checks that never ran are expected
+        to take as long as the median of known checks.
+        '''
+        with self._lock:
+            duration = self.durations.get(check.name)
+            if duration is None:
+                known = sorted(self.durations.values())
+                middle = len(known) // 2
+                duration = (known[middle] + known[~middle]) / 2.0 if known else DEFAULT_DURATION
+        return duration
+
+    def update(self, result):
+        '''
+        Records duration of the check result.
+        '''
+        with self._lock:
+            previous = self.durations.get(result.check.name)
+            if previous is None:
+                self.durations[result.check.name] = result.duration
+            else:
+                self.durations[result.check.name] = \
+                    self.smoothing * result.duration + (1 - self.smoothing) * previous
+
+    def save(self):
+        '''
+        Writes durations to the file given as path, replacing it atomically.
+        '''
+        if self.path is None:
+            return
+        with self._lock:
+            data = json.dumps(self.durations, indent=2, sort_keys=True)
+        write_file_atomically(self.path, data.encode('utf-8'))
+
+
+def plan_checks(checks, estimates, workers):
+    '''
+    Assigns checks to workers with the longest-processing-time-first rule: checks are taken
+    from the longest to the shortest, each going to the worker with the least total work.
+
+    :param checks: list of checks
+    :param estimates: list of expected durations of the checks
+    :param workers: number of workers
+    :return: list of lists of check indexes, one per worker, longest checks first
+    '''
+    queues = [[] for _ in range(workers)]
+    loads = [(0.0, worker) for worker in range(workers)]
+    for index in sorted(range(len(checks)), key=lambda i: -estimates[i]):
+        load, worker = heapq.heappop(loads)
+        queues[worker].append(index)
+        heapq.heappush(loads, (load + estimates[index], worker))
+    return queues
+
+
+class ScheduledCheckExecutor(PageCheckExecutor):
+    '''
+    Runs page checks concurrently, balancing work between drivers by expected durations.
+
+    Checks are distributed between workers (one per driver) in advance, with the longest
+    checks scheduled first (see plan_checks). A worker that runs out of checks steals the
+    shortest pending check of the worker with the most expected work left, which evens out
+    wrong estimates. Actual durations are recorded in the history and saved after the run.
+    '''
+
+    def __init__(self, pool, history=None, max_workers=None):
+        '''
+        :param pool: DriverPool providing drivers
+        :param history: DurationHistory, an empty in-memory one by default
+        :param max_workers: number of threads, the pool size by default
+        '''
+        super(ScheduledCheckExecutor, self).__init__(pool, max_workers)
+        self.history = history if history is not None else DurationHistory()
+        self.steals = 0
+
+    def run(self, checks):
+        '''
+        Runs all checks, returning their results in order of the checks.
+
+        :param checks: iterable of PageChecks
+        :raise: the first exception that stopped a worker, e.g. a failure to create a driver,
+            after all workers finished
+        :return: list of CheckResults
+        '''
+        checks = list(checks)
+        estimates = [self.history.estimate(check) for check in checks]
+        workers = max(1, min(self.max_workers, len(checks)))
+        queues = [collections.deque(queue) for queue in plan_checks(checks, estimates, workers)]
+        remaining = [sum(estimates[index] for index in queue) for queue in queues]
+        results = [None] * len(checks)
+        lock = threading.Lock()
+        self.steals = 0
+
+        def next_check(worker):
+            with lock:
+                victim = worker
+                if not queues[worker]:
+                    pending = [other for other in range(workers) if queues[other]]
+                    if not pending:
+                        return None
+                    victim = max(pending, key=lambda other: remaining[other])
+                    index = queues[victim].pop()
+                    self.steals += 1
+                else:
+                    index = queues[worker].popleft()
+                remaining[victim] -= estimates[index]
+                return index
+
+        errors = []
+
+        def work(worker):
+            driver = None
+            try:
+                while True:
+                    index = next_check(worker)
+                    if index is None:
+                        break
+                    if driver is None:
+                        driver = self.pool.acquire()
+                    result = results[index] = checks[index].run(driver)
+                    self.history.update(result)
+                    if isinstance(result.error, WebDriverException):
+                        self.pool.release(driver, failed=True)
+                        driver = None
+            except BaseException as error:
+                errors.append(error)
+                if driver is not None:
+                    self.pool.release(driver, failed=True)
+                return
+            if driver is not None:
+                self.pool.release(driver)
+
+        threads = [threading.Thread(target=work, args=(worker,), name='PageCheckWorker-{0}'.format(worker))
+                   for worker in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.history.save()
+        if errors:
+            raise errors[0]
+        return results
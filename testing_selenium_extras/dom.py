@@ -0,0 +1,600 @@
+# -*- coding: utf-8 -*-
+
+'''
+Minimal HTML document model with CSS selector and XPath support, used to evaluate
+queries locally instead of in the browser.
+
+Supported CSS: type, universal, #id, .class and attribute selectors (=, ~=, |=, ^=, $=, *=),
+:first-child, :last-child, :only-child, :nth-child(), :not() and all four combinators.
+
+Supported XPath: relative and absolute location paths made of /, //, ., .., * and name steps
+with [@attr], [@attr="value"], [text()="value"] and [index] predicates.
+'''
+
+import logging
+import re
+from six.moves.html_parser import HTMLParser
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+
+_VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+    'source', 'track', 'wbr',
+])
+
+# elements closed implicitly when an element of one of the listed kinds is opened
+_IMPLICITLY_CLOSED = {
+    'li': ('li',),
+    'p': ('p',),
+    'option': ('option',),
+    'tr': ('tr', 'td', 'th'),
+    'td': ('td', 'th'),
+    'th': ('td', 'th'),
+}
+
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# elements that are never rendered
+_HIDDEN_TAGS = frozenset(['head', 'script', 'style', 'title', 'meta', 'link', 'template'])
+
+# elements displayed as blocks by default, whose text starts and ends a line
+_BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'html', 'legend', 'li', 'main', 'nav', 'ol', 'option', 'p', 'pre', 'section', 'summary',
+    'table', 'tbody', 'tfoot', 'thead', 'tr', 'ul',
+])
+
+# elements displayed as table cells, whose texts are separated by spaces
+_CELL_TAGS = frozenset(['td', 'th'])
+
+
+class SelectorError(ValueError):
+    '''
+    Raised for CSS selectors or XPath expressions that are invalid or not supported.
+    '''
+
+
+class Node(object):
+    '''
+    Base class of documents and elements. Children are Elements and text strings.
+    '''
+
+    parent = None
+
+    def __init__(self):
+        self.children = []
+
+    @property
+    def elements(self):
+        '''
+        Child elements, without text nodes.
+        '''
+        return [child for child in self.children if isinstance(child, Element)]
+
+    def iter_descendants(self):
+        '''
+        Yields all descendant elements in document order.
+        '''
+        stack = list(reversed(self.elements))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.elements))
+
+    @property
+    def text_content(self):
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Node):
+                stack.extend(reversed(node.children))
+            else:
+                parts.append(node)
+        return ''.join(parts)
+
+    def select(self, selector):
+        '''
+        Returns descendant elements matching the CSS selector, in document order.
+        '''
+        groups = _parse_selector(selector)
+        return [element for element in self.iter_descendants() if _match_groups(element, groups)]
+
+    def select_one(self, selector):
+        '''
+        Returns first descendant element matching the CSS selector, or None.
+        '''
+        groups = _parse_selector(selector)
+        for element in self.iter_descendants():
+            if _match_groups(element, groups):
+                return element
+        return None
+
+    def xpath(self, expression):
+        '''
+        Returns elements found by evaluating the XPath expression relative to this node.
+        '''
+        return _evaluate_xpath(self, expression)
+
+
+class Document(Node):
+    '''
+    Root of a parsed HTML document.
+    '''
+
+    @property
+    def root(self):
+        elements = self.elements
+        return elements[0] if elements else None
+
+    @property
+    def title(self):
+        title = self.select_one('title')
+        return _RE_WHITESPACE.sub(' ', title.text_content).strip() if title is not None else ''
+
+
+class Element(Node):
+    '''
+    HTML element.
+    '''
+
+    def __init__(self, tag, attrs, parent):
+        super(Element, self).__init__()
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+
+    def __repr__(self):
+        return '<{0} {1} {2!r}>'.format(self.__class__.__name__, self.tag, self.attrs)
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    @property
+    def parent_element(self):
+        return self.parent if isinstance(self.parent, Element) else None
+
+    @property
+    def siblings(self):
+        return self.parent.elements
+
+    @property
+    def document(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def matches(self, selector):
+        return _match_groups(self, _parse_selector(selector))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.document = Document()
+        self.stack = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        closes = _IMPLICITLY_CLOSED.get(tag)
+        if closes and isinstance(self.stack[-1], Element) and self.stack[-1].tag in closes:
+            self.stack.pop()
+        element = Element(tag, dict((name, value if value is not None else '') for name, value in attrs),
+                          self.stack[-1])
+        self.stack[-1].children.append(element)
+        if tag not in _VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html):
+    '''
+    Parses HTML into a Document.
+    '''
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+def parse_style(element):
+    '''
+    Returns inline style of the element as a dictionary.
+    '''
+    style = {}
+    for declaration in element.get('style', '').split(';'):
+        name, _, value = declaration.partition(':')
+        if name.strip():
+            style[name.strip().lower()] = value.strip()
+    return style
+
+
+def is_displayed(element):
+    '''
+    Returns True if neither the element nor its ancestors are hidden, judging by tag names,
+    the hidden attribute and inline styles only.
+    '''
+    if element.tag == 'input' and element.get('type') == 'hidden':
+        return False
+    node = element
+    while isinstance(node, Element):
+        style = parse_style(node)
+        if node.tag in _HIDDEN_TAGS or 'hidden' in node.attrs or style.get('display') == 'none' or \
+                style.get('visibility') == 'hidden':
+            return False
+        node = node.parent
+    return True
+
+
+def visible_text(element):
+    '''
+    Returns text of the displayed part of the element (see is_displayed) the way WebDriver
+    renders it: whitespace is collapsed, and block elements and <br> break lines.
+    '''
+    if not is_displayed(element):
+        return ''
+    parts = []
+    # elements, text nodes, and line breaks to emit when leaving block elements
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            parts.append('\n')
+        elif isinstance(node, Element):
+            style = parse_style(node)
+            if node.tag in _HIDDEN_TAGS or 'hidden' in node.attrs or style.get('display') == 'none':
+                continue
+            if node.tag == 'br' or node.tag in _BLOCK_TAGS:
+                parts.append('\n')
+            elif node.tag in _CELL_TAGS:
+                parts.append(' ')
+            if node.tag in _BLOCK_TAGS:
+                stack.append(None)
+            stack.extend(reversed(node.children))
+        else:
+            parts.append(_RE_WHITESPACE.sub(' ', node))
+    lines = (_RE_WHITESPACE.sub(' ', line).strip() for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def find(context, using, value):
+    '''
+    Finds elements within the context (Document or Element) using a WebDriver locator strategy.
+
+    :param context: Document or Element
+    :param using: locator strategy, one of the selenium.webdriver.common.by.By values
+    :param value: locator
+    :return: list of Elements in document order
+    '''
+    if using == 'css selector':
+        return context.select(value)
+    elif using == 'xpath':
+        return context.xpath(value)
+    elif using == 'id':
+        return context.select('[id="{0}"]'.format(value))
+    elif using == 'name':
+        return context.select('[name="{0}"]'.format(value))
+    elif using == 'class name':
+        return context.select('[class~="{0}"]'.format(value))
+    elif using == 'tag name':
+        return context.select(value)
+    elif using == 'link text':
+        return [e for e in context.select('a') if visible_text(e) == value]
+    elif using == 'partial link text':
+        return [e for e in context.select('a') if value in visible_text(e)]
+    raise SelectorError('Unsupported locator strategy: {0}'.format(using))
+
+
+def query_first(context, chain):
+    '''
+    Returns the first element matching the chain of CSS selectors, each matched inside the
+    first element matching the previous one, or None; see snapshot._QUERY_SCRIPT.
+
+    :param context: Document or Element
+    :param chain: sequence of CSS selectors
+    '''
+    for selector in chain:
+        context = context.select_one(selector)
+        if context is None:
+            return None
+    return context
+
+
+def query_all(context, chain):
+    '''
+    Returns all elements matching the chain of CSS selectors, see query_first.
+    '''
+    context = query_first(context, chain[:-1])
+    return [] if context is None else context.select(chain[-1])
+
+
+def probe_descriptor_tree(context, nodes):
+    '''
+    Returns names of the nodes of a page object descriptor tree that are not found in the
+    context, like page_objects._LOAD_PROBE_SCRIPT does in the browser.
+
+    :param context: Document or Element
+    :param nodes: list of [name, css_selector, children] triples, children being None for elements
+    '''
+    missing = []
+    for name, selector, children in nodes:
+        element = context.select_one(selector)
+        if element is None:
+            missing.append(name)
+        elif children is not None:
+            missing.extend(probe_descriptor_tree(element, children))
+    return missing
+
+
+# CSS selectors
+
+_RE_CSS_TOKEN = re.compile(r'''
+    (?P<space>\s*(?P<combinator>[>+~,])\s*|\s+)
+  | (?P<type>\*|[-\w]+)
+  | \#(?P<id>[-\w]+)
+  | \.(?P<class>[-\w]+)
+  | \[\s*(?P<attr>[-\w]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[-\w]+))\s*)?\]
+  | :(?P<pseudo>[-\w]+)(?:\((?P<pseudo_arg>[^()]*)\))?
+''', re.VERBOSE)
+
+_RE_NTH = re.compile(r'^\s*(?:(?P<a>[-+]?\d*)n\s*(?:(?P<sign>[-+])\s*(?P<b>\d+))?|(?P<index>[-+]?\d+))\s*$')
+
+
+def _attr_predicate(name, op, value):
+    if op is None:
+        return lambda e: name in e.attrs
+    tests = {
+        '=': lambda actual: actual == value,
+        '~=': lambda actual: value in actual.split(),
+        '|=': lambda actual: actual == value or actual.startswith(value + '-'),
+        '^=': lambda actual: bool(value) and actual.startswith(value),
+        '$=': lambda actual: bool(value) and actual.endswith(value),
+        '*=': lambda actual: bool(value) and value in actual,
+    }
+    test = tests[op]
+    return lambda e: name in e.attrs and test(e.attrs[name])
+
+
+def _nth_predicate(argument, from_end=False):
+    argument = argument.strip().lower()
+    if argument == 'odd':
+        a, b = 2, 1
+    elif argument == 'even':
+        a, b = 2, 0
+    else:
+        match = _RE_NTH.match(argument)
+        if match is None:
+            raise SelectorError('Unsupported :nth-child argument: {0}'.format(argument))
+        if match.group('index') is not None:
+            a, b = 0, int(match.group('index'))
+        else:
+            a = match.group('a')
+            a = 1 if a in ('', '+') else -1 if a == '-' else int(a)
+            b = int(match.group('b') or 0) * (-1 if match.group('sign') == '-' else 1)
+
+    def predicate(element):
+        siblings = element.siblings
+        position = (len(siblings) - siblings.index(element)) if from_end else siblings.index(element) + 1
+        if a == 0:
+            return position == b
+        return (position - b) % a == 0 and (position - b) // a >= 0
+    return predicate
+
+
+def _pseudo_predicate(name, argument):
+    if name == 'first-child':
+        return lambda e: e.siblings[0] is e
+    elif name == 'last-child':
+        return lambda e: e.siblings[-1] is e
+    elif name == 'only-child':
+        return lambda e: len(e.siblings) == 1
+    elif name == 'nth-child' and argument is not None:
+        return _nth_predicate(argument)
+    elif name == 'nth-last-child' and argument is not None:
+        return _nth_predicate(argument, from_end=True)
+    elif name == 'not' and argument is not None:
+        groups = _parse_selector(argument)
+        return lambda e: not _match_groups(e, groups)
+    raise SelectorError('Unsupported pseudo-class: {0}'.format(name))
+
+
+def _compile_selector(selector):
+    '''
+    Parses selector list into a list of complex selectors. Each complex selector is a list of
+    (combinator, predicates) pairs, combinator being None for the leftmost compound selector.
+    '''
+    groups, current, predicates, combinator = [], [], [], None
+    position, selector = 0, selector.strip()
+    if not selector:
+        raise SelectorError('Empty selector')
+
+    def close_compound():
+        if not predicates:
+            raise SelectorError('Invalid selector: {0}'.format(selector))
+        current.append((combinator, list(predicates)))
+        del predicates[:]
+
+    while position < len(selector):
+        match = _RE_CSS_TOKEN.match(selector, position)
+        if match is None:
+            raise SelectorError('Invalid selector: {0}'.format(selector))
+        position = match.end()
+        if match.group('space') is not None:
+            close_compound()
+            token = match.group('combinator') or ' '
+            if token == ',':
+                groups.append(current)
+                current, combinator = [], None
+            else:
+                combinator = token
+        elif match.group('type') is not None:
+            tag = match.group('type').lower()
+            predicates.append((lambda e: True) if tag == '*' else (lambda e, tag=tag: e.tag == tag))
+        elif match.group('id') is not None:
+            predicates.append(lambda e, value=match.group('id'): e.attrs.get('id') == value)
+        elif match.group('class') is not None:
+            predicates.append(lambda e, value=match.group('class'): value in e.classes)
+        elif match.group('attr') is not None:
+            value = match.group('dq')
+            if value is None:
+                value = match.group('sq') if match.group('sq') is not None else match.group('bare')
+            predicates.append(_attr_predicate(match.group('attr'), match.group('op'), value))
+        else:
+            predicates.append(_pseudo_predicate(match.group('pseudo').lower(), match.group('pseudo_arg')))
+    close_compound()
+    groups.append(current)
+    return groups
+
+
+_SELECTOR_CACHE = utils.LRUCache(maxsize=512)
+
+
+def _parse_selector(selector):
+    return _SELECTOR_CACHE.get(selector, _compile_selector)
+
+
+def _match_compound(element, predicates):
+    for predicate in predicates:
+        if not predicate(element):
+            return False
+    return True
+
+
+def _match_complex(element, parts, index):
+    combinator, predicates = parts[index]
+    if not _match_compound(element, predicates):
+        return False
+    if index == 0:
+        return True
+    if combinator == '>':
+        parent = element.parent_element
+        return parent is not None and _match_complex(parent, parts, index - 1)
+    elif combinator == ' ':
+        ancestor = element.parent_element
+        while ancestor is not None:
+            if _match_complex(ancestor, parts, index - 1):
+                return True
+            ancestor = ancestor.parent_element
+        return False
+    siblings = element.siblings
+    previous = siblings[:siblings.index(element)]
+    if combinator == '+':
+        return bool(previous) and _match_complex(previous[-1], parts, index - 1)
+    return any(_match_complex(sibling, parts, index - 1) for sibling in previous)
+
+
+def _match_groups(element, groups):
+    for parts in groups:
+        if _match_complex(element, parts, len(parts) - 1):
+            return True
+    return False
+
+
+# XPath
+
+_RE_XPATH_STEP = re.compile(r'''
+    (?P<axis>//|/)?
+    (?P<test>\.\.|\.|\*|[-\w]+)
+    (?P<predicates>(?:\[[^\]]*\])*)
+''', re.VERBOSE)
+
+_RE_XPATH_PREDICATE = re.compile(r'''
+    \[\s*(?:
+        (?P<index>\d+)
+      | @(?P<attr>[-\w]+)(?:\s*=\s*(?:"(?P<adq>[^"]*)"|'(?P<asq>[^']*)'))?
+      | text\(\)\s*=\s*(?:"(?P<tdq>[^"]*)"|'(?P<tsq>[^']*)')
+    )\s*\]
+''', re.VERBOSE)
+
+
+def _xpath_predicates(source):
+    predicates, position = [], 0
+    while position < len(source):
+        match = _RE_XPATH_PREDICATE.match(source, position)
+        if match is None:
+            raise SelectorError('Unsupported XPath predicate: {0}'.format(source[position:]))
+        position = match.end()
+        if match.group('index') is not None:
+            predicates.append(int(match.group('index')))
+        elif match.group('attr') is not None:
+            name, value = match.group('attr'), match.group('adq')
+            value = value if value is not None else match.group('asq')
+            if value is None:
+                predicates.append(lambda e, name=name: name in e.attrs)
+            else:
+                predicates.append(lambda e, name=name, value=value: e.attrs.get(name) == value)
+        else:
+            value = match.group('tdq') if match.group('tdq') is not None else match.group('tsq')
+            predicates.append(lambda e, value=value: e.text_content.strip() == value)
+    return predicates
+
+
+def _evaluate_xpath(context, expression):
+    expression = expression.strip()
+    nodes = [context]
+    if expression.startswith('/'):
+        nodes = [context.document if isinstance(context, Element) else context]
+    position = 0
+    while position < len(expression):
+        match = _RE_XPATH_STEP.match(expression, position)
+        if match is None or match.end() == position:
+            raise SelectorError('Unsupported XPath expression: {0}'.format(expression))
+        position = match.end()
+        axis, test = match.group('axis'), match.group('test')
+        predicates = _xpath_predicates(match.group('predicates'))
+        if axis == '//' and test not in ('.', '..'):
+            # children of the nodes and of all their descendants, so that positional
+            # predicates count among the children of each parent, e.g. //tr[1] is the first
+            # row of every table
+            contexts, seen = [], set()
+            for node in nodes:
+                for descendant in [node] + list(node.iter_descendants()):
+                    if id(descendant) not in seen:
+                        seen.add(id(descendant))
+                        contexts.append(descendant)
+        else:
+            contexts = nodes
+        result, seen = [], set()
+        for node in contexts:
+            if test == '.':
+                candidates = [node]
+            elif test == '..':
+                candidates = [node.parent] if node.parent is not None else []
+            else:
+                candidates = node.elements
+                if test != '*':
+                    candidates = [e for e in candidates if e.tag == test.lower()]
+            for predicate in predicates:
+                if isinstance(predicate, int):
+                    candidates = candidates[predicate - 1:predicate]
+                else:
+                    candidates = [e for e in candidates if predicate(e)]
+            for candidate in candidates:
+                if id(candidate) not in seen:
+                    seen.add(id(candidate))
+                    result.append(candidate)
+        if contexts is not nodes:
+            order = dict((id(e), index) for index, e in enumerate(contexts))
+            result.sort(key=lambda e: order[id(e)])
+        nodes = result
+    return [node for node in nodes if isinstance(node, Element)]
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import urllib3
+from six.moves.urllib import parse
+from selenium.webdriver.remote.errorhandler import ErrorCode
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+logger = logging.getLogger(__name__)
+
+
+# defaults of PooledRemoteConnection: number of connections kept open to the server,
+# connect and read timeouts in seconds, number of retried connection attempts and the
+# backoff factor of the exponentially growing delays between them
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 300
+RETRIES = 3
+RETRY_BACKOFF = 0.1
+
+
+class CommandExecutorWrapper(object):
+    '''
+    Base class of command executors that wrap another one, e.g. the RemoteConnection
+    of a driver, to observe or alter the commands it executes.
+
+    Public attributes (like the w3c flag set by WebDriver when it starts a session)
+    are read from and written to the wrapped executor.
+    '''
+
+    def __init__(self, executor):
+        self._executor = executor
+
+    def __getattr__(self, name):
+        return getattr(self._executor, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            super(CommandExecutorWrapper, self).__setattr__(name, value)
+        else:
+            setattr(self._executor, name, value)
+
+    def execute(self, command, params):
+        return self._executor.execute(command, params)
+
+    @classmethod
+    def install(cls, driver, *args, **kwargs):
+        '''
+        Wraps command executor of the driver, returning the wrapper.
+        '''
+        wrapper = cls(driver.command_executor, *args, **kwargs)
+        driver.command_executor = wrapper
+        return wrapper
+
+    def uninstall(self, driver):
+        '''
+        Restores the command executor the driver used before install().
+        '''
+        if driver.command_executor is not self:
+            raise ValueError('Command executor of the driver is not this wrapper')
+        driver.command_executor = self._executor
+
+
+def create_pool_manager(pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                        retries=RETRIES):
+    '''
+    Returns urllib3 PoolManager suitable for PooledRemoteConnection, e.g. to be shared by
+    connections of several drivers talking to the same grid.
+
+    Only failures to connect are retried (with exponential backoff): a command that reached
+    the server may have had effects, e.g. clicked a button, so it is never sent again.
+
+    :param pool_size: number of connections kept open to each host
+    :param connect_timeout: number of seconds to wait for a connection to be established
+    :param read_timeout: number of seconds to wait for a response, None for no limit
+    :param retries: number of times a failed connection attempt is retried
+    '''
+    return urllib3.PoolManager(
+        maxsize=pool_size,
+        timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+        retries=urllib3.Retry(total=retries, connect=retries, read=0, redirect=0, status=0,
+                              backoff_factor=RETRY_BACKOFF))
+
+
+class PooledRemoteConnection(RemoteConnection):
+    '''
+    RemoteConnection reusing persistent connections and accepting gzip-compressed responses.
+
+    Selenium's default connection opens a new TCP connection for every command (unless
+    created with keep_alive=True) and receives uncompressed JSON, which is noticeable for
+    remote grids and large responses like page sources and screenshots. Pass it to a driver
+    in place of the server URL:
+
+        driver = WebDriver(PooledRemoteConnection('http://grid:4444/wd/hub'), desired_capabilities)
+    '''
+
+    def __init__(self, remote_server_addr, pool_manager=None, compress=True, resolve_ip=False, **options):
+        '''
+        :param remote_server_addr: URL of the WebDriver server
+        :param pool_manager: urllib3 PoolManager to send requests with, by default a new one created
+            by create_pool_manager() with the remaining keyword arguments
+        :param compress: ask the server for gzip-compressed responses
+        :param resolve_ip: resolve the server host name once, like RemoteConnection does by default
+        '''
+        super(PooledRemoteConnection, self).__init__(remote_server_addr, keep_alive=False, resolve_ip=resolve_ip)
+        self.keep_alive = True
+        self.compress = compress
+        self._conn = pool_manager if pool_manager is not None else create_pool_manager(**options)
+
+    def _request(self, method, url, body=None):
+        parsed_url = parse.urlparse(url)
+        headers = self.get_remote_connection_headers(parsed_url, keep_alive=True)
+        if self.compress:
+            headers['Accept-Encoding'] = 'gzip'
+        if method not in ('POST', 'PUT'):
+            body = None
+        response = self._conn.request(method, url, body=body, headers=headers, redirect=False)
+        try:
+            status = response.status
+            if 300 <= status < 304:
+                return self._request('GET', parse.urljoin(url, response.headers.get('Location')))
+            data = response.data.decode('utf-8')
+            if 399 < status <= 500:
+                return dict(status=status, value=data)
+            if response.headers.get('Content-Type', '').startswith('image/png'):
+                return dict(status=ErrorCode.SUCCESS, value=data)
+            try:
+                data = json.loads(data.strip())
+            except ValueError:
+                return dict(status=ErrorCode.SUCCESS if 199 < status < 300 else ErrorCode.UNKNOWN_ERROR,
+                            value=data.strip())
+            if 'value' not in data:
+                data['value'] = None
+            return data
+        finally:
+            response.release_conn()
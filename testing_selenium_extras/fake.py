@@ -0,0 +1,606 @@
+# -*- coding: utf-8 -*-
+
+'''
+In-process fake of a WebDriver server, serving static HTML documents.
+
+Intended for tests and benchmarks of code using this package that should run without
+a browser, while still counting WebDriver round-trips and simulating their latency:
+
+    driver = create_fake_driver({'http://example.com/': html}, latency=0.03)
+    driver.get('http://example.com/')
+    page = MyPage.load(driver)
+    print(driver.command_executor.round_trips)
+
+FakeWebDriverServer serves the same fake over HTTP, one FakeCommandExecutor per session,
+for code that talks to a WebDriver server directly.
+
+There is no layout engine and no JavaScript interpreter. Element geometry is read from
+the data-rect="x,y,width,height" attribute, visibility and CSS properties are derived from
+inline styles only, and only scripts registered in the executor (by default the scripts
+used by this package) can be executed.
+'''
+
+import base64
+import collections
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+import zlib
+import numpy as np
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import urlparse
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+from . import dom, images, memoize, offline, page_objects, screenshots, snapshot, timeline, visual, waits
+from .dom import parse_style, is_displayed, visible_text
+
+logger = logging.getLogger(__name__)
+
+
+# JSON wire protocol status codes
+STATUS_SUCCESS = 0
+STATUS_NO_SUCH_SESSION = 6
+STATUS_NO_SUCH_ELEMENT = 7
+STATUS_UNKNOWN_COMMAND = 9
+STATUS_STALE_ELEMENT_REFERENCE = 10
+STATUS_JAVASCRIPT_ERROR = 17
+STATUS_NO_ALERT_OPEN = 27
+STATUS_INVALID_SELECTOR = 32
+
+_ELEMENT_KEY = 'ELEMENT'
+
+
+class FakeError(Exception):
+    '''
+    Raised by command handlers to send an error response.
+    '''
+
+    def __init__(self, status, message):
+        super(FakeError, self).__init__(message)
+        self.status = status
+
+
+def get_rect(element):
+    '''
+    Returns geometry of the element declared in its data-rect attribute.
+    '''
+    values = [float(value) for value in element.get('data-rect', '0,0,0,0').split(',')]
+    return dict(zip(('x', 'y', 'width', 'height'), values))
+
+
+def get_css_value(element, name):
+    return parse_style(element).get(name, '')
+
+
+class FakeCommandExecutor(object):
+    '''
+    Command executor answering JSON wire protocol commands from static HTML documents.
+
+    Every command sleeps for latency seconds and is counted in command_counts.
+    '''
+
+    # size of screenshots, which are blank
+    screenshot_size = (800, 600)
+
+    # PNG data returned as screenshot instead of a blank one, if set
+    screenshot = None
+
+    def __init__(self, pages, latency=0, scripts=None):
+        '''
+        :param pages: dictionary mapping URLs to HTML sources
+        :param latency: number of seconds every command takes
+        :param scripts: dictionary mapping scripts to Python callables emulating them, in addition
+            to DEFAULT_SCRIPTS; callables get the executor followed by script arguments, with
+            element references already converted to dom.Elements
+        '''
+        self.pages = dict(pages)
+        self.latency = latency
+        self.scripts = dict(DEFAULT_SCRIPTS)
+        self.scripts.update(scripts or {})
+        self.command_counts = collections.Counter()
+        self.url = 'about:blank'
+        self.source = '<html></html>'
+        self.document = dom.parse_html(self.source)
+        self.navigations = 0
+        # documents are static, tests simulate mutations by incrementing it
+        self.dom_version = 0
+        self._elements = {}
+        self._element_ids = {}
+        self._next_id = 0
+
+    @property
+    def round_trips(self):
+        return sum(self.command_counts.values())
+
+    def reset_counts(self):
+        self.command_counts.clear()
+
+    def navigate(self, url):
+        '''
+        Loads the page of the URL, making all previously returned elements stale.
+        '''
+        self.url = url
+        self.source = self.pages.get(url, '<html></html>')
+        self.document = dom.parse_html(self.source)
+        self.navigations += 1
+        self.dom_version = 0
+        self._elements.clear()
+        self._element_ids.clear()
+
+    def reference(self, element):
+        '''
+        Returns element reference of the dom.Element as sent to the client.
+        '''
+        element_id = self._element_ids.get(id(element))
+        if element_id is None:
+            self._next_id += 1
+            element_id = 'fake-{0}'.format(self._next_id)
+            self._element_ids[id(element)] = element_id
+            self._elements[element_id] = element
+        return {_ELEMENT_KEY: element_id}
+
+    def element(self, element_id):
+        try:
+            return self._elements[element_id]
+        except KeyError:
+            raise FakeError(STATUS_STALE_ELEMENT_REFERENCE, 'Element {0} is stale'.format(element_id))
+
+    def encode(self, value):
+        if isinstance(value, dom.Element):
+            return self.reference(value)
+        elif isinstance(value, (list, tuple)):
+            return [self.encode(item) for item in value]
+        elif isinstance(value, dict):
+            return dict((key, self.encode(item)) for key, item in value.items())
+        return value
+
+    def decode(self, value):
+        if isinstance(value, dict):
+            if _ELEMENT_KEY in value:
+                return self.element(value[_ELEMENT_KEY])
+            return dict((key, self.decode(item)) for key, item in value.items())
+        elif isinstance(value, list):
+            return [self.decode(item) for item in value]
+        return value
+
+    def find(self, context, using, value):
+        '''
+        Finds elements within the context (dom.Document or dom.Element) with given strategy.
+        '''
+        try:
+            return dom.find(context, using, value)
+        except dom.SelectorError as error:
+            raise FakeError(STATUS_INVALID_SELECTOR, str(error))
+
+    def execute(self, command, params):
+        self.command_counts[command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, '_command_' + command, None)
+        if handler is None:
+            return dict(status=STATUS_UNKNOWN_COMMAND, value=dict(message='Unknown command: ' + command))
+        try:
+            value = handler(params or {})
+        except FakeError as error:
+            return dict(status=error.status, value=dict(message=str(error)))
+        return dict(status=STATUS_SUCCESS, sessionId='fake', value=self.encode(value))
+
+    # session and navigation
+
+    def _command_newSession(self, params):
+        return dict(browserName='fake', javascriptEnabled=True)
+
+    def _command_quit(self, params):
+        return None
+
+    def _command_implicitlyWait(self, params):
+        return None
+
+    def _command_setScriptTimeout(self, params):
+        return None
+
+    def _command_setTimeouts(self, params):
+        return None
+
+    def _command_get(self, params):
+        self.navigate(params['url'])
+
+    def _command_getCurrentUrl(self, params):
+        return self.url
+
+    def _command_getTitle(self, params):
+        return self.document.title
+
+    def _command_getPageSource(self, params):
+        return self.source
+
+    def _page_screenshot(self):
+        if self.screenshot is not None:
+            return self.screenshot
+        width, height = self.screenshot_size
+        return images.encode_png(np.full((height, width, 3), 255, dtype=np.uint8))
+
+    def _command_screenshot(self, params):
+        return base64.b64encode(self._page_screenshot()).decode('ascii')
+
+    def _command_elementScreenshot(self, params):
+        rect = get_rect(self.element(params['id']))
+        image = images.decode_png(self._page_screenshot(), (rect['x'], rect['y'], rect['width'], rect['height']))
+        return base64.b64encode(images.encode_png(image)).decode('ascii')
+
+    def _command_getAlertText(self, params):
+        raise FakeError(STATUS_NO_ALERT_OPEN, 'No alert is open')
+
+    # elements
+
+    def _find_one(self, context, params):
+        elements = self.find(context, params['using'], params['value'])
+        if not elements:
+            raise FakeError(STATUS_NO_SUCH_ELEMENT, 'No element matches {0}'.format(params['value']))
+        return elements[0]
+
+    def _command_findElement(self, params):
+        return self._find_one(self.document, params)
+
+    def _command_findElements(self, params):
+        return self.find(self.document, params['using'], params['value'])
+
+    def _command_findChildElement(self, params):
+        return self._find_one(self.element(params['id']), params)
+
+    def _command_findChildElements(self, params):
+        return self.find(self.element(params['id']), params['using'], params['value'])
+
+    def _command_getElementText(self, params):
+        return visible_text(self.element(params['id']))
+
+    def _command_getElementTagName(self, params):
+        return self.element(params['id']).tag
+
+    def _command_getElementAttribute(self, params):
+        return self.element(params['id']).get(params['name'])
+
+    def _command_getElementValueOfCssProperty(self, params):
+        return get_css_value(self.element(params['id']), params['propertyName'])
+
+    def _command_isElementDisplayed(self, params):
+        return is_displayed(self.element(params['id']))
+
+    def _command_isElementEnabled(self, params):
+        return 'disabled' not in self.element(params['id']).attrs
+
+    def _command_isElementSelected(self, params):
+        attrs = self.element(params['id']).attrs
+        return 'checked' in attrs or 'selected' in attrs
+
+    def _command_getElementRect(self, params):
+        return get_rect(self.element(params['id']))
+
+    def _command_getElementSize(self, params):
+        rect = get_rect(self.element(params['id']))
+        return dict(width=rect['width'], height=rect['height'])
+
+    def _command_getElementLocation(self, params):
+        rect = get_rect(self.element(params['id']))
+        return dict(x=rect['x'], y=rect['y'])
+
+    # scripts
+
+    def _run_script(self, params):
+        handler = self.scripts.get(params['script'])
+        if handler is None:
+            raise FakeError(STATUS_JAVASCRIPT_ERROR, 'Script is not supported by the fake driver')
+        return handler(self, *self.decode(params['args']))
+
+    def _command_executeScript(self, params):
+        return self._run_script(params)
+
+    def _command_executeAsyncScript(self, params):
+        return self._run_script(params)
+
+
+# emulations of the property getters of snapshot._GETTERS_SCRIPT
+_GETTERS = dict(
+    text=visible_text,
+    tag_name=lambda e: e.tag,
+    rect=get_rect,
+    displayed=is_displayed,
+    enabled=lambda e: 'disabled' not in e.attrs,
+    selected=lambda e: 'checked' in e.attrs or 'selected' in e.attrs,
+)
+
+
+def _snapshot_elements(executor, elements, properties, attributes, css_properties):
+    return [
+        dict(
+            properties=dict((name, _GETTERS[name](element)) for name in properties),
+            attributes=dict((name, element.get(name)) for name in attributes),
+            css=dict((name, get_css_value(element, name)) for name in css_properties),
+        )
+        for element in elements
+    ]
+
+
+def _select(executor, selector):
+    try:
+        return dom.query_all(executor.document, snapshot._selector_chain(selector))
+    except dom.SelectorError as error:
+        raise FakeError(STATUS_JAVASCRIPT_ERROR, str(error))
+
+
+def _find(executor, chain):
+    try:
+        return dom.query_first(executor.document, chain)
+    except dom.SelectorError as error:
+        raise FakeError(STATUS_JAVASCRIPT_ERROR, str(error))
+
+
+def _collection_chunk(executor, selector, start, end):
+    elements = _select(executor, selector)
+    return [len(elements), elements[start:end]]
+
+
+def _take_columns(executor, selector, properties, attributes, css_properties):
+    rows = _snapshot_elements(executor, _select(executor, selector), properties, attributes, css_properties)
+    columns = dict(properties={}, attributes={}, css={})
+    for kind, names in (('properties', properties), ('attributes', attributes), ('css', css_properties)):
+        for name in names:
+            columns[kind][name] = [row[kind][name] for row in rows]
+    columns['properties'] = dict(
+        (name, [[r['x'], r['y'], r['width'], r['height']] for r in values] if name == 'rect' else values)
+        for name, values in columns['properties'].items())
+    return columns
+
+
+def _dom_version(executor):
+    return '{0}:{1}'.format(executor.navigations, executor.dom_version)
+
+
+def _read_value(executor, element, kind, name):
+    if kind == 'property':
+        value = _GETTERS[name](element)
+    elif kind == 'attribute':
+        value = element.get(name)
+    else:
+        value = get_css_value(element, name)
+    return [_dom_version(executor), value]
+
+
+def _element_box(executor, element):
+    rect = get_rect(element)
+    return [rect['x'], rect['y'], rect['width'], rect['height'], 1]
+
+
+def _evaluate_conditions(executor, spec):
+    kind, args = spec[0], spec[1:]
+    if kind in ('all', 'any', 'none'):
+        results = (_evaluate_conditions(executor, child) for child in args[0])
+        return all(results) if kind == 'all' else any(results) if kind == 'any' else not any(results)
+    if kind == 'title':
+        return executor.document.title == args[0]
+    if kind == 'title_contains':
+        return args[0] in executor.document.title
+    if kind == 'urlhash':
+        return executor.url.partition('#')[2] == args[0]
+    element = _select(executor, args[0])[:1]
+    if not element:
+        return False
+    element = element[0]
+    if kind == 'present':
+        return True
+    if kind == 'visible':
+        return is_displayed(element)
+    if kind == 'text':
+        return visible_text(element) == args[1]
+    if kind == 'text_contains':
+        return args[1] in visible_text(element)
+    if kind == 'class':
+        return args[1] in element.classes
+    raise FakeError(STATUS_JAVASCRIPT_ERROR, 'Unknown condition: {0}'.format(kind))
+
+
+def _record_timeline(executor, targets, key):
+    # static documents are complete when observing starts
+    appeared = dict((name, [0, True]) for name, chain in targets if _find(executor, chain) is not None)
+    return [[name for name, _ in targets if name not in appeared], 0, appeared]
+
+
+# emulations of scripts used by this package; static documents never have pending
+# AJAX calls or running animations
+DEFAULT_SCRIPTS = {
+    page_objects._LOAD_PROBE_SCRIPT: lambda executor, nodes: dom.probe_descriptor_tree(executor.document, nodes),
+    page_objects._COLLECTION_CHUNK_SCRIPT: _collection_chunk,
+    page_objects._FIND_SCRIPT: _find,
+    memoize._VERSION_SCRIPT: _dom_version,
+    memoize._READ_SCRIPT: _read_value,
+    screenshots._ELEMENT_BOX_SCRIPT: _element_box,
+    offline._SERIALIZE_SCRIPT: lambda executor: [executor.source, executor.url],
+    snapshot._SNAPSHOT_SCRIPT: _snapshot_elements,
+    snapshot._COLUMNS_SCRIPT: _take_columns,
+    timeline._TIMELINE_SCRIPT: _record_timeline,
+    timeline._STOP_TIMELINE_SCRIPT: lambda executor, key: None,
+    visual._COMPONENT_BOX_SCRIPT: _element_box,
+    waits._TRACKING_SCRIPT: lambda executor: None,
+    waits._CONDITIONS_SCRIPT: _evaluate_conditions,
+    waits._SETTLE_SCRIPT: lambda executor, kind, timeout, quiet_period: True,
+}
+
+
+def create_fake_driver(pages, latency=0, scripts=None):
+    '''
+    Returns WebDriver talking to a new FakeCommandExecutor, available as its command_executor.
+
+    :param pages: dictionary mapping URLs to HTML sources
+    :param latency: number of seconds every command takes
+    :param scripts: additional script emulations, see FakeCommandExecutor
+    '''
+    executor = FakeCommandExecutor(pages, latency, scripts)
+    driver = WebDriver(executor, desired_capabilities={})
+    executor.reset_counts()
+    return driver
+
+
+# minimum size of responses FakeWebDriverServer compresses, in bytes
+GZIP_MIN_SIZE = 1024
+
+
+def _compile_routes():
+    '''
+    Returns (HTTP method, path regex, command) triples of the commands Selenium sends,
+    routes with fewer path variables first so that fixed path segments take precedence.
+    '''
+    commands = RemoteConnection('http://localhost', resolve_ip=False)._commands
+    routes = []
+    for command, (method, template) in commands.items():
+        pattern = re.sub(r'\\\$(\w+)', r'(?P<\1>[^/]+)', re.escape(template))
+        routes.append((template.count('$'), method, re.compile(pattern + '$'), command))
+    return [route[1:] for route in sorted(routes, key=lambda route: route[:2])]
+
+
+_ROUTES = _compile_routes()
+
+
+class _FakeRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.fake._count('connections', 1)
+
+    def _handle(self):
+        fake = self.server.fake
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        params = json.loads(body.decode('utf-8')) if body else {}
+        response = fake.dispatch(self.command, urlparse(self.path).path, params)
+        data = json.dumps(response).encode('utf-8')
+        compressed = fake.compression and len(data) >= GZIP_MIN_SIZE and \
+            'gzip' in self.headers.get('Accept-Encoding', '')
+        if compressed:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            data = compressor.compress(data) + compressor.flush()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        # counted first, the client may check the counter as soon as it gets the response
+        fake._count('bytes_sent', len(data))
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        logger.debug('%s - ' + format, self.address_string(), *args)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    # many clients open their connections at the same moment
+    request_queue_size = 128
+
+
+class FakeWebDriverServer(object):
+    '''
+    Local HTTP server speaking the JSON wire protocol, backed by FakeCommandExecutors.
+
+    Every new session gets its own executor (available in sessions), so sessions load
+    pages independently. Connections are kept alive and served by separate threads,
+    so latency of concurrent commands overlaps as with a real server. Responses of at
+    least GZIP_MIN_SIZE bytes are gzip-compressed for clients accepting it, unless
+    compression is disabled. The number of accepted connections and of response body
+    bytes sent are counted in connections and bytes_sent:
+
+        with FakeWebDriverServer({'http://example.com/': html}, latency=0.03) as server:
+            driver = WebDriver(server.url, desired_capabilities={})
+    '''
+
+    def __init__(self, pages, latency=0, scripts=None, host='127.0.0.1', port=0, compression=True):
+        '''
+        :param pages: dictionary mapping URLs to HTML sources
+        :param latency: number of seconds every command takes
+        :param scripts: additional script emulations, see FakeCommandExecutor
+        :param host: address to listen on
+        :param port: port to listen on, any free port by default
+        :param compression: compress large responses if the client accepts gzip
+        '''
+        self.pages = pages
+        self.latency = latency
+        self.scripts = scripts
+        self.compression = compression
+        self.sessions = {}
+        self.connections = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingHTTPServer((host, port), _FakeRequestHandler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, counter, value):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + value)
+
+    def start(self):
+        '''
+        Starts serving requests in a background thread.
+        '''
+        self._thread = threading.Thread(target=self._server.serve_forever, name='FakeWebDriverServer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stops the server and closes its socket.
+        '''
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def dispatch(self, method, path, params):
+        '''
+        Executes the command sent as an HTTP request, returning the response body.
+        '''
+        for route_method, pattern, command in _ROUTES:
+            match = pattern.match(path) if route_method == method else None
+            if match is not None:
+                break
+        else:
+            return dict(status=STATUS_UNKNOWN_COMMAND, value=dict(message='Unknown path: ' + path))
+        params = dict(params, **match.groupdict())
+        if command == 'newSession':
+            session_id = uuid.uuid4().hex
+            with self._lock:
+                executor = self.sessions[session_id] = FakeCommandExecutor(self.pages, self.latency, self.scripts)
+        else:
+            session_id = params.get('sessionId')
+            with self._lock:
+                executor = self.sessions.get(session_id)
+            if executor is None:
+                return dict(status=STATUS_NO_SUCH_SESSION, value=dict(message='No session ' + str(session_id)))
+        response = executor.execute(command, params)
+        if command == 'quit':
+            with self._lock:
+                self.sessions.pop(session_id, None)
+        if response.get('status') == STATUS_SUCCESS:
+            response['sessionId'] = session_id
+        return response
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+'''
+Array-based geometry of many element rectangles at once.
+
+Rectangles are handled as (n, 4) float arrays of x, y, width and height, and are treated
+as half-open: a rectangle includes its left and top edges, but not its right and bottom
+edges, so rectangles that merely touch do not overlap.
+'''
+
+import logging
+import numpy as np
+from .page_objects import ElementCollection
+from .snapshot import ElementSnapshot
+from .utils import EPSILON
+
+logger = logging.getLogger(__name__)
+
+
+def as_rects(rects):
+    '''
+    Converts rectangles to an (n, 4) array.
+
+    :param rects: sequence of dictionaries with keys x, y, width and height (as returned by
+        WebElement.rect), sequence of [x, y, width, height] lists (as returned by
+        ElementCollection.extract) or an array
+    :return: float array with one x, y, width, height row per rectangle
+    '''
+    if isinstance(rects, np.ndarray):
+        result = rects.astype(float, copy=False)
+    else:
+        rects = list(rects)
+        if rects and isinstance(rects[0], dict):
+            rects = [(r['x'], r['y'], r['width'], r['height']) for r in rects]
+        result = np.array(rects, dtype=float)
+    return result.reshape(-1, 4)
+
+
+def as_points(points):
+    '''
+    Converts sequence of (x, y) pairs to an (n, 2) array.
+    '''
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def get_rects(elements):
+    '''
+    Reads rectangles of the elements with at most one script call.
+
+    :param elements: ElementCollection, or sequence of WebElements or ElementSnapshots
+    :return: (n, 4) array of rectangles
+    '''
+    if isinstance(elements, ElementCollection):
+        return as_rects(elements.extract(['rect'])['properties']['rect'])
+    elements = list(elements)
+    if not all(isinstance(element, ElementSnapshot) for element in elements):
+        elements = ElementSnapshot.take_all(elements, ['rect'])
+    return as_rects([element.rect for element in elements])
+
+
+def points_inside_rects(points, rects):
+    '''
+    Checks every point against every rectangle.
+
+    :param points: sequence of (x, y) pairs
+    :param rects: rectangles, see as_rects
+    :return: boolean array with a row for each point and a column for each rectangle
+    '''
+    points, rects = as_points(points), as_rects(rects)
+    x, y = points[:, 0:1], points[:, 1:2]
+    left, top = rects[:, 0], rects[:, 1]
+    return (x >= left) & (x < left + rects[:, 2]) & (y >= top) & (y < top + rects[:, 3])
+
+
+def empty_rects(rects, epsilon=EPSILON):
+    '''
+    Checks which rectangles are empty, i.e. at most epsilon wide or high.
+
+    :param rects: rectangles, see as_rects
+    :param epsilon: largest width or height of an empty rectangle
+    :return: boolean array with an item for each rectangle
+    '''
+    rects = as_rects(rects)
+    return (rects[:, 2] <= epsilon) | (rects[:, 3] <= epsilon)
+
+
+def rects_inside_rect(rects, container, epsilon=EPSILON):
+    '''
+    Checks which rectangles lie entirely within the container rectangle.
+
+    :param rects: rectangles, see as_rects
+    :param container: the container rectangle, as a dictionary or an [x, y, width, height] list
+    :param epsilon: tolerance of the comparison of coordinates
+    :return: boolean array with an item for each rectangle
+    '''
+    rects, container = as_rects(rects), as_rects([container])[0]
+    return (rects[:, 0] >= container[0] - epsilon) & (rects[:, 1] >= container[1] - epsilon) & \
+        (rects[:, 0] + rects[:, 2] <= container[0] + container[2] + epsilon) & \
+        (rects[:, 1] + rects[:, 3] <= container[1] + container[3] + epsilon)
+
+
+def find_overlaps(rects, epsilon=EPSILON):
+    '''
+    Finds all pairs of overlapping rectangles.
+
+    Sweeps over rectangles in order of their left edges, keeping the set of rectangles
+    the sweep line currently crosses, so only horizontally overlapping rectangles are
+    compared. Rectangles sharing just an edge, and empty rectangles, do not overlap.
+
+    :param rects: rectangles, see as_rects
+    :param epsilon: overlaps narrower than this are ignored
+    :return: sorted list of (i, j) index pairs, i < j
+    '''
+    rects = as_rects(rects)
+    left, top = rects[:, 0], rects[:, 1]
+    right, bottom = left + rects[:, 2], top + rects[:, 3]
+    non_empty = np.flatnonzero(~empty_rects(rects, epsilon))
+    order = non_empty[np.argsort(left[non_empty], kind='mergesort')]
+    pairs = []
+    active = np.empty(0, dtype=int)
+    for index in order:
+        active = active[right[active] > left[index] + epsilon]
+        hits = active[(top[active] < bottom[index] - epsilon) & (bottom[active] > top[index] + epsilon)]
+        pairs.extend((min(index, hit), max(index, hit)) for hit in hits.tolist())
+        active = np.append(active, index)
+    return sorted((int(i), int(j)) for i, j in pairs)
+
+
+def find_containments(rects, epsilon=EPSILON):
+    '''
+    Finds all pairs of rectangles of which one lies entirely within the other.
+
+    :param rects: rectangles, see as_rects
+    :param epsilon: tolerance of the comparison of coordinates
+    :return: sorted list of (outer, inner) index pairs; identical rectangles are reported
+        in both orders
+    '''
+    rects = as_rects(rects)
+    result = []
+    for i, j in find_overlaps(rects, epsilon):
+        if rects_inside_rect(rects[j:j + 1], rects[i], epsilon)[0]:
+            result.append((i, j))
+        if rects_inside_rect(rects[i:i + 1], rects[j], epsilon)[0]:
+            result.append((j, i))
+    return sorted(result)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+'''
+Minimal PNG codec on top of NumPy and zlib, enough for browser screenshots.
+
+Images are (height, width, channels) uint8 arrays. Decoding supports non-interlaced 8-bit
+grayscale, RGB, palette, grayscale with alpha and RGBA images; encoding writes 8-bit
+grayscale, RGB or RGBA images.
+'''
+
+import logging
+import struct
+import zlib
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+logger = logging.getLogger(__name__)
+
+
+_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# number of channels of PNG color types
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# PNG color types of images with given number of channels
+_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+
+def _chunks(data):
+    '''
+    Yields (type, payload) pairs of the chunks of PNG data.
+    '''
+    if data[:8] != _SIGNATURE:
+        raise ValueError('Not a PNG image')
+    offset = 8
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        yield kind, data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+
+def _paeth(left, up, upper_left):
+    '''
+    Paeth predictor of arrays of left, upper and upper left values.
+    '''
+    dleft, dup = left - upper_left, up - upper_left
+    pa, pb, pc = np.abs(dup), np.abs(dleft), np.abs(dleft + dup)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+
+
+def _unfilter_rows(filters, rows, bpp):
+    '''
+    Reverses the none, sub and up filters, one scanline at a time.
+    '''
+    pixels = np.empty_like(rows)
+    prior = np.zeros(rows.shape[1], dtype=np.uint8)
+    for y, filter_type in enumerate(filters):
+        row = rows[y]
+        if filter_type == 1:
+            row = (np.cumsum(row.reshape(-1, bpp), axis=0, dtype=np.uint32) % 256).astype(np.uint8).reshape(-1)
+        elif filter_type == 2:
+            row = row + prior
+        prior = pixels[y] = row
+    return pixels
+
+
+def _skewed_view(skewed, height, width):
+    '''
+    Returns (height, width, bpp) view of the skewed array with the pixel at (y, x) at
+    [x + y + 2, y + 1].
+    '''
+    strides = skewed.strides
+    return as_strided(skewed[2:, 1:], shape=(height, width, skewed.shape[2]),
+                      strides=(strides[0] + strides[1], strides[0], strides[2]))
+
+
+def _unfilter_diagonals(filters, rows, bpp):
+    '''
+    Reverses any filters, one anti-diagonal of pixels at a time.
+
+    A pixel depends only on the pixels to the left, above and above left of it, i.e. on the
+    two preceding anti-diagonals, so all pixels of a diagonal are unfiltered at once. In the
+    skewed arrays the diagonals are rows: the pixel at (y, x) is stored at [x + y + 2, y + 1].
+    The surrounding entries are never written and stay zero, which is the value PNG filters
+    use for pixels outside of the image.
+    '''
+    height, width = rows.shape[0], rows.shape[1] // bpp
+    skewed_raw = np.zeros((width + height + 1, height + 1, bpp), dtype=np.int16)
+    _skewed_view(skewed_raw, height, width)[...] = rows.reshape(height, width, bpp)
+    skewed = np.zeros_like(skewed_raw)
+    kinds = np.repeat(filters.astype(np.intp)[:, np.newaxis], bpp, axis=1)
+    none = np.zeros((height, bpp), dtype=np.int16)
+    for diagonal in range(2, width + height + 1):
+        y0, y1 = max(0, diagonal - 1 - width), min(height, diagonal - 1)
+        left = skewed[diagonal - 1, y0 + 1:y1 + 1]
+        up = skewed[diagonal - 1, y0:y1]
+        upper_left = skewed[diagonal - 2, y0:y1]
+        prediction = np.choose(kinds[y0:y1], (none[y0:y1], left, up, (left + up) >> 1,
+                                              _paeth(left, up, upper_left)))
+        np.bitwise_and(skewed_raw[diagonal, y0 + 1:y1 + 1] + prediction, 0xff,
+                       out=skewed[diagonal, y0 + 1:y1 + 1])
+    return _skewed_view(skewed, height, width).astype(np.uint8).reshape(height, width * bpp)
+
+
+def decode_png(data, box=None):
+    '''
+    Decodes PNG data into an array; palette images are expanded to RGB(A).
+
+    Filters of PNG scanlines depend only on the pixels to the left and above, so with a
+    box the image is decompressed and unfiltered only up to the bottom right corner of it.
+
+    :param data: PNG file contents
+    :param box: (x, y, width, height) part of the image to return, in pixels, see crop()
+    :return: (height, width, channels) uint8 array
+    '''
+    header, palette, transparency, compressed = None, None, None, []
+    for kind, payload in _chunks(data):
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', payload)
+        elif kind == b'PLTE':
+            palette = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b'tRNS':
+            transparency = np.frombuffer(payload, dtype=np.uint8)
+        elif kind == b'IDAT':
+            compressed.append(payload)
+        elif kind == b'IEND':
+            break
+    if header is None:
+        raise ValueError('PNG header is missing')
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or interlace or color_type not in _CHANNELS:
+        raise ValueError('Unsupported PNG format: bit depth {0}, color type {1}, interlace {2}'.format(
+            bit_depth, color_type, interlace))
+    bpp = _CHANNELS[color_type]
+    stride = width * bpp
+    rows, columns = height, width
+    if box is not None:
+        x, y, box_width, box_height = [int(round(value)) for value in box]
+        rows = min(height, max(0, y + box_height))
+        columns = min(width, max(0, x + box_width))
+    raw = zlib.decompressobj().decompress(b''.join(compressed), rows * (stride + 1))
+    raw = np.frombuffer(raw, dtype=np.uint8)[:rows * (stride + 1)].reshape(rows, stride + 1)
+    filters = raw[:, 0]
+    raw = raw[:, 1:columns * bpp + 1]
+    if filters.max(initial=0) > 4:
+        raise ValueError('Invalid PNG filter type: {0}'.format(filters.max()))
+    if filters.max(initial=0) > 2:
+        # the average and Paeth filters depend on previous pixels of the same row
+        pixels = _unfilter_diagonals(filters, raw, bpp)
+    else:
+        pixels = _unfilter_rows(filters, raw, bpp)
+    image = pixels.reshape(rows, columns, bpp)
+    if color_type == 3:
+        if palette is None:
+            raise ValueError('PNG palette is missing')
+        indexes = image[:, :, 0]
+        if transparency is not None:
+            alpha = np.full(len(palette), 255, dtype=np.uint8)
+            alpha[:len(transparency)] = transparency[:len(palette)]
+            palette = np.column_stack([palette, alpha])
+        image = palette[indexes]
+    return crop(image, box) if box is not None else image
+
+
+def _chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + \
+        struct.pack('>I', zlib.crc32(kind + payload) & 0xffffffff)
+
+
+def read_chunk(data, kind):
+    '''
+    Returns payload of the first chunk of given type in PNG data, or None if there is none.
+
+    :param data: PNG file contents
+    :param kind: chunk type, e.g. b'tEXt'
+    '''
+    for chunk_kind, payload in _chunks(data):
+        if chunk_kind == kind:
+            return payload
+    return None
+
+
+def _filter(rows, filter_type, bpp):
+    '''
+    Filters scanlines with given filter type, or a sequence of types, one per scanline.
+    '''
+    rows = rows.astype(np.int16)
+    left, up, upper_left = np.zeros_like(rows), np.zeros_like(rows), np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+    up[1:] = rows[:-1]
+    upper_left[1:, bpp:] = rows[:-1, :-bpp]
+    predictions = (0, left, up, (left + up) >> 1, _paeth(left, up, upper_left))
+    kinds = np.asarray(filter_type, dtype=np.intp)
+    if kinds.min(initial=0) < 0 or kinds.max(initial=0) > 4:
+        raise ValueError('Invalid PNG filter type: {0}'.format(filter_type))
+    if kinds.ndim:
+        prediction = np.choose(kinds[:, np.newaxis], predictions)
+    else:
+        prediction = predictions[kinds]
+    return ((rows - prediction) & 0xff).astype(np.uint8)
+
+
+def encode_png(image, compression=6, chunks=(), filter_type=2):
+    '''
+    Encodes an image into PNG data.
+
+    :param image: (height, width) or (height, width, channels) uint8 array, 1 to 4 channels
+    :param compression: zlib compression level, 0 to 9
+    :param chunks: additional (type, payload) chunks written after the image data
+    :param filter_type: PNG filter type of the scanlines (0 none, 1 sub, 2 up, 3 average,
+        4 Paeth), or a sequence of types, one per scanline
+    :return: PNG file contents
+    '''
+    image = np.asarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        image = image[:, :, np.newaxis]
+    height, width, channels = image.shape
+    if channels not in _COLOR_TYPES:
+        raise ValueError('Unsupported number of channels: {0}'.format(channels))
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = filter_type
+    filtered[:, 1:] = _filter(image.reshape(height, width * channels), filter_type, channels)
+    header = struct.pack('>IIBBBBB', width, height, 8, _COLOR_TYPES[channels], 0, 0, 0)
+    return _SIGNATURE + _chunk(b'IHDR', header) + \
+        _chunk(b'IDAT', zlib.compress(filtered.tobytes(), compression)) + \
+        b''.join(_chunk(kind, payload) for kind, payload in chunks) + _chunk(b'IEND', b'')
+
+
+def crop(image, box):
+    '''
+    Returns part of the image inside the box, clipped to the image.
+
+    :param image: (height, width, channels) array
+    :param box: (x, y, width, height) in pixels
+    '''
+    x, y, width, height = [int(round(value)) for value in box]
+    x0, y0 = max(0, x), max(0, y)
+    return image[y0:max(y0, y + height), x0:max(x0, x + width)]
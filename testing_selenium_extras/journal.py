@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+'''
+Append-only JSON lines journal of assertion outcomes.
+
+Every assertion made through JournalingAssertionMixin is recorded with its timestamp,
+process and thread, name, outcome, parameters and duration. Records are buffered and
+serialized in batches; each batch is appended to the file with a single write, so
+threads and processes (e.g. parallel test workers) can share one journal file:
+
+    class MyTestCase(JournalingAssertionMixin, unittest.TestCase):
+        journal = AssertionJournal('assertions.jsonl')
+
+and afterwards:
+
+    summary = summarize(read_journal(['assertions.jsonl']))
+'''
+
+import atexit
+import functools
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from timeit import default_timer
+from .assertions import AssertionMixin
+from .utils import percentile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# default number of buffered records that triggers writing them
+BATCH_SIZE = 100
+
+# default maximum number of seconds records are kept in the buffer
+FLUSH_INTERVAL = 1.0
+
+PASSED = 'passed'
+FAILED = 'failed'
+
+_JSON_SEPARATORS = (',', ':')
+
+# journals that may have buffered records, closed at interpreter exit
+_open_journals = weakref.WeakSet()
+
+
+@atexit.register
+def _close_journals():
+    for journal in list(_open_journals):
+        journal.close()
+
+
+def _flush_journal(reference):
+    '''
+    Flushes the journal, if it still exists, from the flush timer.
+    '''
+    journal = reference()
+    if journal is not None:
+        journal._flush_by_timer()
+
+
+class AssertionJournal(object):
+    '''
+    Buffered writer of the assertion journal file.
+
+    Records are written when batch_size of them are buffered, when the oldest one is older
+    than flush_interval seconds (by a timer thread), on flush() and close(), when the
+    journal is garbage collected, and at interpreter exit. At most one timer is pending
+    per journal; it is started with the first record buffered after the previous one fired.
+    '''
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        '''
+        :param path: journal file, appended to if it exists
+        :param batch_size: number of buffered records that triggers writing them
+        :param flush_interval: maximum number of seconds records are kept in the buffer
+        '''
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffered_since = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._fd = None
+        self._timer = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, caller, outcome, params, duration=None):
+        '''
+        Adds record of an assertion outcome.
+
+        :param caller: name of the assertion method
+        :param outcome: PASSED or FAILED
+        :param params: dictionary describing the assertion; values that are not
+            JSON-serializable are written as their repr()
+        :param duration: number of seconds the assertion took, if known
+        '''
+        now = time.time()
+        entry = (now, threading.current_thread().name, caller, outcome, params, duration)
+        with self._lock:
+            if os.getpid() != self._pid:
+                # forked process, records buffered by the parent are written by the parent
+                del self._buffer[:]
+                self._pid, self._fd, self._timer = os.getpid(), None, None
+            self._buffer.append(entry)
+            if self._buffered_since is None:
+                self._buffered_since = now
+                _open_journals.add(self)
+            if self._timer is None:
+                # references the journal weakly, so that it can be collected while waiting;
+                # records buffered after a batch is written are flushed by the pending timer
+                self._timer = threading.Timer(self.flush_interval, _flush_journal, [weakref.ref(self)])
+                self._timer.daemon = True
+                self._timer.start()
+            if len(self._buffer) < self.batch_size and now - self._buffered_since < self.flush_interval:
+                return
+            self._write_buffer()
+
+    def flush(self):
+        '''
+        Writes all buffered records.
+        '''
+        with self._lock:
+            self._write_buffer()
+
+    def close(self):
+        '''
+        Writes all buffered records and closes the file.
+        '''
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._write_buffer()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        _open_journals.discard(self)
+
+    def _flush_by_timer(self):
+        with self._lock:
+            # the timer may have been cancelled, and another one started, while waiting for the lock
+            if self._timer is threading.current_thread():
+                self._timer = None
+                self._write_buffer()
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        pid = self._pid
+        data = ''.join(
+            json.dumps(dict(timestamp=timestamp, pid=pid, thread=thread, caller=caller,
+                            outcome=outcome, params=params, duration=duration),
+                       separators=_JSON_SEPARATORS, default=repr) + '\n'
+            for timestamp, thread, caller, outcome, params, duration in self._buffer).encode('utf-8')
+        del self._buffer[:]
+        self._buffered_since = None
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            while data:
+                data = data[os.write(self._fd, data):]
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+def _timed(method):
+    '''
+    Wraps assertion method so that its start time is known when the outcome is reported.
+    '''
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        self._assertion_started = default_timer()
+        return method(self, *args, **kwargs)
+    return timed
+
+
+class JournalingAssertionMixin(AssertionMixin):
+    '''
+    AssertionMixin recording outcomes of all assertions in the journal, if one is set.
+
+    Successes are then recorded in the journal only, instead of being logged; failures
+    are logged and raise AssertionError as usual.
+    '''
+
+    journal = None
+
+    _assertion_started = None
+
+    def _duration(self):
+        started, self._assertion_started = self._assertion_started, None
+        return default_timer() - started if started is not None else None
+
+    def _failure(self, params, caller=None):
+        caller = caller or sys._getframe(1).f_code.co_name
+        if self.journal is not None:
+            self.journal.record(caller, FAILED, params, self._duration())
+        super(JournalingAssertionMixin, self)._failure(params, caller)
+
+    def _success(self, params, caller=None):
+        if self.journal is None:
+            super(JournalingAssertionMixin, self)._success(params, caller)
+            return
+        caller = caller or sys._getframe(1).f_code.co_name
+        self.journal.record(caller, PASSED, params, self._duration())
+
+
+for _name, _method in list(vars(AssertionMixin).items()):
+    if _name.startswith('assert_'):
+        setattr(JournalingAssertionMixin, _name, _timed(_method))
+del _name, _method
+
+
+def read_journal(paths):
+    '''
+    Yields records of the journal files, skipping lines that cannot be parsed
+    (e.g. the last line of a journal still being written).
+
+    :param paths: iterable of journal file paths
+    :return: iterator of dictionaries with keys timestamp, pid, thread, caller, outcome,
+        params and duration
+    '''
+    for path in paths:
+        with io.open(path, encoding='utf-8') as fp:
+            for number, line in enumerate(fp, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning('Skipping malformed line %d of journal %s', number, path)
+
+
+def _stats(records):
+    durations = sorted(record['duration'] for record in records if record.get('duration') is not None)
+    passed = sum(1 for record in records if record['outcome'] == PASSED)
+    return dict(
+        count=len(records),
+        passed=passed,
+        failed=len(records) - passed,
+        total_time=sum(durations),
+        p50=percentile(durations, 0.5),
+        p95=percentile(durations, 0.95),
+    )
+
+
+def summarize(records):
+    '''
+    Aggregates journal records into pass/fail counts and duration statistics (in seconds),
+    as a whole and per assertion method.
+
+    :param records: iterable of records, e.g. from read_journal()
+    :return: dictionary with total and callers keys
+    '''
+    by_caller = {}
+    records = list(records)
+    for record in records:
+        by_caller.setdefault(record['caller'], []).append(record)
+    return dict(
+        total=_stats(records),
+        callers=dict((caller, _stats(group)) for caller, group in by_caller.items()),
+    )
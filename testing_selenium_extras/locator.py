@@ -1,51 +1,247 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
+from . import utils
+from .cache import unwrap_element
 
 logger = logging.getLogger(__name__)
 
 
+# JavaScript functions implementing locator steps. Node steps are applied to every element
+# of the current set and their results are merged (preserving order, without duplicates),
+# set steps transform the whole set at once.
+_NODE_STEPS = {
+    'css': 'function (node, arg) { return node.querySelectorAll(arg); }',
+    'xpath': '''function (node, arg) {
+        var snapshot = document.evaluate(arg, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null), result = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            result.push(snapshot.snapshotItem(i));
+        }
+        return result;
+    }''',
+    'link_text': '''function (node, arg) {
+        return Array.prototype.filter.call(node.querySelectorAll('a'), function (link) {
+            return link.innerText.trim() === arg;
+        });
+    }''',
+    'partial_link_text': '''function (node, arg) {
+        return Array.prototype.filter.call(node.querySelectorAll('a'), function (link) {
+            return link.innerText.indexOf(arg) >= 0;
+        });
+    }''',
+    'children': '''function (node, arg) {
+        return Array.prototype.filter.call(node.children, function (child) {
+            return arg === null || child.matches(arg);
+        });
+    }''',
+    'filter': 'function (node, arg) { return node.matches(arg) ? [node] : []; }',
+    'parent': 'function (node) { return node.parentElement ? [node.parentElement] : []; }',
+    'closest': 'function (node, arg) { var found = node.closest(arg); return found ? [found] : []; }',
+}
+
+_SET_STEPS = {
+    'eq': 'function (nodes, arg) { var node = nodes[arg < 0 ? nodes.length + arg : arg]; return node ? [node] : []; }',
+}
+
+_PRELUDE = '''
+function each(nodes, step, arg) {
+    var result = [], seen = new Set(), found, i, j;
+    for (i = 0; i < nodes.length; i++) {
+        found = step(nodes[i], arg);
+        for (j = 0; j < found.length; j++) {
+            if (!seen.has(found[j])) {
+                seen.add(found[j]);
+                result.push(found[j]);
+            }
+        }
+    }
+    return result;
+}
+var nodes = [arguments[0] || document];
+'''
+
+# compiled scripts, keyed by the sequence of step names of a chain
+_PLAN_CACHE = utils.LRUCache(maxsize=256)
+
+
+def _quote(value):
+    '''
+    Returns value as a double-quoted CSS string.
+    '''
+    return '"{0}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def _compile(operations):
+    '''
+    Compiles a sequence of step names into a script. Step arguments are passed to the script
+    as arguments[1:], arguments[0] being the root element or null for the whole document.
+    '''
+    lines = [_PRELUDE]
+    for index, operation in enumerate(operations, 1):
+        if operation in _SET_STEPS:
+            lines.append('nodes = ({0})(nodes, arguments[{1}]);'.format(_SET_STEPS[operation], index))
+        else:
+            lines.append('nodes = each(nodes, {0}, arguments[{1}]);'.format(_NODE_STEPS[operation], index))
+    lines.append('return nodes;')
+    return '\n'.join(lines)
+
+
 class Locator(object):
     '''
     A jQuery-like WebElement locator.
 
-    TODO To be copied from CaMon.
+    Locators are immutable chains of steps, started with one of the by_* class methods and
+    continued with find(), children(), filter(), parent() etc., e.g.:
+
+        Locator.by_css('table.results').find('tr').filter('.error').parent()
+
+    The whole chain is compiled into a single script, so resolving it costs one round-trip
+    no matter how long the chain is. Compiled scripts depend only on the kinds of steps,
+    not on their arguments, and are memoized in a bounded LRU cache.
     '''
 
-    def __init__(self, driver):
+    def __init__(self, driver=None, steps=()):
         self._driver = driver
+        self._steps = tuple(steps)
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self._steps)
+
+    def __eq__(self, other):
+        return isinstance(other, Locator) and self._steps == other._steps
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._steps)
+
+    def _chain(self, operation, argument=None):
+        return self.__class__(self._driver, self._steps + ((operation, argument),))
+
+    def bind(self, driver):
+        '''
+        Returns the same locator bound to the given driver.
+        '''
+        return self.__class__(driver, self._steps)
+
+    def find(self, selector):
+        '''
+        Descendants of the current elements matching the CSS selector.
+        '''
+        return self._chain('css', selector)
+
+    def find_by_xpath(self, selector):
+        '''
+        Elements found evaluating the XPath expression relative to each of the current elements.
+        '''
+        return self._chain('xpath', selector)
+
+    def children(self, selector=None):
+        '''
+        Children of the current elements, optionally only those matching the CSS selector.
+        '''
+        return self._chain('children', selector)
+
+    def filter(self, selector):
+        '''
+        Current elements matching the CSS selector.
+        '''
+        return self._chain('filter', selector)
 
     def parent(self):
-        pass
+        '''
+        Parents of the current elements.
+        '''
+        return self._chain('parent')
+
+    def closest(self, selector):
+        '''
+        Closest ancestors (or current elements themselves) matching the CSS selector.
+        '''
+        return self._chain('closest', selector)
+
+    def eq(self, index):
+        '''
+        Single element at the given index, negative indices count from the end.
+        '''
+        return self._chain('eq', index)
+
+    def first(self):
+        return self.eq(0)
+
+    def last(self):
+        return self.eq(-1)
+
+    def compile(self):
+        '''
+        Returns the script resolving this locator and the arguments it has to be called with.
+        '''
+        operations = tuple(operation for operation, _ in self._steps)
+        script = _PLAN_CACHE.get(operations, _compile)
+        return script, [argument for _, argument in self._steps]
+
+    def find_elements(self, context=None):
+        '''
+        Resolves the locator with a single script call.
+
+        :param context: WebDriver to search the whole document, or WebElement to search within;
+            defaults to the driver the locator is bound to
+        :return: list of WebElements
+        '''
+        context = context if context is not None else self._driver
+        if context is None:
+            raise TypeError('Locator is not bound to a driver')
+        root = unwrap_element(context)
+        if isinstance(root, WebElement):
+            # WebElements hold the driver they belong to in the parent attribute
+            driver = root.parent
+        else:
+            driver, root = context, None
+        script, arguments = self.compile()
+        return driver.execute_script(script, root, *arguments)
+
+    def find_element(self, context=None):
+        '''
+        Resolves the locator with a single script call, returning the first element found.
+
+        :raise NoSuchElementException: if no element matches
+        '''
+        elements = self.find_elements(context)
+        if not elements:
+            raise NoSuchElementException('No element matches {0!r}'.format(self))
+        return elements[0]
 
     @classmethod
     def by_id(cls, selector):
-        pass
+        return cls(steps=[('css', '[id={0}]'.format(_quote(selector)))])
 
     @classmethod
     def by_xpath(cls, selector):
-        pass
+        return cls(steps=[('xpath', selector)])
 
     @classmethod
     def by_css(cls, selector):
-        pass
+        return cls(steps=[('css', selector)])
 
     @classmethod
     def by_class_name(cls, selector):
-        pass
+        return cls(steps=[('css', '[class~={0}]'.format(_quote(selector)))])
 
     @classmethod
     def by_tag_name(cls, selector):
-        pass
+        return cls(steps=[('css', selector)])
 
     @classmethod
     def by_name(cls, selector):
-        pass
+        return cls(steps=[('css', '[name={0}]'.format(_quote(selector)))])
 
     @classmethod
     def by_link_text(cls, selector):
-        pass
+        return cls(steps=[('link_text', selector)])
 
     @classmethod
     def by_partial_link_text(cls, selector):
-        pass
+        return cls(steps=[('partial_link_text', selector)])
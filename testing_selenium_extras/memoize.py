@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+'''
+Memoization of element properties, invalidated by a DOM version number kept in the page.
+
+A MutationObserver counts DOM mutations of the document; element properties read through
+MemoizedElement are cached together with the version they were read at and reused while
+the version stays the same:
+
+    element = MemoizedElement(page.header.logo)
+    assertions.assert_element_css_class_contains(element, 'logo')     # reads the class
+    assertions.assert_element_css_class_not_contains(element, 'hidden')  # no round-trip
+
+Every read returns the version along with the value. By default, a cached value costs one
+round-trip that checks the version. Inside a DomVersion.pinned() block the version is
+checked once and trusted until the block exits. A DomVersion created with max_age trusts
+the last version seen without asking the page again until the driver sends a command that
+may change the page (anything but reading page and element state) or max_age seconds pass;
+changes made by the page itself (timers, responses of AJAX calls) go unnoticed meanwhile.
+'''
+
+import contextlib
+import logging
+from timeit import default_timer
+from selenium.webdriver.remote.command import Command
+from .cache import unwrap_element
+from .executors import CommandExecutorWrapper
+from .page_objects import _FIND_SCRIPT
+from .snapshot import _GETTERS_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+# default number of seconds the last seen DOM version is trusted for when no commands that
+# may change the page were sent; 0 asks the page on every check, so that changes made by the
+# page itself (timers, animations, responses of AJAX calls) are always noticed
+MAX_AGE = 0
+
+# commands that only read page or element state
+_READ_ONLY_COMMANDS = frozenset([
+    Command.FIND_ELEMENT, Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS,
+    Command.GET_TITLE, Command.GET_CURRENT_URL, Command.GET_PAGE_SOURCE, Command.SCREENSHOT,
+    Command.GET_ELEMENT_TEXT, Command.GET_ELEMENT_TAG_NAME, Command.GET_ELEMENT_ATTRIBUTE,
+    Command.GET_ELEMENT_PROPERTY, Command.GET_ELEMENT_VALUE_OF_CSS_PROPERTY, Command.GET_ELEMENT_RECT,
+    Command.GET_ELEMENT_SIZE, Command.GET_ELEMENT_LOCATION, Command.IS_ELEMENT_DISPLAYED,
+    Command.IS_ELEMENT_ENABLED, Command.IS_ELEMENT_SELECTED, Command.ELEMENT_SCREENSHOT,
+])
+
+
+# Installs (once per document) the DOM version counter. Besides DOM mutations, events
+# that change layout without mutating the DOM increment it too. The version is reported
+# together with a random document id, so versions of different documents never match.
+_OBSERVER_SCRIPT = '''
+if (!window.__seleniumExtrasDom) {
+    var dom = window.__seleniumExtrasDom = {id: Math.random().toString(36).slice(2), version: 0};
+    var increment = function () { dom.version++; };
+    dom.observer = new MutationObserver(increment);
+    dom.observer.observe(document, {attributes: true, childList: true, characterData: true, subtree: true});
+    ['resize', 'load', 'animationend', 'transitionend'].forEach(function (type) {
+        window.addEventListener(type, increment, true);
+    });
+}
+var dom = window.__seleniumExtrasDom;
+if (dom.observer.takeRecords().length) {
+    dom.version++;
+}
+'''
+
+# Returns the current DOM version.
+_VERSION_SCRIPT = _OBSERVER_SCRIPT + '''
+return dom.id + ':' + dom.version;
+'''
+
+# Reads a value of the element (the first argument). The second argument is the kind of
+# the value ('property', see snapshot.PROPERTIES, 'attribute' or 'css') and the third one
+# its name. Returns the DOM version and the value.
+_READ_SCRIPT = _OBSERVER_SCRIPT + _GETTERS_SCRIPT + '''
+var element = arguments[0], kind = arguments[1], name = arguments[2], value;
+if (kind === 'property') {
+    value = getters[name](element);
+} else if (kind === 'attribute') {
+    value = getAttribute(element, name);
+} else {
+    value = window.getComputedStyle(element).getPropertyValue(name);
+}
+return [dom.id + ':' + dom.version, value];
+'''
+
+# scripts of this module and element lookups of page objects, which do not change the page
+_READ_ONLY_SCRIPTS = frozenset([_VERSION_SCRIPT, _READ_SCRIPT, _FIND_SCRIPT])
+
+
+class _MutationTracker(CommandExecutorWrapper):
+    '''
+    Command executor counting commands that may change the page.
+    '''
+
+    def __init__(self, executor):
+        super(_MutationTracker, self).__init__(executor)
+        self._commands = 0
+
+    @property
+    def commands(self):
+        return self._commands
+
+    def execute(self, command, params):
+        if command not in _READ_ONLY_COMMANDS and \
+                not (params and params.get('script') in _READ_ONLY_SCRIPTS):
+            self._commands += 1
+        return self._executor.execute(command, params)
+
+
+def _mutation_tracker(driver):
+    '''
+    Returns the _MutationTracker of the driver, installing it on first use.
+    '''
+    executor = driver.command_executor
+    while isinstance(executor, CommandExecutorWrapper):
+        if isinstance(executor, _MutationTracker):
+            return executor
+        executor = executor._executor
+    return _MutationTracker.install(driver)
+
+
+class DomVersion(object):
+    '''
+    DOM version of the document loaded in a driver.
+    '''
+
+    def __init__(self, driver, max_age=MAX_AGE):
+        '''
+        :param driver: WebDriver, whose command executor gets wrapped to notice commands
+            that may change the page
+        :param max_age: number of seconds the last seen version is trusted for while no
+            commands that may change the page are sent, 0 (the default) to ask the page on
+            every check
+        '''
+        self.driver = driver
+        self.max_age = max_age
+        self._pinned = None
+        self._tracker = _mutation_tracker(driver)
+        self._seen = None
+
+    def observe(self, version):
+        '''
+        Records a version returned by a script, e.g. together with a read value.
+        '''
+        self._seen = (version, self._tracker.commands, default_timer())
+
+    def check(self):
+        '''
+        Returns the current DOM version, or the pinned one inside a pinned() block.
+
+        With max_age, the last seen version is returned without a round-trip if no commands
+        that may change the page were sent since it was seen and it is not older than max_age.
+        '''
+        if self._pinned is not None:
+            return self._pinned
+        if self.max_age > 0 and self._seen is not None:
+            version, commands, seen_at = self._seen
+            if commands == self._tracker.commands and default_timer() - seen_at <= self.max_age:
+                return version
+        version = self.driver.execute_script(_VERSION_SCRIPT)
+        self.observe(version)
+        return version
+
+    @property
+    def is_pinned(self):
+        return self._pinned is not None
+
+    @contextlib.contextmanager
+    def pinned(self):
+        '''
+        Context manager checking the version once and reusing it until the block exits.
+
+        Intended for a series of assertions that do not change the page; mutations made
+        inside the block are not noticed until it exits.
+        '''
+        if self._pinned is not None:
+            yield self._pinned
+            return
+        self._pinned = self.driver.execute_script(_VERSION_SCRIPT)
+        self.observe(self._pinned)
+        try:
+            yield self._pinned
+        finally:
+            self._pinned = None
+
+
+class MemoizedElement(object):
+    '''
+    Proxy of a WebElement caching its properties, attributes and CSS property values
+    for as long as the DOM version of the page does not change.
+
+    Values are read by JavaScript in the page, like in ElementSnapshot. The tag name never
+    changes, so it is read only once. All other attributes and methods of the element,
+    e.g. click(), are forwarded to the element.
+    '''
+
+    def __init__(self, element, dom_version=None):
+        '''
+        :param element: WebElement or CachedElement
+        :param dom_version: DomVersion of the page, shared by elements of the same page
+            so they can be checked within one pinned() block
+        '''
+        self.element = element
+        self.dom_version = dom_version or DomVersion(element.parent)
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+
+    @property
+    def wrapped_element(self):
+        return unwrap_element(self.element)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.element, name)
+
+    def __eq__(self, other):
+        return self.wrapped_element == unwrap_element(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.wrapped_element)
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self.element)
+
+    def invalidate(self):
+        '''
+        Drops all memoized values.
+        '''
+        self._values.clear()
+
+    def _read(self, kind, name):
+        key = (kind, name)
+        entry = self._values.get(key)
+        if entry is not None and (key == ('property', 'tag_name') or entry[0] == self.dom_version.check()):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        version, value = self.dom_version.driver.execute_script(_READ_SCRIPT, self.wrapped_element, kind, name)
+        if self.dom_version.is_pinned:
+            # read inside the block, so valid for as long as the pinned version
+            version = self.dom_version.check()
+        else:
+            self.dom_version.observe(version)
+        self._values[key] = (version, value)
+        return value
+
+    @property
+    def text(self):
+        return self._read('property', 'text')
+
+    @property
+    def tag_name(self):
+        return self._read('property', 'tag_name')
+
+    @property
+    def rect(self):
+        return self._read('property', 'rect')
+
+    @property
+    def location(self):
+        rect = self.rect
+        return dict(x=rect['x'], y=rect['y'])
+
+    @property
+    def size(self):
+        rect = self.rect
+        return dict(width=rect['width'], height=rect['height'])
+
+    def is_displayed(self):
+        return self._read('property', 'displayed')
+
+    def is_enabled(self):
+        return self._read('property', 'enabled')
+
+    def is_selected(self):
+        return self._read('property', 'selected')
+
+    def get_attribute(self, name):
+        return self._read('attribute', name)
+
+    def value_of_css_property(self, property_name):
+        return self._read('css', property_name)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+'''
+Long-running synthetic monitoring: page checks repeated on intervals for days or weeks.
+
+Memory use of a monitor does not grow with the number of runs. Drivers are reused from
+a DriverPool, results are folded into per-check counters and fixed-size latency
+histograms as soon as a check finishes, and nothing else of the run is kept:
+
+    monitor = Monitor(DriverPool(create_driver, max_size=2))
+    monitor.schedule(PageCheck('https://example.com/', HomePage, [check_logo]), interval=30)
+    monitor.run()   # until monitor.stop() is called from another thread
+
+    for line in monitor.summary():
+        print(line)
+'''
+
+import array
+import heapq
+import itertools
+import logging
+import math
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import WebDriverException
+from six.moves import queue
+from .utils import nearest_rank
+
+logger = logging.getLogger(__name__)
+
+
+# default smallest distinguishable latency, in seconds
+RESOLUTION = 0.001
+
+# default largest trackable latency, in seconds; longer latencies are counted as this one
+HIGHEST_LATENCY = 3600.0
+
+# marks that the monitor was asked to stop
+_STOP = object()
+
+
+class LatencyHistogram(object):
+    '''
+    Fixed-size histogram of latencies with bounded relative error, after HdrHistogram.
+
+    Latencies are counted in log-linear buckets: up to 2 * 10 ** significant_figures
+    resolution units every unit has its own bucket, above that every power of two is
+    split into the same number of buckets. Percentiles are therefore accurate to
+    significant_figures decimal digits, and memory use is set by the range of tracked
+    latencies (about 2000 counters by default), not by the number of recorded values.
+    '''
+
+    __slots__ = ('resolution', 'highest', '_sub_bits', '_half', '_counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, highest=HIGHEST_LATENCY, resolution=RESOLUTION, significant_figures=2):
+        '''
+        :param highest: largest trackable latency, in seconds
+        :param resolution: smallest distinguishable latency, in seconds
+        :param significant_figures: number of significant decimal digits kept, 1 to 5
+        '''
+        if not 1 <= significant_figures <= 5:
+            raise ValueError('Number of significant figures must be between 1 and 5')
+        if resolution <= 0 or highest < resolution:
+            raise ValueError('Invalid latency range: {0} to {1}'.format(resolution, highest))
+        self.resolution = resolution
+        self.highest = highest
+        self._sub_bits = int(math.ceil(math.log(2 * 10 ** significant_figures, 2)))
+        self._half = 1 << (self._sub_bits - 1)
+        self._counts = array.array('L', [0]) * (self._index(int(highest / resolution)) + 1)
+        self.reset()
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return '<{0} count={1} p50={2} max={3}>'.format(
+            self.__class__.__name__, self.count, self.percentile(0.5), self.max)
+
+    def _index(self, units):
+        '''
+        Returns index of the bucket counting given number of resolution units.
+        '''
+        if units < 2 * self._half:
+            return units
+        exponent = units.bit_length() - self._sub_bits
+        return exponent * self._half + (units >> exponent)
+
+    def _bucket_value(self, index):
+        '''
+        Returns the latency, in seconds, in the middle of the bucket with given index.
+        '''
+        if index < 2 * self._half:
+            return (index + 0.5) * self.resolution
+        exponent = index // self._half - 1
+        lowest = (index - exponent * self._half) << exponent
+        return (lowest + (1 << exponent) / 2.0) * self.resolution
+
+    def reset(self):
+        '''
+        Forgets all recorded latencies.
+        '''
+        for index in range(len(self._counts)):
+            self._counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, latency):
+        '''
+        Counts a latency, in seconds.
+        '''
+        if latency < 0:
+            raise ValueError('Latency must not be negative')
+        index = min(self._index(int(latency / self.resolution)), len(self._counts) - 1)
+        self._counts[index] += 1
+        self.count += 1
+        self.total += latency
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    def merge(self, other):
+        '''
+        Adds latencies counted by another histogram with the same range and precision.
+        '''
+        if (other.resolution, other.highest, other._sub_bits) != (self.resolution, self.highest, self._sub_bits):
+            raise ValueError('Histograms have different ranges or precision')
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, fraction):
+        '''
+        Returns the latency at given fraction of recorded latencies (nearest-rank method).
+
+        :param fraction: number between 0 and 1, e.g. 0.95 for the 95th percentile
+        :return: the latency in seconds, or None if nothing was recorded
+        '''
+        if not self.count:
+            return None
+        rank = nearest_rank(fraction, self.count)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if index == len(self._counts) - 1:
+                    # the last bucket also counts latencies above the range
+                    return self.max
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def stats(self):
+        '''
+        Returns count, mean, min, max and 50th, 95th and 99th percentile of latencies.
+        '''
+        return dict(count=self.count, mean=self.mean, min=self.min, max=self.max,
+                    p50=self.percentile(0.5), p95=self.percentile(0.95), p99=self.percentile(0.99))
+
+
+class MonitoredCheck(object):
+    '''
+    Page check scheduled by a Monitor, with the statistics of its runs.
+
+    Results of runs are not kept; only counters, the latency histogram and the description
+    of the most recent error are, so that references to page objects, elements and
+    tracebacks held by results do not outlive the run.
+    '''
+
+    __slots__ = ('check', 'interval', 'histogram', 'runs', 'failures', 'consecutive_failures',
+                 'last_error', 'last_run', '__weakref__')
+
+    def __init__(self, check, interval, histogram=None):
+        '''
+        :param check: PageCheck to run
+        :param interval: number of seconds between starts of consecutive runs
+        :param histogram: LatencyHistogram to record durations of runs into
+        '''
+        self.check = check
+        self.interval = interval
+        self.histogram = histogram if histogram is not None else LatencyHistogram()
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_run = None
+
+    def __repr__(self):
+        return '<{0} {1} every {2}s>'.format(self.__class__.__name__, self.check.name, self.interval)
+
+    def record(self, result):
+        '''
+        Folds a CheckResult into the statistics.
+        '''
+        self.runs += 1
+        self.last_run = time.time()
+        self.histogram.record(result.duration)
+        if result.passed:
+            self.consecutive_failures = 0
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = '{0}: {1}'.format(result.error.__class__.__name__, result.error)
+        if getattr(result.error, '__traceback__', None) is not None:
+            # frames of the failed run refer to its page object and elements
+            traceback.clear_frames(result.error.__traceback__)
+
+    def stats(self):
+        '''
+        Returns counters and latency statistics (see LatencyHistogram.stats) of the check.
+        '''
+        return dict(name=self.check.name, runs=self.runs, failures=self.failures,
+                    consecutive_failures=self.consecutive_failures, last_error=self.last_error,
+                    latency=self.histogram.stats())
+
+
+class Monitor(object):
+    '''
+    Runs page checks repeatedly, each on its own interval, on drivers from a pool.
+
+    A check is started again interval seconds after its previous start, or as soon as
+    the previous run finishes if it took longer; runs of the same check never overlap.
+    '''
+
+    def __init__(self, pool, max_workers=None, callback=None):
+        '''
+        :param pool: DriverPool providing drivers, reused across runs
+        :param max_workers: number of checks run at the same time, the pool size by default
+        :param callback: callable accepting MonitoredCheck and CheckResult, called after
+            every run, e.g. to raise alerts
+        '''
+        self.pool = pool
+        self.max_workers = max_workers or pool.max_size
+        self.callback = callback
+        self.checks = []
+        self._finished = queue.Queue()
+
+    def schedule(self, check, interval, histogram=None):
+        '''
+        Adds a check to run every interval seconds, starting immediately.
+
+        :return: MonitoredCheck with statistics of the check
+        '''
+        if interval <= 0:
+            raise ValueError('Interval must be positive')
+        monitored = MonitoredCheck(check, interval, histogram)
+        self.checks.append(monitored)
+        return monitored
+
+    def stop(self):
+        '''
+        Makes run() return after the checks in progress finish. Can be called from any thread.
+        '''
+        self._finished.put(_STOP)
+
+    def _run_check(self, monitored):
+        driver = self.pool.acquire()
+        try:
+            result = monitored.check.run(driver)
+        except BaseException:
+            self.pool.release(driver, failed=True)
+            raise
+        self.pool.release(driver, failed=isinstance(result.error, WebDriverException))
+        monitored.record(result)
+        if self.callback is not None:
+            try:
+                self.callback(monitored, result)
+            except Exception:
+                logger.exception('Monitor callback failed for check %s', monitored.check.name)
+
+    def run(self, duration=None):
+        '''
+        Runs the scheduled checks until stop() is called or duration seconds elapse.
+        The monitor can be run again afterwards; stop() called between runs is ignored.
+
+        :param duration: number of seconds to run for, None to run until stopped
+        '''
+        deadline = None if duration is None else time.time() + duration
+        # a stop request left over from the previous run must not end this one
+        self._finished = queue.Queue()
+        sequence = itertools.count()
+        due = [(time.time(), next(sequence), monitored) for monitored in self.checks]
+        heapq.heapify(due)
+        running = 0
+        stopping = False
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                now = time.time()
+                if deadline is not None and now >= deadline:
+                    stopping = True
+                while not stopping and due and due[0][0] <= now:
+                    _, _, monitored = heapq.heappop(due)
+                    future = executor.submit(self._run_check, monitored)
+                    future.add_done_callback(
+                        lambda future, monitored=monitored, started=now: self._finished.put(
+                            (monitored, started, future.exception())))
+                    running += 1
+                if stopping and not running:
+                    return
+                timeout = None
+                if not stopping:
+                    wakeups = [when for when in (due[0][0] if due else None, deadline) if when is not None]
+                    timeout = max(0, min(wakeups) - now) if wakeups else None
+                try:
+                    finished = self._finished.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                if finished is _STOP:
+                    stopping = True
+                    continue
+                monitored, started, error = finished
+                running -= 1
+                if error is not None:
+                    logger.error('Running check %s failed', monitored.check.name, exc_info=error)
+                heapq.heappush(due, (max(started + monitored.interval, time.time()), next(sequence), monitored))
+
+    def summary(self):
+        '''
+        Returns statistics of all scheduled checks, see MonitoredCheck.stats.
+        '''
+        return [monitored.stats() for monitored in self.checks]
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+'''
+Offline snapshots of the DOM, for assertions that only need the document at one instant.
+
+The document is serialized in the browser and parsed into a local tree once; page objects
+and assertions can then run against the snapshot instead of the driver:
+
+    snapshot = DocumentSnapshot.take(driver)
+    page = MyPage(snapshot)              # or MyPage(driver).snapshot()
+    assertions.assert_document_title_equal(snapshot, 'Title')
+    assertions.assert_element_attr_equal(page.header.logo, 'href', 'http://example.com/')
+
+Title, URL, tag names, attributes, text, enabled and selected states and parent/child
+relations are evaluated locally. Geometry, visibility and computed CSS properties depend
+on layout, so accessing them finds the corresponding live element (by its path in the
+document) and asks the driver; so does any other WebElement method, e.g. click().
+'''
+
+import itertools
+import logging
+from six.moves.urllib.parse import urljoin
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from . import dom, page_objects
+
+logger = logging.getLogger(__name__)
+
+
+# Serializes the document, copying current values of form controls into attributes of
+# the serialized copy so they can be read from the snapshot. Returns the HTML and the URL.
+_SERIALIZE_SCRIPT = '''
+function toggle(element, name, on) {
+    if (on) {
+        element.setAttribute(name, '');
+    } else {
+        element.removeAttribute(name);
+    }
+}
+var root = document.documentElement, copy = root.cloneNode(true);
+var originals = root.querySelectorAll('input, textarea, option');
+var copies = copy.querySelectorAll('input, textarea, option');
+for (var i = 0; i < originals.length; i++) {
+    var original = originals[i], element = copies[i];
+    if (original.tagName === 'OPTION') {
+        toggle(element, 'selected', original.selected);
+    } else if (original.tagName === 'TEXTAREA') {
+        element.textContent = original.value;
+    } else if (original.type === 'checkbox' || original.type === 'radio') {
+        toggle(element, 'checked', original.checked);
+    } else {
+        element.setAttribute('value', original.value);
+    }
+}
+return [copy.outerHTML, document.URL];
+'''
+
+# attributes for which WebElement.get_attribute returns 'true' or None
+_BOOLEAN_ATTRIBUTES = frozenset([
+    'async', 'autofocus', 'autoplay', 'checked', 'compact', 'complete', 'controls', 'declare',
+    'defaultchecked', 'defaultselected', 'defer', 'disabled', 'draggable', 'ended', 'formnovalidate',
+    'hidden', 'indeterminate', 'iscontenteditable', 'ismap', 'itemscope', 'loop', 'multiple',
+    'muted', 'nohref', 'noresize', 'noshade', 'novalidate', 'nowrap', 'open', 'paused', 'pubdate',
+    'readonly', 'required', 'reversed', 'scoped', 'seamless', 'seeking', 'selected', 'spellcheck',
+    'truespeed', 'willvalidate',
+])
+
+# attributes for which WebElement.get_attribute returns absolute URLs
+_URL_ATTRIBUTES = frozenset(['href', 'src'])
+
+_snapshot_ids = itertools.count(1)
+
+
+def _finder(by, multiple=False):
+    '''
+    Returns find_element(s)_by_* method using given locator strategy.
+    '''
+    if multiple:
+        def find_elements_by(self, value):
+            return self.find_elements(by, value)
+        return find_elements_by
+
+    def find_element_by(self, value):
+        return self.find_element(by, value)
+    return find_element_by
+
+
+class _SearchContext(object):
+    '''
+    Element lookup methods of WebDriver and WebElement, evaluated against the snapshot.
+    '''
+
+    def _context_node(self):
+        raise NotImplementedError()
+
+    def _snapshot(self):
+        raise NotImplementedError()
+
+    def find_elements(self, by=By.ID, value=None):
+        try:
+            nodes = dom.find(self._context_node(), by, value)
+        except dom.SelectorError as error:
+            raise InvalidSelectorException(str(error))
+        snapshot = self._snapshot()
+        return [snapshot.wrap(node) for node in nodes]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException('No element in the snapshot matches {0}={1}'.format(by, value))
+        return elements[0]
+
+    find_element_by_id = _finder(By.ID)
+    find_elements_by_id = _finder(By.ID, True)
+    find_element_by_name = _finder(By.NAME)
+    find_elements_by_name = _finder(By.NAME, True)
+    find_element_by_xpath = _finder(By.XPATH)
+    find_elements_by_xpath = _finder(By.XPATH, True)
+    find_element_by_link_text = _finder(By.LINK_TEXT)
+    find_elements_by_link_text = _finder(By.LINK_TEXT, True)
+    find_element_by_partial_link_text = _finder(By.PARTIAL_LINK_TEXT)
+    find_elements_by_partial_link_text = _finder(By.PARTIAL_LINK_TEXT, True)
+    find_element_by_tag_name = _finder(By.TAG_NAME)
+    find_elements_by_tag_name = _finder(By.TAG_NAME, True)
+    find_element_by_class_name = _finder(By.CLASS_NAME)
+    find_elements_by_class_name = _finder(By.CLASS_NAME, True)
+    find_element_by_css_selector = _finder(By.CSS_SELECTOR)
+    find_elements_by_css_selector = _finder(By.CSS_SELECTOR, True)
+
+
+class DocumentSnapshot(_SearchContext):
+    '''
+    Parsed copy of the document loaded in the driver, usable in place of the driver
+    by page objects and assertions.
+
+    Attributes that the snapshot does not provide are taken from the live driver.
+    '''
+
+    def __init__(self, driver, html, url):
+        '''
+        :param driver: WebDriver the document was read from
+        :param html: serialized document
+        :param url: URL of the document
+        '''
+        self.driver = driver
+        self.page_source = html
+        self.current_url = url
+        self.document = dom.parse_html(html)
+        self.id = next(_snapshot_ids)
+        self._elements = {}
+
+    @classmethod
+    def take(cls, driver):
+        '''
+        Reads the document from the driver with a single script call.
+
+        :param driver: WebDriver
+        :return: DocumentSnapshot
+        '''
+        html, url = driver.execute_script(_SERIALIZE_SCRIPT)
+        return cls(driver, html, url)
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.current_url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def _context_node(self):
+        return self.document
+
+    def _snapshot(self):
+        return self
+
+    def wrap(self, node):
+        '''
+        Returns SnapshotElement of the dom.Element, the same object for the same node.
+        '''
+        element = self._elements.get(id(node))
+        if element is None:
+            element = self._elements[id(node)] = SnapshotElement(self, node)
+        return element
+
+    @property
+    def title(self):
+        return self.document.title
+
+    def execute_script(self, script, *args):
+        '''
+        Evaluates scripts of page objects that only query the DOM against the snapshot and
+        executes all other scripts in the browser, replacing SnapshotElement arguments with
+        live elements.
+        '''
+        handler = _LOCAL_SCRIPTS.get(script)
+        if handler is not None:
+            return handler(self, *args)
+        return self.driver.execute_script(script, *[_to_live(arg) for arg in args])
+
+
+class SnapshotElement(_SearchContext):
+    '''
+    Element of a DocumentSnapshot, exposing the API of WebElement.
+
+    Values that depend on layout (rect, location, size, is_displayed() and
+    value_of_css_property()) and all other WebElement methods are delegated to
+    the corresponding live element, found on first use by the path of the element.
+    '''
+
+    def __init__(self, snapshot, node):
+        self.parent = snapshot
+        self.node = node
+        self.path = _node_path(node)
+        self.id = '{0}:{1}'.format(snapshot.id, self.path)
+        self._live = None
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.path)
+
+    def __eq__(self, other):
+        return isinstance(other, SnapshotElement) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.live, name)
+
+    def _context_node(self):
+        return self.node
+
+    def _snapshot(self):
+        return self.parent
+
+    @property
+    def live(self):
+        '''
+        The live WebElement this element was serialized from.
+        '''
+        if self._live is None:
+            self._live = self.parent.driver.find_element_by_xpath(self.path)
+        return self._live
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        '''
+        Text of the element with lines broken like WebDriver does, see dom.visible_text.
+        Elements hidden or displayed differently by stylesheets are not recognized, only
+        inline styles and the hidden attribute.
+        '''
+        return dom.visible_text(self.node)
+
+    def get_attribute(self, name):
+        attrs = self.node.attrs
+        name = name.lower()
+        if name in _BOOLEAN_ATTRIBUTES:
+            return 'true' if name in attrs else None
+        if name == 'value' and self.node.tag == 'textarea':
+            return self.node.text_content
+        value = attrs.get(name)
+        if value is not None and name in _URL_ATTRIBUTES:
+            return urljoin(self.parent.current_url, value)
+        return value
+
+    def is_enabled(self):
+        return 'disabled' not in self.node.attrs
+
+    def is_selected(self):
+        return 'checked' in self.node.attrs or 'selected' in self.node.attrs
+
+    def is_displayed(self):
+        return self.live.is_displayed()
+
+    @property
+    def rect(self):
+        return self.live.rect
+
+    @property
+    def location(self):
+        return self.live.location
+
+    @property
+    def size(self):
+        return self.live.size
+
+    def value_of_css_property(self, property_name):
+        return self.live.value_of_css_property(property_name)
+
+
+def _node_path(node):
+    '''
+    Returns absolute XPath of the dom.Element, e.g. /html[1]/body[1]/div[2].
+    '''
+    steps = []
+    while isinstance(node, dom.Element):
+        index = 1
+        for sibling in node.parent.elements:
+            if sibling is node:
+                break
+            if sibling.tag == node.tag:
+                index += 1
+        steps.append('{0}[{1}]'.format(node.tag, index))
+        node = node.parent
+    return '/' + '/'.join(reversed(steps))
+
+
+def _to_live(value):
+    if isinstance(value, SnapshotElement):
+        return value.live
+    elif isinstance(value, (list, tuple)):
+        return [_to_live(item) for item in value]
+    elif isinstance(value, dict):
+        return dict((key, _to_live(item)) for key, item in value.items())
+    return value
+
+
+def _find(snapshot, chain):
+    node = dom.query_first(snapshot.document, chain)
+    return None if node is None else snapshot.wrap(node)
+
+
+def _collection_chunk(snapshot, chain, start, end):
+    nodes = dom.query_all(snapshot.document, chain)
+    return [len(nodes), [snapshot.wrap(node) for node in nodes[start:end]]]
+
+
+# scripts of page objects evaluated against the snapshot instead of the browser
+_LOCAL_SCRIPTS = {
+    page_objects._LOAD_PROBE_SCRIPT: lambda snapshot, nodes: dom.probe_descriptor_tree(snapshot.document, nodes),
+    page_objects._COLLECTION_CHUNK_SCRIPT: _collection_chunk,
+    page_objects._FIND_SCRIPT: _find,
+}
@@ -1,11 +1,115 @@
 # -*- coding: utf-8 -*-
 
+import copy
 import logging
+from collections import OrderedDict
+import six
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+from .cache import ElementCache
+from .snapshot import _QUERY_SCRIPT, _selector_chain, take_columns
 
 logger = logging.getLogger(__name__)
 
+# default timeout (in seconds) and poll frequency of batched page loads
+LOAD_TIMEOUT = 10
+LOAD_POLL_FREQUENCY = 0.5
 
-class PageElement(object):
+# default number of element handles fetched at once by PageElements collections
+CHUNK_SIZE = 100
+
+# Looks up the whole descriptor tree inside the browser. Each tree node is
+# a [name, css_selector, children] triple, children being null for elements.
+# Returns names of the nodes that could not be found; descendants of
+# a missing component are not reported.
+_LOAD_PROBE_SCRIPT = '''
+var missing = [];
+function probe(root, nodes) {
+    for (var i = 0; i < nodes.length; i++) {
+        var node = nodes[i];
+        var element = root.querySelector(node[1]);
+        if (element === null) {
+            missing.push(node[0]);
+        } else if (node[2] !== null) {
+            probe(element, node[2]);
+        }
+    }
+}
+probe(document, arguments[0]);
+return missing;
+'''
+
+# Returns the first element matching the chain of CSS selectors (the first argument,
+# see snapshot._QUERY_SCRIPT), or null.
+_FIND_SCRIPT = _QUERY_SCRIPT + '''
+return queryFirst(arguments[0]);
+'''
+
+# Returns the number of elements matching the chain of CSS selectors (the first argument)
+# and the matching elements between the start and end indexes (the second and third
+# argument); a null end index means all remaining elements.
+_COLLECTION_CHUNK_SCRIPT = _QUERY_SCRIPT + '''
+var elements = queryAll(arguments[0]);
+var end = arguments[2] === null ? elements.length : arguments[2];
+return [elements.length, Array.prototype.slice.call(elements, arguments[1], end)];
+'''
+
+
+class _Descriptor(object):
+    '''
+    Base class of descriptors that can be declared in page objects and components.
+    '''
+
+    # attribute name under which the descriptor was first declared
+    name = None
+
+    def __set__(self, instance, value):
+        raise AttributeError('This is a read-only descriptor')
+
+
+class _DescriptorRegistry(type):
+    '''
+    Metaclass that collects descriptors declared in the class and all its bases once,
+    at class creation time. Descriptors are kept in declaration order, base class
+    descriptors first; redefining an attribute in a subclass replaces (or, if the new
+    value is not a descriptor, removes) the inherited descriptor.
+
+    It also precomputes selector chains of all elements and components nested in the class,
+    keyed by the path of attribute names leading to them: tuples of the selectors of all
+    enclosing components and of the descriptor itself. Each selector is matched inside the
+    first element matching the previous one, like the element of a component is, so any
+    element can be found with a single round-trip.
+    '''
+
+    def __init__(cls, name, bases, attrs):
+        super(_DescriptorRegistry, cls).__init__(name, bases, attrs)
+        descriptors = OrderedDict()
+        for klass in reversed(cls.__mro__):
+            for attr, value in klass.__dict__.items():
+                if isinstance(value, _Descriptor):
+                    if value.name is None:
+                        value.name = attr
+                    descriptors[attr] = value
+                elif attr in descriptors:
+                    del descriptors[attr]
+        cls._descriptors = tuple(descriptors.items())
+        cls._load_probe = None
+        selectors = {}
+        for attr, value in cls._descriptors:
+            selectors[(attr,)] = (value.locator,)
+            if isinstance(value, PageComponent):
+                for path, chain in value.__class__._selectors.items():
+                    selectors[(attr,) + path] = (value.locator,) + chain
+        cls._selectors = selectors
+
+    def get_descriptors(cls):
+        '''
+        Returns (attribute name, descriptor) pairs of all descriptors of the class.
+        '''
+        return cls._descriptors
+
+
+class PageElement(_Descriptor):
     '''
     Descriptor that references a single WebElement on a page.
     '''
@@ -17,76 +121,361 @@ class PageElement(object):
         '''
         Magic allowing referencing components and their elements using dot notation.
         '''
-        if isinstance(instance, PageObject):
-            return instance.driver.find_element_by_css_selector(self.locator)
-        elif isinstance(instance, PageComponent):
-            return instance.element.find_element_by_css_selector(self.locator)
-        else:
-            raise TypeError('PageObject or PageComponent expected')
+        if instance is None:
+            return self
+        page, path = _get_page_and_path(instance)
+        return page._find_element(path + (self.name,))
 
-    def __set__(self, instance, value):
-        raise AttributeError('This is a read-only descriptor')
 
+class PageElements(_Descriptor):
+    '''
+    Descriptor that references all WebElements matching a locator, e.g. rows of a table.
 
-class PageComponent(object):
+    Accessing it returns an ElementCollection, which fetches element handles lazily,
+    in chunks, and can read properties of all matching elements with one script call.
+    Collections may be empty, so they are not waited for when the page is loaded.
+    '''
+
+    def __init__(self, locator, chunk_size=CHUNK_SIZE):
+        self.locator = locator
+        self.chunk_size = chunk_size
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        page, path = _get_page_and_path(instance)
+        return page._collection(page._selectors[path + (self.name,)], self.chunk_size)
+
+
+class ElementCollection(object):
+    '''
+    Lazy sequence of the elements matching a CSS selector, or a chain of selectors each
+    matched inside the first element matching the previous one.
+
+    Element handles are fetched chunk_size at a time and only the most recently fetched
+    chunk is kept, so iterating over a long list takes len / chunk_size round-trips and
+    a bounded amount of memory. Use extract() to read properties of all elements
+    without fetching their handles at all.
+
+    The number of elements is taken from the most recent fetch; call refresh() after
+    the list changes.
+    '''
+
+    def __init__(self, driver, selector, chunk_size=CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be positive')
+        self.driver = driver
+        self.selector = _selector_chain(selector)
+        self.chunk_size = chunk_size
+        self.refresh()
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self.selector)
+
+    def refresh(self):
+        '''
+        Drops the fetched chunk and the known number of elements.
+        '''
+        self._total = None
+        self._chunk_start = None
+        self._chunk = []
+
+    def _fetch(self, start):
+        '''
+        Fetches the chunk of elements starting at given index.
+        '''
+        total, elements = self.driver.execute_script(
+            _COLLECTION_CHUNK_SCRIPT, self.selector, start, start + self.chunk_size)
+        self._total, self._chunk_start, self._chunk = total, start, elements
+        return elements
+
+    def __len__(self):
+        if self._total is None:
+            self._fetch(0)
+        return self._total
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError('Element index out of range')
+        start = index - index % self.chunk_size
+        if self._chunk_start != start:
+            self._fetch(start)
+        if index - start >= len(self._chunk):
+            raise IndexError('Element index out of range')
+        return self._chunk[index - start]
+
+    def __iter__(self):
+        start = 0
+        while True:
+            elements = self._chunk if self._chunk_start == start else self._fetch(start)
+            for element in elements:
+                yield element
+            start += self.chunk_size
+            if len(elements) < self.chunk_size or start >= self._total:
+                return
+
+    def extract(self, properties=('text',), attributes=(), css_properties=()):
+        '''
+        Reads properties of all elements in the collection with a single script call.
+
+        :param properties: names of the properties to read, see snapshot.PROPERTIES
+        :param attributes: names of the attributes to read
+        :param css_properties: names of the CSS properties to read
+        :return: dictionary with properties, attributes and css keys, each mapping names to lists
+            of values in document order; rects are [x, y, width, height] lists
+        '''
+        return take_columns(self.driver, self.selector, properties, attributes, css_properties)
+
+
+class PageComponent(six.with_metaclass(_DescriptorRegistry, _Descriptor)):
     '''
     Descriptor that describes a part of the page. Can itself contain descriptors to
     elements and other components.
+
+    Elements of a component are looked up only inside the component, i.e. inside the first
+    element matching its selector, which is itself looked up inside the enclosing components.
     '''
 
-    def __init__(self, element):
-        self.element = element
+    # page object the component was reached from, and attribute names leading to it
+    _page = None
+    _path = ()
+
+    def __init__(self, locator):
+        self.locator = locator
 
     def __get__(self, instance, owner):
         '''
         Magic allowing referencing components and their elements using dot notation.
         '''
-        if isinstance(instance, PageComponent):
-            parent = instance.element.parent
-        elif isinstance(instance, PageObject):
-            parent = instance.driver
-        else:
-            raise TypeError('PageObject or PageComponent expected')
-        return self.__class__(parent)
+        if instance is None:
+            return self
+        page, path = _get_page_and_path(instance)
+        component = copy.copy(self)
+        component._page = page
+        component._path = path + (self.name,)
+        return component
 
-    def __set__(self, instance, value):
-        raise AttributeError('This is a read-only descriptor')
+    @property
+    def element(self):
+        '''
+        WebElement the component refers to.
+        '''
+        page, path = _get_page_and_path(self)
+        return page._find_element(path)
 
-    def wait_to_load(self):
+    def wait_to_load(self, batched=False, timeout=LOAD_TIMEOUT, poll_frequency=LOAD_POLL_FREQUENCY):
         '''
-        Waits until all elements declared in this component are found in DOM.
+        Waits until all elements declared in this component are found in DOM, see
+        PageObject.wait_to_load. In batched mode the component is looked up by its selector
+        chain and its descriptor tree is checked inside it, with a single script call per poll.
+
+        :param batched: check all elements with a single script call per poll
+        :param timeout: number of seconds to wait for in batched mode
+        :param poll_frequency: number of seconds between polls in batched mode
         '''
-        descriptor_dict = self.__class__.__dict__
-        for attr, value in descriptor_dict.items():
-            if isinstance(value, PageElement):
-                getattr(self, attr)
-            elif isinstance(value, PageComponent):
-                component = getattr(self, attr)
-                component.wait_to_load()
+        if batched:
+            page, path = _get_page_and_path(self)
+            probe = _compile_component_probe(self.__class__, path, page._selectors[path])
+            _wait_for_probe(page.driver, probe, timeout, poll_frequency)
+        else:
+            _wait_for_descriptors(self)
 
 
-class PageObject(object):
+class PageObject(six.with_metaclass(_DescriptorRegistry, object)):
     '''
     Describes a whole page.
+
+    When element caching is enabled (either by setting the cache_elements class
+    attribute in a subclass or by passing cache_elements=True), resolved elements
+    are reused on subsequent accesses and looked up again only after they turn
+    stale or the cache is invalidated.
     '''
 
-    def __init__(self, driver):
+    cache_elements = False
+
+    # timeline of the last load with timeline=True, see timeline.LoadTimeline
+    load_timeline = None
+
+    def __init__(self, driver, cache_elements=None):
         self.driver = driver
+        if cache_elements is not None:
+            self.cache_elements = cache_elements
+        self.element_cache = ElementCache()
+
+    def invalidate(self):
+        '''
+        Drops all cached element handles, e.g. after navigating to another page.
+        '''
+        self.element_cache.invalidate()
+
+    def _find_element(self, path):
+        '''
+        Finds element or component with given path using its precomputed selector chain.
+        '''
+        chain = self._selectors[path]
+        driver = self.driver
+
+        def resolve():
+            # refers to the driver only, cached elements must not keep the page object alive
+            return _find_in_chain(driver, chain)
 
-    def wait_to_load(self):
+        if self.cache_elements:
+            return self.element_cache.get(path, resolve)
+        return resolve()
+
+    def _collection(self, selector, chunk_size):
+        '''
+        Returns collection of the elements matching the selector, see PageElements.
+        '''
+        return ElementCollection(self.driver, selector, chunk_size)
+
+    def wait_to_load(self, batched=False, timeout=LOAD_TIMEOUT, poll_frequency=LOAD_POLL_FREQUENCY,
+                     timeline=False):
         '''
         Waits until all components and elements are found on the page.
+
+        By default elements are looked up one by one, relying on the implicit wait
+        of the driver. In batched mode the whole descriptor tree is checked inside
+        the browser with a single script call per poll, until all elements are found
+        or the timeout expires.
+
+        With timeline, the page is polled like in batched mode while an observer in the
+        page records when each element appeared; the result is kept in load_timeline.
+
+        :param batched: check all elements with a single script call per poll
+        :param timeout: number of seconds to wait for in batched mode
+        :param poll_frequency: number of seconds between polls in batched mode
+        :param timeline: record the appearance of elements, see timeline.LoadTimeline
         '''
-        descriptor_dict = self.__class__.__dict__
-        for attr, value in descriptor_dict.items():
-            if isinstance(value, PageElement):
-                getattr(self, attr)
-            elif isinstance(value, PageComponent):
-                component = getattr(self, attr)
-                component.wait_to_load()
+        if timeline:
+            from .timeline import record_load_timeline  # timeline depends on this module
+            self.load_timeline = record_load_timeline(self, timeout, poll_frequency)
+        elif batched:
+            _wait_for_probe(self.driver, _get_load_probe(self.__class__), timeout, poll_frequency)
+        else:
+            _wait_for_descriptors(self)
+
+    def snapshot(self):
+        '''
+        Returns a copy of the page object bound to a snapshot of the current document,
+        see offline.DocumentSnapshot. Elements are then found, and most of their properties
+        read, without further round-trips.
+        '''
+        from .offline import DocumentSnapshot  # offline depends on this module
+        return self.__class__(DocumentSnapshot.take(self.driver), cache_elements=self.cache_elements)
 
     @classmethod
-    def load(cls, driver):
-        result = cls(driver)
-        result.wait_to_load()
+    def load(cls, driver, batched=False, timeout=LOAD_TIMEOUT, poll_frequency=LOAD_POLL_FREQUENCY,
+             timeline=False, **kwargs):
+        result = cls(driver, **kwargs)
+        result.wait_to_load(batched=batched, timeout=timeout, poll_frequency=poll_frequency, timeline=timeline)
         return result
+
+
+def _get_page_and_path(instance):
+    '''
+    Returns page object the instance belongs to and path of attribute names leading to it.
+    '''
+    if isinstance(instance, PageObject):
+        return instance, ()
+    elif isinstance(instance, PageComponent):
+        if instance._page is None:
+            raise TypeError('Component is not bound to a page object')
+        return instance._page, instance._path
+    else:
+        raise TypeError('PageObject or PageComponent expected')
+
+
+def _find_in_chain(driver, chain):
+    '''
+    Finds the element matching the chain of CSS selectors with a single round-trip. If there
+    is none, the chain is followed one lookup at a time, so that the implicit wait of the
+    driver applies and NoSuchElementException is raised if the element does not appear.
+    '''
+    if len(chain) == 1:
+        return driver.find_element_by_css_selector(chain[0])
+    element = driver.execute_script(_FIND_SCRIPT, list(chain))
+    if element is None:
+        element = driver
+        for selector in chain:
+            element = element.find_element_by_css_selector(selector)
+    return element
+
+
+def _wait_for_descriptors(container):
+    '''
+    Looks up all elements declared in the page object or component, one by one.
+    '''
+    for attr, value in container._descriptors:
+        if isinstance(value, PageElement):
+            getattr(container, attr)
+        elif isinstance(value, PageComponent):
+            getattr(container, attr).wait_to_load()
+
+
+def _get_load_probe(cls):
+    '''
+    Returns the descriptor tree of the page object class, compiling it on first use.
+    '''
+    if cls._load_probe is None:
+        cls._load_probe = _compile_load_probe(cls)
+    return cls._load_probe
+
+
+def _compile_load_probe(cls, prefix=''):
+    '''
+    Converts descriptors declared in the page object or component class into
+    the tree checked by _LOAD_PROBE_SCRIPT.
+    '''
+    nodes = []
+    for attr, value in cls._descriptors:
+        name = prefix + attr
+        if isinstance(value, PageElement):
+            nodes.append([name, value.locator, None])
+        elif isinstance(value, PageComponent):
+            nodes.append([name, value.locator, _compile_load_probe(value.__class__, name + '.')])
+    return nodes
+
+
+def _compile_component_probe(cls, path, chain):
+    '''
+    Returns the descriptor tree of the component class nested in the nodes of the selector
+    chain leading to the component, so that the tree is probed from the document as well.
+    Nodes are named by their attribute paths from the page object.
+    '''
+    names = ['.'.join(path[:index + 1]) for index in range(len(path))]
+    nodes = _compile_load_probe(cls, names[-1] + '.')
+    for name, selector in reversed(list(zip(names, chain))):
+        nodes = [[name, selector, nodes]]
+    return nodes
+
+
+def _wait_for_probe(driver, probe, timeout, poll_frequency):
+    '''
+    Waits until all nodes of the compiled descriptor tree are found, see _LOAD_PROBE_SCRIPT.
+    '''
+    condition = _all_descriptors_present(probe)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency).until(condition)
+    except TimeoutException:
+        raise TimeoutException('Elements not found: {0}'.format(', '.join(condition.missing or ())))
+
+
+class _all_descriptors_present(object):
+    '''
+    Wait condition that evaluates to True when all nodes of the compiled descriptor
+    tree are found in DOM. Names of the nodes missing at the last poll are kept
+    in the missing attribute.
+    '''
+
+    def __init__(self, probe):
+        self.probe = probe
+        self.missing = None
+
+    def __call__(self, driver):
+        self.missing = driver.execute_script(_LOAD_PROBE_SCRIPT, self.probe)
+        return not self.missing
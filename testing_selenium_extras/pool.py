@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import contextlib
+import logging
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+
+def is_responsive(driver):
+    '''
+    Default health check of pooled drivers, True if the session still answers commands.
+    '''
+    try:
+        driver.current_url
+    except WebDriverException:
+        return False
+    return True
+
+
+class DriverPool(object):
+    '''
+    Bounded pool of WebDriver sessions shared by many threads.
+
+    Drivers are created lazily with the factory, at most max_size of them at a time.
+    Released drivers are reused by later acquisitions; a driver is quit and replaced
+    after max_uses uses. Drivers released after a failure are health-checked before
+    being handed out again, healthy drivers are reused without any extra round-trip.
+    '''
+
+    def __init__(self, factory, max_size=4, max_uses=None, health_check=is_responsive):
+        '''
+        :param factory: callable with no arguments creating new WebDriver
+        :param max_size: maximum number of drivers alive at the same time
+        :param max_uses: number of uses after which a driver is recycled, None for no limit
+        :param health_check: callable accepting driver and returning False if it cannot be used
+        '''
+        self._factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._health_check = health_check
+        self._idle = collections.deque()
+        self._uses = {}
+        self._suspect = set()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self):
+        '''
+        Number of drivers currently alive, both idle and in use.
+        '''
+        return self._size
+
+    def acquire(self, timeout=None):
+        '''
+        Returns driver for exclusive use, waiting for one to be released if the pool is exhausted.
+
+        :param timeout: number of seconds to wait for, None to wait forever
+        :raise TimeoutException: if no driver got available in time
+        :return: WebDriver
+        '''
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._condition:
+                driver = self._take(deadline)
+            if driver is None:
+                return self._create()
+            if driver not in self._suspect or self._health_check(driver):
+                self._suspect.discard(driver)
+                return driver
+            logger.warning('Discarding unhealthy driver %r', driver)
+            self._discard(driver)
+
+    def _take(self, deadline):
+        '''
+        Takes idle driver or reserves place for a new one (returning None). Must be called with lock held.
+        '''
+        while True:
+            if self._closed:
+                raise RuntimeError('Driver pool is closed')
+            if self._idle:
+                return self._idle.pop()
+            if self._size < self.max_size:
+                self._size += 1
+                return None
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutException('No driver available in the pool')
+            self._condition.wait(remaining)
+
+    def _create(self):
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._uses[driver] = 0
+        return driver
+
+    def release(self, driver, failed=False):
+        '''
+        Returns driver to the pool.
+
+        :param driver: driver obtained with acquire()
+        :param failed: True if the driver failed while in use, so that its health is checked before reuse
+        '''
+        with self._condition:
+            self._uses[driver] += 1
+            exhausted = self.max_uses is not None and self._uses[driver] >= self.max_uses
+            if not (exhausted or self._closed):
+                if failed:
+                    self._suspect.add(driver)
+                self._idle.append(driver)
+                self._condition.notify()
+                return
+        self._discard(driver)
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            logger.warning('Failed to quit driver %r', driver, exc_info=True)
+        with self._condition:
+            self._size -= 1
+            self._uses.pop(driver, None)
+            self._suspect.discard(driver)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def session(self, timeout=None):
+        '''
+        Context manager acquiring driver and releasing it afterwards.
+        '''
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except WebDriverException:
+            self.release(driver, failed=True)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self):
+        '''
+        Quits all idle drivers; drivers in use are quit when released.
+        '''
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
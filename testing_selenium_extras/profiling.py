@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import json
+import logging
+import sys
+import threading
+from timeit import default_timer
+from selenium.webdriver.remote.command import Command
+from .assertions import AssertionMixin
+from .executors import CommandExecutorWrapper
+from .page_objects import PageObject
+from .utils import percentile
+
+logger = logging.getLogger(__name__)
+
+
+# maximum number of stack frames inspected when attributing a command
+MAX_ATTRIBUTION_DEPTH = 64
+
+# default maximum number of element handles whose descriptors are remembered per driver
+MAX_ELEMENT_OWNERS = 10000
+
+# commands that load another document, so that all element handles turn stale
+_NAVIGATION_COMMANDS = frozenset([Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH])
+
+# code objects of page object methods that issue commands on behalf of descriptors
+_FIND_ELEMENT_CODE = PageObject._find_element.__code__
+_WAIT_TO_LOAD_CODE = PageObject.wait_to_load.__code__
+
+
+# context a command was issued in: name of the assertion method, class name of the page
+# object and dot-separated path of the descriptor; any of them may be None
+Attribution = collections.namedtuple('Attribution', 'assertion page_object descriptor')
+
+
+def attribute_command(frame):
+    '''
+    Finds the assertion, page object and descriptor on whose behalf a command is being
+    executed by inspecting the stack, starting from the given frame.
+    '''
+    assertion = page_object = descriptor = None
+    depth = 0
+    while frame is not None and depth < MAX_ATTRIBUTION_DEPTH:
+        code = frame.f_code
+        if code is _FIND_ELEMENT_CODE and descriptor is None:
+            page_object = frame.f_locals['self'].__class__.__name__
+            descriptor = '.'.join(frame.f_locals['path'])
+        elif code is _WAIT_TO_LOAD_CODE and page_object is None:
+            page_object = frame.f_locals['self'].__class__.__name__
+        elif assertion is None and code.co_name.startswith('assert_') and \
+                isinstance(frame.f_locals.get('self'), AssertionMixin):
+            assertion = code.co_name
+            break
+        frame = frame.f_back
+        depth += 1
+    return Attribution(assertion, page_object, descriptor)
+
+
+# keys of element references in responses of the JSON wire and W3C protocols
+_ELEMENT_KEYS = ('ELEMENT', 'element-6066-11e4-a52e-4f735466cecf')
+
+
+def _element_id(value):
+    if isinstance(value, dict):
+        for key in _ELEMENT_KEYS:
+            if key in value:
+                return value[key]
+    return None
+
+
+def _payload_size(value):
+    try:
+        return len(json.dumps(value, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CommandProfiler(object):
+    '''
+    Counts and times WebDriver commands of instrumented drivers and attributes them
+    to the active assertion, page object and descriptor.
+
+    Usage:
+
+        profiler = CommandProfiler()
+        profiler.instrument(driver)
+        ... run tests ...
+        profiler.export(open('profile.json', 'w'))
+    '''
+
+    def __init__(self, max_element_owners=MAX_ELEMENT_OWNERS, measure_payloads=False):
+        '''
+        :param max_element_owners: number of most recently found elements of each driver whose
+            descriptors are remembered, to attribute later commands on those elements
+        :param measure_payloads: count bytes sent and received by serializing parameters and
+            responses of commands; off by default as it slows down every command
+        '''
+        self.max_element_owners = max_element_owners
+        self.measure_payloads = measure_payloads
+        self._records = []
+        self._lock = threading.Lock()
+
+    def instrument(self, driver):
+        '''
+        Starts profiling commands of the driver.
+
+        :return: the installed command executor wrapper, see CommandExecutorWrapper.uninstall
+        '''
+        return _ProfilingCommandExecutor.install(driver, self)
+
+    def record(self, command, attribution, duration, bytes_sent, bytes_received):
+        with self._lock:
+            self._records.append((command, attribution, duration, bytes_sent, bytes_received))
+
+    def reset(self):
+        with self._lock:
+            del self._records[:]
+
+    def summary(self):
+        '''
+        Returns statistics of recorded commands, as a whole and grouped by command name,
+        assertion, page object and descriptor. Each group has count, total time, 50th and
+        95th percentile of latency (all times in seconds) and number of bytes sent and received,
+        which is None unless payloads are measured.
+        '''
+        with self._lock:
+            records = list(self._records)
+        groups = dict(commands={}, assertions={}, page_objects={}, descriptors={})
+        for record in records:
+            command, attribution = record[0], record[1]
+            groups['commands'].setdefault(command, []).append(record)
+            if attribution.assertion:
+                groups['assertions'].setdefault(attribution.assertion, []).append(record)
+            if attribution.page_object:
+                groups['page_objects'].setdefault(attribution.page_object, []).append(record)
+            if attribution.descriptor:
+                key = '{0}.{1}'.format(attribution.page_object, attribution.descriptor)
+                groups['descriptors'].setdefault(key, []).append(record)
+        result = dict((name, dict((key, self._stats(value)) for key, value in group.items()))
+                      for name, group in groups.items())
+        result['total'] = self._stats(records)
+        return result
+
+    def _stats(self, records):
+        durations = sorted(record[2] for record in records)
+        return dict(
+            count=len(records),
+            total_time=sum(durations),
+            p50=percentile(durations, 0.5),
+            p95=percentile(durations, 0.95),
+            bytes_sent=sum(record[3] for record in records) if self.measure_payloads else None,
+            bytes_received=sum(record[4] for record in records) if self.measure_payloads else None,
+        )
+
+    def export(self, fp):
+        '''
+        Writes summary as JSON to the file-like object.
+        '''
+        json.dump(self.summary(), fp, indent=2, sort_keys=True)
+
+
+class _ProfilingCommandExecutor(CommandExecutorWrapper):
+    '''
+    Command executor that reports every command to the profiler.
+
+    Commands on elements found through page object descriptors are attributed to those
+    descriptors even if issued later, e.g. from within assertions. Descriptors of the
+    elements are remembered up to the max_element_owners limit of the profiler, and
+    forgotten on navigation.
+    '''
+
+    def __init__(self, executor, profiler):
+        super(_ProfilingCommandExecutor, self).__init__(executor)
+        self._profiler = profiler
+        self._element_owners = collections.OrderedDict()
+
+    def execute(self, command, params):
+        attribution = attribute_command(sys._getframe(1))
+        if attribution.descriptor is None and params and params.get('id') in self._element_owners:
+            page_object, descriptor = self._element_owners[params['id']]
+            attribution = attribution._replace(page_object=page_object, descriptor=descriptor)
+        started = default_timer()
+        response = None
+        try:
+            response = self._executor.execute(command, params)
+        finally:
+            duration = default_timer() - started
+            if self._profiler.measure_payloads:
+                bytes_sent, bytes_received = _payload_size(params), _payload_size(response)
+            else:
+                bytes_sent = bytes_received = 0
+            self._profiler.record(command, attribution, duration, bytes_sent, bytes_received)
+        if command in _NAVIGATION_COMMANDS:
+            self._element_owners.clear()
+        element_id = _element_id(response.get('value')) if response and attribution.descriptor else None
+        if element_id is not None:
+            self._element_owners.pop(element_id, None)
+            self._element_owners[element_id] = (attribution.page_object, attribution.descriptor)
+            while len(self._element_owners) > self._profiler.max_element_owners:
+                self._element_owners.popitem(last=False)
+        return response
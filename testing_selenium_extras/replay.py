@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+'''
+Recording of WebDriver command streams and their deterministic replay without a browser.
+
+Record a run against a real browser:
+
+    with gzip.open('run.jsonl.gz', 'wt') as fp:
+        recorder = CommandRecorder.install(driver, fp)
+        ... run tests ...
+        recorder.uninstall(driver)
+
+and replay it, e.g. in CI:
+
+    with gzip.open('run.jsonl.gz', 'rt') as fp:
+        driver = create_replay_driver(fp)
+    ... run the same tests ...
+    print(driver.command_executor.report())
+
+The recording is a JSON lines file: a header with the session details followed by one
+[command, parameters, response] array per command. Replay answers commands with recorded
+responses in order; a command that does not match the next recorded one is a mismatch.
+'''
+
+import collections
+import copy
+import json
+import logging
+import threading
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from .executors import CommandExecutorWrapper
+
+logger = logging.getLogger(__name__)
+
+
+FORMAT = 'testing_selenium_extras.replay'
+VERSION = 1
+
+# default number of recorded commands searched for a match when replay is not strict
+LOOKAHEAD = 20
+
+_JSON_SEPARATORS = (',', ':')
+
+
+def _normalize(params):
+    '''
+    Returns command parameters as they compare after a JSON round-trip, without the session id.
+    '''
+    params = dict(params or {})
+    params.pop('sessionId', None)
+    return json.loads(json.dumps(params))
+
+
+class CommandRecorder(CommandExecutorWrapper):
+    '''
+    Command executor writing every command and its response to a recording file.
+    '''
+
+    def __init__(self, executor, fp, driver=None):
+        super(CommandRecorder, self).__init__(executor)
+        self._fp = fp
+        self._lock = threading.Lock()
+        self._count = 0
+        if driver is not None:
+            self._write(dict(format=FORMAT, version=VERSION, w3c=driver.w3c,
+                             session_id=driver.session_id, capabilities=driver.capabilities))
+
+    @classmethod
+    def install(cls, driver, fp):
+        '''
+        Starts recording commands of the driver into the text file-like object.
+        '''
+        wrapper = cls(driver.command_executor, fp, driver)
+        driver.command_executor = wrapper
+        return wrapper
+
+    @property
+    def count(self):
+        '''
+        Number of recorded commands.
+        '''
+        return self._count
+
+    def _write(self, value):
+        with self._lock:
+            self._fp.write(json.dumps(value, separators=_JSON_SEPARATORS))
+            self._fp.write('\n')
+            self._fp.flush()
+
+    def execute(self, command, params):
+        response = self._executor.execute(command, params)
+        self._write([command, _normalize(params), response])
+        self._count += 1
+        return response
+
+
+def load_recording(fp):
+    '''
+    Reads a recording written by CommandRecorder.
+
+    :param fp: text file-like object
+    :return: (header dictionary, list of (command, parameters, response) entries)
+    '''
+    lines = iter(line for line in fp if line.strip())
+    try:
+        header = json.loads(next(lines))
+    except StopIteration:
+        raise ValueError('Recording is empty')
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise ValueError('Not a command recording')
+    if header.get('version') != VERSION:
+        raise ValueError('Unsupported recording version: {0}'.format(header.get('version')))
+    return header, [tuple(json.loads(line)) for line in lines]
+
+
+# command that did not match the recording: position in the recording, the recorded
+# (command, parameters) pair expected there (None past the end) and the actual one
+Mismatch = collections.namedtuple('Mismatch', 'index expected actual')
+
+
+class ReplayMismatchError(WebDriverException):
+    '''
+    Raised when a replayed command does not match the recording.
+    '''
+
+
+class ReplayCommandExecutor(object):
+    '''
+    Command executor answering commands with recorded responses.
+
+    In strict mode the first mismatching command raises ReplayMismatchError. Otherwise
+    the executor looks for the command among the next lookahead recorded commands and,
+    if found, skips to it; only commands missing there raise the error. All mismatches
+    are kept in the mismatches list.
+    '''
+
+    def __init__(self, header, entries, strict=True, lookahead=LOOKAHEAD):
+        self.header = header
+        self.entries = list(entries)
+        self.strict = strict
+        self.lookahead = lookahead
+        self.position = 0
+        self.mismatches = []
+        self.w3c = header.get('w3c', False)
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        '''
+        True if all recorded commands were replayed.
+        '''
+        return self.position >= len(self.entries)
+
+    def _session_response(self):
+        session_id = self.header.get('session_id') or 'replay'
+        capabilities = self.header.get('capabilities') or {}
+        if self.w3c:
+            return dict(value=dict(sessionId=session_id, capabilities=capabilities))
+        return dict(status=0, sessionId=session_id, value=capabilities)
+
+    def _matches(self, index, command, params):
+        entry = self.entries[index]
+        return entry[0] == command and entry[1] == params
+
+    def execute(self, command, params):
+        if command == 'newSession':
+            return self._session_response()
+        params = _normalize(params)
+        with self._lock:
+            index = self.position
+            if index < len(self.entries) and self._matches(index, command, params):
+                self.position += 1
+                return copy.deepcopy(self.entries[index][2])
+            if command == 'quit':
+                return dict(status=0, value=None)
+            expected = self.entries[index][:2] if index < len(self.entries) else None
+            mismatch = Mismatch(index, expected, (command, params))
+            self.mismatches.append(mismatch)
+            logger.warning('Replay mismatch %s', self._format(mismatch))
+            if not self.strict:
+                end = min(len(self.entries), index + 1 + self.lookahead)
+                for candidate in range(index + 1, end):
+                    if self._matches(candidate, command, params):
+                        self.position = candidate + 1
+                        return copy.deepcopy(self.entries[candidate][2])
+        raise ReplayMismatchError(self._format(mismatch))
+
+    @staticmethod
+    def _format(mismatch):
+        if mismatch.expected is None:
+            expected = 'end of recording'
+        else:
+            expected = '{0} {1}'.format(mismatch.expected[0], json.dumps(mismatch.expected[1], sort_keys=True))
+        return 'at command #{0}: expected {1}, got {2} {3}'.format(
+            mismatch.index, expected, mismatch.actual[0], json.dumps(mismatch.actual[1], sort_keys=True))
+
+    def report(self):
+        '''
+        Returns human readable summary of the replay: mismatches and unused recorded commands.
+        '''
+        lines = ['Replayed {0} of {1} recorded commands, {2} mismatches'.format(
+            self.position, len(self.entries), len(self.mismatches))]
+        lines.extend('  ' + self._format(mismatch) for mismatch in self.mismatches)
+        if not self.finished:
+            lines.append('  {0} recorded commands were not replayed, starting with {1}'.format(
+                len(self.entries) - self.position, self.entries[self.position][0]))
+        return '\n'.join(lines)
+
+
+def create_replay_driver(fp, strict=True, lookahead=LOOKAHEAD):
+    '''
+    Returns WebDriver replaying the recording, with the ReplayCommandExecutor available
+    as its command_executor.
+
+    :param fp: text file-like object with a recording written by CommandRecorder
+    :param strict: raise on the first mismatching command, see ReplayCommandExecutor
+    :param lookahead: number of recorded commands searched for a match when not strict
+    '''
+    header, entries = load_recording(fp)
+    executor = ReplayCommandExecutor(header, entries, strict, lookahead)
+    return WebDriver(executor, desired_capabilities={})
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+'''
+Screenshots taken on assertion failures, written to disk by a background thread.
+
+Only taking the screenshot happens in the test thread; decoding, cropping, compressing
+and writing it is left to a ScreenshotWriter, whose bounded queue slows down (or, if so
+configured, sheds) failure-heavy runs instead of letting pending screenshots pile up:
+
+    class MyTestCase(ScreenshotOnFailureMixin, unittest.TestCase):
+        screenshot_writer = ScreenshotWriter('screenshots')
+
+        @classmethod
+        def tearDownClass(cls):
+            cls.screenshot_writer.flush()
+'''
+
+import base64
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+from six.moves import queue
+from .assertions import AssertionMixin
+from .cache import unwrap_element
+from .utils import write_file_atomically
+from . import images
+
+logger = logging.getLogger(__name__)
+
+
+# default number of screenshots waiting to be written
+MAX_PENDING = 8
+
+# Returns the viewport-relative box of the element (the first argument) and the device
+# pixel ratio, i.e. the number of screenshot pixels per CSS pixel.
+_ELEMENT_BOX_SCRIPT = '''
+var rect = arguments[0].getBoundingClientRect();
+return [rect.left, rect.top, rect.width, rect.height, window.devicePixelRatio || 1];
+'''
+
+_RE_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+
+# marks the end of the queue
+_STOP = object()
+
+
+class ScreenshotWriter(object):
+    '''
+    Writes screenshots to a directory from a background thread.
+
+    When max_pending screenshots are waiting, submit() blocks until one of them is written,
+    or, with block=False, drops the new screenshot and counts it in dropped.
+    '''
+
+    def __init__(self, directory, max_pending=MAX_PENDING, compression=6, block=True):
+        '''
+        :param directory: directory to write screenshots to, created if needed
+        :param max_pending: maximum number of screenshots waiting to be written
+        :param compression: zlib compression level of cropped screenshots
+        :param block: block submit() when the queue is full instead of dropping screenshots
+        '''
+        self.directory = directory
+        self.compression = compression
+        self.block = block
+        self.written = []
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ScreenshotWriter')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def submit(self, name, screenshot, box=None):
+        '''
+        Queues a screenshot to be written as <name>.png.
+
+        :param name: file name without extension
+        :param screenshot: base64-encoded PNG, as returned by get_screenshot_as_base64()
+        :param box: (x, y, width, height) part of the screenshot to keep, in pixels
+        :return: False if the screenshot was dropped
+        '''
+        self._start()
+        try:
+            self._queue.put((name, screenshot, box), block=self.block)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning('Screenshot %s dropped, %d screenshots are waiting', name, self._queue.qsize())
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._write(*job)
+            except Exception:
+                self.errors += 1
+                logger.exception('Writing screenshot %s failed', job[0])
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, screenshot, box):
+        data = base64.b64decode(screenshot)
+        if box is not None:
+            data = images.encode_png(images.decode_png(data, box), self.compression)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, name + '.png')
+        write_file_atomically(path, data)
+        self.written.append(path)
+
+    def flush(self):
+        '''
+        Waits until all queued screenshots are written.
+        '''
+        self._queue.join()
+
+    def close(self):
+        '''
+        Writes queued screenshots and stops the background thread.
+        '''
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+
+class ScreenshotOnFailureMixin(AssertionMixin):
+    '''
+    AssertionMixin taking a screenshot whenever an assertion fails.
+
+    Screenshots are taken only when screenshot_writer is set. Failures of element assertions
+    are cropped to the element unless screenshot_crop is False. Problems with taking the
+    screenshot are logged and never mask the assertion failure.
+    '''
+
+    screenshot_writer = None
+    screenshot_crop = True
+
+    _screenshot_counter = itertools.count(1)
+
+    def _failure(self, params, caller=None):
+        caller = caller or sys._getframe(1).f_code.co_name
+        if self.screenshot_writer is not None:
+            try:
+                self._take_failure_screenshot(caller, sys._getframe(1).f_locals)
+            except Exception:
+                logger.exception('Taking screenshot of failed assertion %s failed', caller)
+        super(ScreenshotOnFailureMixin, self)._failure(params, caller)
+
+    def _take_failure_screenshot(self, caller, arguments):
+        '''
+        Takes a screenshot of the driver or element the failed assertion was called with.
+
+        :param caller: name of the assertion method
+        :param arguments: local variables of the assertion method
+        '''
+        element = arguments.get('element', arguments.get('elem'))
+        driver = arguments.get('driver') or getattr(element, 'parent', None)
+        if driver is None:
+            return
+        box = None
+        if element is not None and self.screenshot_crop:
+            x, y, width, height, ratio = driver.execute_script(_ELEMENT_BOX_SCRIPT, unwrap_element(element))
+            box = (x * ratio, y * ratio, width * ratio, height * ratio)
+        screenshot = driver.get_screenshot_as_base64()
+        test_id = self.id() if callable(getattr(self, 'id', None)) else self.__class__.__name__
+        name = _RE_UNSAFE_CHARS.sub('_', '{0}-{1}-{2}'.format(
+            next(self._screenshot_counter), test_id, caller))
+        self.screenshot_writer.submit(name, screenshot, box)
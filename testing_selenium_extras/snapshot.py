@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import six
+from .cache import unwrap_element
+
+logger = logging.getLogger(__name__)
+
+
+# element properties that can be captured in a snapshot
+PROPERTIES = ('text', 'tag_name', 'rect', 'displayed', 'enabled', 'selected')
+
+# Defines getters of the properties listed in PROPERTIES and of attribute values.
+_GETTERS_SCRIPT = '''
+var getters = {
+    text: function (e) { return e.innerText; },
+    tag_name: function (e) { return e.tagName.toLowerCase(); },
+    rect: function (e) {
+        var r = e.getBoundingClientRect();
+        return {x: r.left + window.pageXOffset, y: r.top + window.pageYOffset, width: r.width, height: r.height};
+    },
+    displayed: function (e) {
+        return e.getClientRects().length > 0 && window.getComputedStyle(e).visibility !== 'hidden';
+    },
+    enabled: function (e) { return !e.disabled; },
+    selected: function (e) { return !!(e.checked || e.selected); }
+};
+function getAttribute(e, name) {
+    return name === 'value' ? e.value : e.getAttribute(name);
+}
+'''
+
+# Reads requested properties of all given elements at once. Arguments are the list
+# of elements, the list of property names (see PROPERTIES), the list of attribute
+# names and the list of CSS property names. Returns one object per element.
+_SNAPSHOT_SCRIPT = _GETTERS_SCRIPT + '''
+var elements = arguments[0], properties = arguments[1], attributes = arguments[2], cssProperties = arguments[3];
+return elements.map(function (element) {
+    var result = {properties: {}, attributes: {}, css: {}}, style = null, i;
+    for (i = 0; i < properties.length; i++) {
+        result.properties[properties[i]] = getters[properties[i]](element);
+    }
+    for (i = 0; i < attributes.length; i++) {
+        result.attributes[attributes[i]] = getAttribute(element, attributes[i]);
+    }
+    for (i = 0; i < cssProperties.length; i++) {
+        style = style || window.getComputedStyle(element);
+        result.css[cssProperties[i]] = style.getPropertyValue(cssProperties[i]);
+    }
+    return result;
+});
+'''
+
+# Defines functions finding elements by a chain of CSS selectors, each selector matched
+# inside the first element matching the previous one: queryFirst() returns the first
+# element matching the whole chain or null, queryAll() all of them.
+_QUERY_SCRIPT = '''
+function queryFirst(chain) {
+    var element = document;
+    for (var i = 0; element !== null && i < chain.length; i++) {
+        element = element.querySelector(chain[i]);
+    }
+    return element;
+}
+function queryAll(chain) {
+    var root = queryFirst(chain.slice(0, -1));
+    return root === null ? [] : root.querySelectorAll(chain[chain.length - 1]);
+}
+'''
+
+# Reads requested properties of all elements matching the chain of CSS selectors (the first
+# argument, see _QUERY_SCRIPT) column by column, with the same remaining arguments as
+# _SNAPSHOT_SCRIPT. Returns an object with properties, attributes and css objects, each
+# mapping names to arrays of values; rects are returned as [x, y, width, height] arrays.
+_COLUMNS_SCRIPT = _GETTERS_SCRIPT + _QUERY_SCRIPT + '''
+var elements = queryAll(arguments[0]);
+var properties = arguments[1], attributes = arguments[2], cssProperties = arguments[3];
+var result = {properties: {}, attributes: {}, css: {}}, i, j, column, style;
+for (i = 0; i < properties.length; i++) {
+    column = result.properties[properties[i]] = new Array(elements.length);
+    for (j = 0; j < elements.length; j++) {
+        column[j] = getters[properties[i]](elements[j]);
+        if (properties[i] === 'rect') {
+            column[j] = [column[j].x, column[j].y, column[j].width, column[j].height];
+        }
+    }
+}
+for (i = 0; i < attributes.length; i++) {
+    column = result.attributes[attributes[i]] = new Array(elements.length);
+    for (j = 0; j < elements.length; j++) {
+        column[j] = getAttribute(elements[j], attributes[i]);
+    }
+}
+for (i = 0; i < cssProperties.length; i++) {
+    column = result.css[cssProperties[i]] = new Array(elements.length);
+    for (j = 0; j < elements.length; j++) {
+        style = window.getComputedStyle(elements[j]);
+        column[j] = style.getPropertyValue(cssProperties[i]);
+    }
+}
+return result;
+'''
+
+
+def _check_properties(properties):
+    unknown = set(properties) - set(PROPERTIES)
+    if unknown:
+        raise ValueError('Unknown properties: {0}'.format(', '.join(sorted(unknown))))
+
+
+def _selector_chain(selector):
+    '''
+    Returns the CSS selector, or sequence of selectors each matched inside the first element
+    matching the previous one, as a list of selectors.
+    '''
+    return [selector] if isinstance(selector, six.string_types) else list(selector)
+
+
+def take_columns(driver, selector, properties=(), attributes=(), css_properties=()):
+    '''
+    Reads properties of all elements matching the CSS selector with one script call,
+    without creating element handles.
+
+    :param driver: WebDriver
+    :param selector: CSS selector, or sequence of selectors, see _selector_chain
+    :param properties: names of the properties to read, see PROPERTIES
+    :param attributes: names of the attributes to read
+    :param css_properties: names of the CSS properties to read
+    :return: dictionary with properties, attributes and css keys, each mapping names to lists
+        of values in document order; rects are [x, y, width, height] lists
+    '''
+    _check_properties(properties)
+    return driver.execute_script(
+        _COLUMNS_SCRIPT, _selector_chain(selector), list(properties), list(attributes), list(css_properties))
+
+
+class ElementSnapshot(object):
+    '''
+    Values of selected properties of a WebElement, read with a single script call.
+
+    Exposes the same read-only API as WebElement (text, tag_name, rect, get_attribute,
+    value_of_css_property, is_displayed, is_enabled and is_selected), so it can be
+    passed to AssertionMixin.assert_element_* methods instead of the element itself.
+    Accessing a value that was not captured raises ValueError.
+
+    Values are computed by JavaScript in the page, so they may slightly differ from
+    what the WebDriver commands return, most notably is_displayed() only checks that
+    the element is rendered and is not hidden using the visibility CSS property.
+    '''
+
+    def __init__(self, element, properties, attributes, css_properties):
+        self.element = element
+        self._properties = properties
+        self._attributes = attributes
+        self._css_properties = css_properties
+
+    @classmethod
+    def take(cls, element, properties=PROPERTIES, attributes=(), css_properties=()):
+        '''
+        Captures properties of a single element.
+
+        :param element: WebElement
+        :param properties: names of the properties to capture, see PROPERTIES
+        :param attributes: names of the attributes to capture
+        :param css_properties: names of the CSS properties to capture
+        :return: ElementSnapshot
+        '''
+        return cls.take_all([element], properties, attributes, css_properties)[0]
+
+    @classmethod
+    def take_all(cls, elements, properties=PROPERTIES, attributes=(), css_properties=()):
+        '''
+        Captures properties of many elements with one script call.
+
+        :param elements: list of WebElements, all from the same page
+        :param properties: names of the properties to capture, see PROPERTIES
+        :param attributes: names of the attributes to capture
+        :param css_properties: names of the CSS properties to capture
+        :return: list of ElementSnapshots, in the order of elements
+        '''
+        _check_properties(properties)
+        if not elements:
+            return []
+        driver = elements[0].parent
+        values = driver.execute_script(
+            _SNAPSHOT_SCRIPT, [unwrap_element(e) for e in elements],
+            list(properties), list(attributes), list(css_properties))
+        return [
+            cls(element, value['properties'], value['attributes'], value['css'])
+            for element, value in zip(elements, values)
+        ]
+
+    @staticmethod
+    def _lookup(values, name, kind):
+        try:
+            return values[name]
+        except KeyError:
+            raise ValueError('{0} {1} was not captured in the snapshot'.format(kind, name))
+
+    @property
+    def wrapped_element(self):
+        return unwrap_element(self.element)
+
+    @property
+    def id(self):
+        return self.element.id
+
+    @property
+    def parent(self):
+        return self.element.parent
+
+    @property
+    def text(self):
+        return self._lookup(self._properties, 'text', 'Property')
+
+    @property
+    def tag_name(self):
+        return self._lookup(self._properties, 'tag_name', 'Property')
+
+    @property
+    def rect(self):
+        return self._lookup(self._properties, 'rect', 'Property')
+
+    def is_displayed(self):
+        return self._lookup(self._properties, 'displayed', 'Property')
+
+    def is_enabled(self):
+        return self._lookup(self._properties, 'enabled', 'Property')
+
+    def is_selected(self):
+        return self._lookup(self._properties, 'selected', 'Property')
+
+    def get_attribute(self, name):
+        return self._lookup(self._attributes, name, 'Attribute')
+
+    def value_of_css_property(self, property_name):
+        return self._lookup(self._css_properties, property_name, 'CSS property')
+
+    def find_element_by_xpath(self, xpath):
+        return self.element.find_element_by_xpath(xpath)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+'''
+Timeline of the appearance of page object elements while the page loads.
+
+Loading a page object with timeline=True installs a MutationObserver that stamps every
+declared element and component with performance.now() (milliseconds since navigation
+start) when it first matches its selector. The stamps are collected by the same script
+call that polls for the missing elements, so recording costs no extra round-trips:
+
+    page = DashboardPage.load(driver, timeline=True)
+    print(page.load_timeline.format())
+    page.load_timeline.export(open('timeline.json', 'w'))
+
+The last element to appear (LoadTimeline.critical) is the one the load waited on.
+Elements already present when the observer was installed only get an upper bound of
+their appearance time, the time of the installation, and are marked as initial; if all
+elements were initial, the load did not wait on any of them and there is no critical one.
+'''
+
+import collections
+import itertools
+import json
+import logging
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+from .page_objects import PageComponent, PageElement
+from .snapshot import _QUERY_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+# Installs the observer once per document and load, then reports progress. The first
+# argument is the list of [name, selectors] targets, each with the chain of selectors of
+# the enclosing components and its own (see snapshot._QUERY_SCRIPT), the second one a key
+# identifying the load. Returns names of the targets not found yet, the time the observer
+# was installed and an object mapping names of found targets to [time, initial] pairs.
+_TIMELINE_SCRIPT = _QUERY_SCRIPT + '''
+var state = window.__seleniumExtrasTimeline;
+if (!state || state.key !== arguments[1]) {
+    if (state && state.observer) {
+        state.observer.disconnect();
+    }
+    state = window.__seleniumExtrasTimeline = {
+        key: arguments[1], observedAt: performance.now(), appeared: {}, pending: arguments[0], observer: null
+    };
+    var check = function (initial) {
+        var now = performance.now(), pending = [];
+        for (var i = 0; i < state.pending.length; i++) {
+            var target = state.pending[i];
+            if (queryFirst(target[1]) !== null) {
+                state.appeared[target[0]] = [now, initial];
+            } else {
+                pending.push(target);
+            }
+        }
+        state.pending = pending;
+        if (!pending.length && state.observer) {
+            state.observer.disconnect();
+            state.observer = null;
+        }
+    };
+    check(true);
+    if (state.pending.length) {
+        state.observer = new MutationObserver(function () { check(false); });
+        state.observer.observe(document, {attributes: true, childList: true, subtree: true});
+    }
+}
+return [state.pending.map(function (target) { return target[0]; }), state.observedAt, state.appeared];
+'''
+
+# Disconnects the observer of the load identified by the key (the first argument), if it
+# is still observing.
+_STOP_TIMELINE_SCRIPT = '''
+var state = window.__seleniumExtrasTimeline;
+if (state && state.key === arguments[0] && state.observer) {
+    state.observer.disconnect();
+    state.observer = null;
+}
+'''
+
+
+# appearance of a single element or component: dot-separated path of attribute names,
+# milliseconds since navigation start, and whether it was present before observing started
+TimelineEntry = collections.namedtuple('TimelineEntry', 'name appeared initial')
+
+# numbers of recorded loads, making observers of different loads of the same document distinct
+_loads = itertools.count(1)
+
+
+class LoadTimeline(object):
+    '''
+    Appearance times of the elements and components of a page object, earliest first.
+    '''
+
+    def __init__(self, page_object, observed_at, entries):
+        '''
+        :param page_object: name of the page object class
+        :param observed_at: milliseconds since navigation start at which observing started
+        :param entries: list of TimelineEntries
+        '''
+        self.page_object = page_object
+        self.observed_at = observed_at
+        self.entries = sorted(entries, key=lambda entry: (entry.appeared, entry.name))
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        critical = self.critical
+        return '<{0} {1} critical={2}>'.format(
+            self.__class__.__name__, self.page_object, critical.name if critical else None)
+
+    @property
+    def critical(self):
+        '''
+        Entry of the element that appeared last, or None if the timeline is empty or all
+        elements were present when observing started, so their appearance times are unknown.
+        '''
+        if not self.entries or self.entries[-1].initial:
+            return None
+        return self.entries[-1]
+
+    @property
+    def duration(self):
+        '''
+        Milliseconds from navigation start until the last element appeared, or None if
+        there is no critical element.
+        '''
+        critical = self.critical
+        return critical.appeared if critical else None
+
+    def as_dict(self):
+        return dict(
+            page_object=self.page_object,
+            observed_at=self.observed_at,
+            entries=[entry._asdict() for entry in self.entries],
+        )
+
+    def export(self, fp):
+        '''
+        Writes the timeline as JSON to the file-like object.
+        '''
+        json.dump(self.as_dict(), fp, indent=2, sort_keys=True)
+
+    def format(self):
+        '''
+        Returns the timeline as human readable text, one element per line.
+        '''
+        lines = ['{0}: observed from {1:.1f} ms'.format(self.page_object, self.observed_at)]
+        lines.extend(
+            '{0:>10.1f} ms  {1}{2}'.format(entry.appeared, entry.name, ' (initial)' if entry.initial else '')
+            for entry in self.entries)
+        return '\n'.join(lines)
+
+
+def _compile_targets(cls, selectors=None, path=()):
+    '''
+    Returns [name, selector chain] pairs of all elements and components declared in the
+    page object class, including nested ones.
+    '''
+    selectors = selectors if selectors is not None else cls._selectors
+    targets = []
+    for attr, value in cls._descriptors:
+        name = path + (attr,)
+        if isinstance(value, (PageElement, PageComponent)):
+            targets.append(['.'.join(name), list(selectors[name])])
+        if isinstance(value, PageComponent):
+            targets.extend(_compile_targets(value.__class__, selectors, name))
+    return targets
+
+
+class _timeline_complete(object):
+    '''
+    Wait condition that evaluates to True when all targets have appeared, keeping the
+    result of the last poll.
+    '''
+
+    def __init__(self, targets, key):
+        self.targets = targets
+        self.key = key
+        self.missing = None
+        self.observed_at = None
+        self.appeared = None
+
+    def __call__(self, driver):
+        self.missing, self.observed_at, self.appeared = driver.execute_script(
+            _TIMELINE_SCRIPT, self.targets, self.key)
+        return not self.missing
+
+
+def record_load_timeline(page, timeout, poll_frequency):
+    '''
+    Waits until all elements and components of the page object appear, like the batched
+    PageObject.wait_to_load, and returns the timeline of their appearance.
+
+    :raise TimeoutException: if some elements do not appear in time; the observer is
+        disconnected then
+    :return: LoadTimeline
+    '''
+    cls = page.__class__
+    key = '{0}.{1}#{2}'.format(cls.__module__, cls.__name__, next(_loads))
+    condition = _timeline_complete(_compile_targets(cls), key)
+    try:
+        WebDriverWait(page.driver, timeout, poll_frequency).until(condition)
+    except TimeoutException:
+        page.driver.execute_script(_STOP_TIMELINE_SCRIPT, key)
+        raise TimeoutException('Elements not found: {0}'.format(', '.join(condition.missing or ())))
+    entries = [TimelineEntry(name, appeared, initial) for name, (appeared, initial) in condition.appeared.items()]
+    return LoadTimeline(cls.__name__, condition.observed_at, entries)
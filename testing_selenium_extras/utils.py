@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import math
+import os
 import re
+import tempfile
+import threading
 import urllib.parse as urlparse
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,118 @@ def get_urlhash(driver):
 _RE_CLASS_SEP = re.compile(r'\s+')
 
 
+class LRUCache(object):
+    '''
+    Thread-safe mapping that keeps at most maxsize most recently used entries.
+    '''
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, factory):
+        '''
+        Returns value cached under the key, computing it with factory(key) on a miss.
+
+        :param key: hashable key
+        :param factory: callable creating the value from the key
+        :return: cached value
+        '''
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._entries[key] = value
+                return value
+        # computed without holding the lock, so that factories may use the cache too
+        value = factory(key)
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+            self._entries[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_PATTERN_CACHE = LRUCache(maxsize=256)
+
+
+def compile_pattern(pattern):
+    '''
+    Returns compiled regular expression, reusing previously compiled ones.
+
+    :param pattern: regular expression string or compiled regular expression
+    :return: compiled regular expression
+    '''
+    if hasattr(pattern, 'match'):
+        return pattern
+    return _PATTERN_CACHE.get(pattern, re.compile)
+
+
+def nearest_rank(fraction, count):
+    '''
+    Returns the 1-based rank of the value at given fraction of count sorted values by the
+    nearest-rank method: the smallest rank with at least that fraction of values at or below it.
+
+    :param fraction: number between 0 and 1
+    :param count: positive number of values
+    '''
+    # rounded first, so that e.g. 0.07 * 100 == 7.000000000000001 is rank 7, not 8
+    rank = int(math.ceil(round(fraction * count, 9)))
+    return min(max(rank, 1), count)
+
+
+def percentile(sorted_values, fraction):
+    '''
+    Returns the value at given fraction of sorted values (nearest-rank method).
+
+    :param sorted_values: list of values in ascending order
+    :param fraction: number between 0 and 1, e.g. 0.95 for the 95th percentile
+    :return: the value, or None if there are no values
+    '''
+    if not sorted_values:
+        return None
+    return sorted_values[nearest_rank(fraction, len(sorted_values)) - 1]
+
+
+def write_file_atomically(path, data):
+    '''
+    Replaces the file with the data atomically. The data is written to a temporary file
+    in the same directory first, unique to the call, so that readers never see a partially
+    written file and concurrent writers do not interfere.
+
+    :param path: file path
+    :param data: bytes to write
+    '''
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        # mkstemp creates files readable by the owner only
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+
+
 def get_css_class_list(element):
     '''
     Returns list of CSS classes given element has.
@@ -40,7 +157,8 @@ def get_css_class_list(element):
 
 def point_inside_rect(point, rect):
     '''
-    Returns True if the point is inside the rectangle, False if it is outside.
+    Returns True if the point is inside the rectangle, False if it is outside. The rectangle
+    includes its left and top edges, but not its right and bottom edges.
 
     :param point: 2-element tuple containing point coordinates
     :param rect: a dictionary with keys x, y, width and height
@@ -49,4 +167,4 @@ def point_inside_rect(point, rect):
     x, y = point
     dx = x - rect['x']
     dy = y - rect['y']
-    return dx >= 0 and dx < rect['width'] and dy >= 0 and dy <= rect['height']
+    return dx >= 0 and dx < rect['width'] and dy >= 0 and dy < rect['height']
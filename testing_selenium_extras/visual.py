@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+'''
+Visual regression checks of page components against baseline images.
+
+Screenshots are cropped to the component and compared with its baseline tile by tile.
+Every tile of an image is summarized by a hash computed for all tiles at once with NumPy;
+tiles whose hashes equal those of the baseline are skipped, and only the remaining ones are
+diffed pixel by pixel, with a tolerance for rendering noise. Baselines are PNG files that
+carry the hashes of their tiles in a private chunk, so an unchanged component is checked
+without decoding its baseline at all:
+
+    class MyTestCase(AssertionMixin, unittest.TestCase):
+        visual_baselines = BaselineStore('baselines')
+
+        def test_header(self):
+            page = HomePage.load(self.driver)
+            self.assert_element_visually_equal(page.header, 'home-header')
+
+A missing baseline is created from the first capture. When a comparison finds differences,
+the capture and an image with the differing pixels highlighted are written next to the
+baseline as <name>.actual.png and <name>.diff.png.
+'''
+
+import collections
+import logging
+import os
+import struct
+import weakref
+import numpy as np
+from selenium.common.exceptions import (
+    NoSuchElementException, StaleElementReferenceException, WebDriverException)
+from .cache import unwrap_element
+from .page_objects import PageComponent
+from .utils import write_file_atomically
+from . import images
+
+logger = logging.getLogger(__name__)
+
+
+# default edge length of compared tiles, in pixels
+TILE_SIZE = 32
+
+# default largest difference of a channel value not counted as a change
+PIXEL_TOLERANCE = 8
+
+IDENTICAL = 'identical'
+SIMILAR = 'similar'
+DIFFERENT = 'different'
+RESIZED = 'resized'
+CREATED = 'created'
+
+# private ancillary PNG chunk with the tile size, numbers of tile rows and columns, and
+# the tile hashes of a baseline image
+_HASHES_CHUNK = b'tiHs'
+_HASHES_HEADER = struct.Struct('>III')
+
+# highlight color of differing pixels in diff images
+_DIFF_COLOR = (255, 0, 0)
+
+# Scrolls the element (the first argument) into view unless it is already entirely
+# visible, then returns its viewport-relative box and the device pixel ratio.
+_COMPONENT_BOX_SCRIPT = '''
+var element = arguments[0], rect = element.getBoundingClientRect();
+if (rect.top < 0 || rect.left < 0 || rect.bottom > window.innerHeight || rect.right > window.innerWidth) {
+    element.scrollIntoView({block: 'nearest', inline: 'nearest'});
+    rect = element.getBoundingClientRect();
+}
+return [rect.left, rect.top, rect.width, rect.height, window.devicePixelRatio || 1];
+'''
+
+# outcome of comparing a capture with its baseline: one of the statuses above, list of
+# (x, y, width, height) boxes of the tiles with differing pixels, fraction of differing
+# pixels, and the largest difference of a channel value
+VisualDiff = collections.namedtuple('VisualDiff', 'status changed_tiles diff_ratio max_difference')
+
+# hash weights by tile size and number of channels
+_weights = {}
+
+# drivers that do not support element screenshots
+_page_screenshot_drivers = weakref.WeakSet()
+
+
+def _hash_weights(tile_size, channels):
+    key = (tile_size, channels)
+    if key not in _weights:
+        random = np.random.RandomState(tile_size * 8 + channels)
+        # odd weights, so that a change of a single value always changes the hash
+        weights = random.randint(0, 2 ** 62, size=(tile_size, tile_size, channels), dtype=np.int64)
+        _weights[key] = weights.astype(np.uint64) * np.uint64(2) + np.uint64(1)
+    return _weights[key]
+
+
+def _tiles(image, tile_size):
+    '''
+    Returns view of the image, padded with zeros to whole tiles, as a
+    (rows, columns, tile_size, tile_size, channels) array.
+    '''
+    height, width, channels = image.shape
+    rows, columns = -(-height // tile_size), -(-width // tile_size)
+    if (rows * tile_size, columns * tile_size) != (height, width):
+        padded = np.zeros((rows * tile_size, columns * tile_size, channels), dtype=image.dtype)
+        padded[:height, :width] = image
+        image = padded
+    return image.reshape(rows, tile_size, columns, tile_size, channels).swapaxes(1, 2)
+
+
+def tile_hashes(image, tile_size=TILE_SIZE):
+    '''
+    Returns hashes of the tiles of the image: weighted sums of their values modulo 2 ** 64.
+
+    Two different tiles have the same hash with probability of about 2 ** -64; a tile that
+    differs in a single value never has the same hash.
+
+    :param image: (height, width, channels) uint8 array
+    :return: (rows, columns) uint64 array
+    '''
+    weights = _hash_weights(tile_size, image.shape[2])
+    return np.einsum('rcijk,ijk->rc', _tiles(image, tile_size).astype(np.uint64), weights)
+
+
+def compare_images(actual, expected, tile_size=TILE_SIZE, pixel_tolerance=PIXEL_TOLERANCE,
+                   actual_hashes=None, expected_hashes=None):
+    '''
+    Compares two images tile by tile, diffing only tiles whose hashes differ.
+
+    :param actual: (height, width, channels) uint8 array
+    :param expected: (height, width, channels) uint8 array, or callable returning it; it is
+        not called when hashes of all tiles are equal
+    :param pixel_tolerance: largest difference of a channel value not counted as a change
+    :param actual_hashes: tile hashes of the actual image, computed if not given
+    :param expected_hashes: tile hashes of the expected image, computed if not given
+    :return: VisualDiff
+    '''
+    if actual_hashes is None:
+        actual_hashes = tile_hashes(actual, tile_size)
+    if expected_hashes is None:
+        expected = expected() if callable(expected) else expected
+        if expected.shape != actual.shape:
+            return VisualDiff(RESIZED, [], 1.0, None)
+        expected_hashes = tile_hashes(expected, tile_size)
+    elif expected_hashes.shape != actual_hashes.shape:
+        return VisualDiff(RESIZED, [], 1.0, None)
+    changed = actual_hashes != expected_hashes
+    if not changed.any():
+        return VisualDiff(IDENTICAL, [], 0.0, 0)
+    expected = expected() if callable(expected) else expected
+    if expected.shape != actual.shape:
+        return VisualDiff(RESIZED, [], 1.0, None)
+    # padding is the same in both images, so it never differs
+    difference = np.abs(
+        _tiles(actual, tile_size)[changed].astype(np.int16) - _tiles(expected, tile_size)[changed]).max(axis=-1)
+    differing = (difference > pixel_tolerance).sum(axis=(1, 2))
+    height, width = actual.shape[:2]
+    changed_tiles = [
+        (column * tile_size, row * tile_size,
+         min(tile_size, width - column * tile_size), min(tile_size, height - row * tile_size))
+        for (row, column), count in zip(np.argwhere(changed).tolist(), differing) if count]
+    diff_ratio = float(differing.sum()) / (height * width)
+    return VisualDiff(DIFFERENT if changed_tiles else SIMILAR, changed_tiles, diff_ratio, int(difference.max()))
+
+
+def diff_image(actual, expected, pixel_tolerance=PIXEL_TOLERANCE):
+    '''
+    Returns copy of the actual image with pixels differing from the expected one highlighted.
+    '''
+    result = actual.copy()
+    differing = (np.abs(actual.astype(np.int16) - expected).max(axis=-1) > pixel_tolerance)
+    result[differing] = (_DIFF_COLOR + (255,))[:result.shape[2]]
+    return result
+
+
+def capture(element):
+    '''
+    Takes a screenshot of the element.
+
+    The browser crops the screenshot if the driver supports element screenshots. Otherwise
+    the element is scrolled into view if needed, and the screenshot of the page is decoded
+    only up to the element.
+
+    :param element: WebElement or PageComponent
+    :return: (height, width, channels) uint8 array
+    '''
+    if isinstance(element, PageComponent):
+        element = element.element
+    element = unwrap_element(element)
+    driver = element.parent
+    if driver not in _page_screenshot_drivers:
+        try:
+            return images.decode_png(element.screenshot_as_png)
+        except (NoSuchElementException, StaleElementReferenceException):
+            raise
+        except WebDriverException as error:
+            logger.info('Element screenshots are not supported, cropping screenshots of the page: %s', error)
+            _page_screenshot_drivers.add(driver)
+    x, y, width, height, ratio = driver.execute_script(_COMPONENT_BOX_SCRIPT, element)
+    return images.decode_png(driver.get_screenshot_as_png(), (x * ratio, y * ratio, width * ratio, height * ratio))
+
+
+class BaselineStore(object):
+    '''
+    Directory of baseline images, one PNG file per name.
+    '''
+
+    def __init__(self, directory, tile_size=TILE_SIZE, compression=9, update=False):
+        '''
+        :param directory: directory of baseline images, created if needed
+        :param tile_size: edge length of compared tiles, in pixels
+        :param compression: zlib compression level of baseline images
+        :param update: replace baselines that differ from the capture instead of reporting
+            differences, e.g. after an intended change of the design
+        '''
+        self.directory = directory
+        self.tile_size = tile_size
+        self.compression = compression
+        self.update = update
+
+    def path(self, name, suffix=''):
+        return os.path.join(self.directory, name + suffix + '.png')
+
+    def _write(self, path, data):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        write_file_atomically(path, data)
+
+    def save(self, name, image, hashes=None):
+        '''
+        Writes the image as the baseline of given name, with its tile hashes.
+        '''
+        if hashes is None:
+            hashes = tile_hashes(image, self.tile_size)
+        payload = _HASHES_HEADER.pack(self.tile_size, *hashes.shape) + hashes.astype('>u8').tobytes()
+        self._write(self.path(name), images.encode_png(image, self.compression, [(_HASHES_CHUNK, payload)]))
+
+    def load(self, name):
+        '''
+        Reads the baseline of given name.
+
+        :return: pair of the PNG data and the tile hashes, which are None if the baseline
+            was stored without them or with a different tile size
+        :raise IOError: if there is no such baseline
+        '''
+        with open(self.path(name), 'rb') as fp:
+            data = fp.read()
+        payload = images.read_chunk(data, _HASHES_CHUNK)
+        if payload is None:
+            return data, None
+        tile_size, rows, columns = _HASHES_HEADER.unpack_from(payload)
+        if tile_size != self.tile_size:
+            return data, None
+        hashes = np.frombuffer(payload, dtype='>u8', offset=_HASHES_HEADER.size).astype(np.uint64)
+        return data, hashes.reshape(rows, columns)
+
+    def compare(self, name, image, pixel_tolerance=PIXEL_TOLERANCE, record=True):
+        '''
+        Compares the image with the baseline of given name.
+
+        :param record: create the baseline if there is none yet, replace it if update is set,
+            and write the capture and diff images when they differ
+        :raise IOError: if there is no such baseline and record is False
+        :return: VisualDiff
+        '''
+        hashes = tile_hashes(image, self.tile_size)
+        if record and not os.path.exists(self.path(name)):
+            logger.warning('Creating baseline %s', self.path(name))
+            self.save(name, image, hashes)
+            return VisualDiff(CREATED, [], 0.0, 0)
+        data, expected_hashes = self.load(name)
+        decoded = []
+
+        def expected():
+            decoded.append(images.decode_png(data))
+            return decoded[0]
+        diff = compare_images(image, expected, self.tile_size, pixel_tolerance, hashes, expected_hashes)
+        if not record or diff.status in (IDENTICAL, SIMILAR):
+            return diff
+        if self.update:
+            logger.warning('Updating baseline %s', self.path(name))
+            self.save(name, image, hashes)
+            return diff
+        self._write(self.path(name, '.actual'), images.encode_png(image, self.compression))
+        if diff.status == DIFFERENT:
+            self._write(self.path(name, '.diff'),
+                        images.encode_png(diff_image(image, decoded[0], pixel_tolerance), self.compression))
+        return diff
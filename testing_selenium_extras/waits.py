@@ -1,34 +1,514 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import time
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from .snapshot import _GETTERS_SCRIPT
 
 logger = logging.getLogger(__name__)
 
 
-class ajax_call_is_pending(object):
+# default number of seconds a page is given to settle down within a single wait condition call
+SETTLE_TIMEOUT = 10
+
+# default number of seconds without pending AJAX calls after which the page is considered idle
+AJAX_QUIET_PERIOD = 0.1
+
+# default timeout of AdaptiveWait, and its first and longest interval between polls, in seconds
+WAIT_TIMEOUT = 10
+POLL_INITIAL = 0.05
+POLL_MAX = 1.0
+
+# Installs (once per document) counters of pending XMLHttpRequest / fetch calls and of
+# running CSS animations and transitions.
+_TRACKING_SCRIPT = '''
+if (!window.__seleniumExtras) {
+    var state = window.__seleniumExtras = {pendingRequests: 0, runningAnimations: 0};
+    var decrement = function (name) {
+        return function () { state[name] = Math.max(0, state[name] - 1); };
+    };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pendingRequests++;
+        this.addEventListener('loadend', decrement('pendingRequests'));
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            decrement('pendingRequests')();
+            throw e;
+        }
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            state.pendingRequests++;
+            var promise = fetch.apply(this, arguments);
+            promise.then(decrement('pendingRequests'), decrement('pendingRequests'));
+            return promise;
+        };
+    }
+    var increment = function () { state.runningAnimations++; };
+    document.addEventListener('animationstart', increment, true);
+    document.addEventListener('transitionrun', increment, true);
+    ['animationend', 'animationcancel', 'transitionend', 'transitioncancel'].forEach(function (type) {
+        document.addEventListener(type, decrement('runningAnimations'), true);
+    });
+}
+'''
+
+# Asynchronous script that waits inside the page until it gets idle. Arguments are the kind of
+# activity ('requests' or 'animations'), timeout and quiet period in milliseconds. Calls back
+# with true when the page got idle, with false on timeout.
+_SETTLE_SCRIPT = _TRACKING_SCRIPT + '''
+var callback = arguments[arguments.length - 1];
+var kind = arguments[0], deadline = Date.now() + arguments[1], quietPeriod = arguments[2];
+var state = window.__seleniumExtras, idleSince = null, idleFrames = 0;
+
+function animationsRunning() {
+    if (state.runningAnimations > 0) {
+        return true;
+    }
+    return !!document.getAnimations && document.getAnimations().some(function (animation) {
+        return animation.playState === 'running';
+    });
+}
+
+function checkRequests() {
+    var now = Date.now();
+    if (state.pendingRequests > 0) {
+        idleSince = null;
+    } else if (idleSince === null) {
+        idleSince = now;
+    }
+    if (idleSince !== null && now - idleSince >= quietPeriod) {
+        callback(true);
+    } else if (now >= deadline) {
+        callback(false);
+    } else {
+        setTimeout(checkRequests, 10);
+    }
+}
+
+function checkAnimations() {
+    // the page is idle once two consecutive frames were rendered with no animation running
+    idleFrames = animationsRunning() ? 0 : idleFrames + 1;
+    if (idleFrames >= 2) {
+        callback(true);
+    } else if (Date.now() >= deadline) {
+        callback(false);
+    } else {
+        window.requestAnimationFrame(checkAnimations);
+    }
+}
+
+if (kind === 'requests') {
+    checkRequests();
+} else {
+    window.requestAnimationFrame(checkAnimations);
+}
+'''
+
+
+def install_activity_tracking(driver):
+    '''
+    Installs counters of pending AJAX calls and running animations in the current document.
+
+    Wait conditions install them on first use as well, but AJAX calls started before that are
+    not tracked. Call this function right after loading the page to track all of them.
+
+    :param driver: WebDriver
+    '''
+    driver.execute_script(_TRACKING_SCRIPT)
+
+
+class _page_settles(object):
+    '''
+    Base class of wait conditions that block inside the page, in a single asynchronous script
+    call, until given kind of activity ends or the timeout expires.
+
+    Note that the script timeout of the driver (see WebDriver.set_script_timeout) must be
+    longer than the timeout of the condition.
+    '''
+
+    kind = None
+
+    def __init__(self, timeout=SETTLE_TIMEOUT, quiet_period=0):
+        self.timeout = timeout
+        self.quiet_period = quiet_period
+
+    def __call__(self, driver):
+        return driver.execute_async_script(
+            _SETTLE_SCRIPT, self.kind, int(self.timeout * 1000), int(self.quiet_period * 1000))
+
+
+class ajax_call_is_pending(_page_settles):
     '''
     Wait condition that evaluates to True only if there is no pending AJAX calls.
 
-    TODO To be moved from CaMon.
+    Both XMLHttpRequest and fetch calls are tracked. The page is considered idle when no call
+    was pending for quiet_period seconds, so that calls started from callbacks of other calls
+    are waited for as well.
+    '''
+
+    kind = 'requests'
+
+    def __init__(self, timeout=SETTLE_TIMEOUT, quiet_period=AJAX_QUIET_PERIOD):
+        super(ajax_call_is_pending, self).__init__(timeout, quiet_period)
+
+
+class animation_is_running(_page_settles):
+    '''
+    Wait condition that evaluates to True only if there is no animations running on the page
+    anymore.
+
+    Both CSS animations and transitions are tracked, as well as Web Animations where supported.
+    The page is considered idle when two consecutive animation frames are rendered with no
+    animation running.
+    '''
+
+    kind = 'animations'
+
+
+# Evaluates a tree of in-page conditions (the first argument). Each node is an array starting
+# with the kind of the condition, followed by its arguments; see _InPageCondition.spec().
+_CONDITIONS_SCRIPT = _GETTERS_SCRIPT + '''
+function evaluate(spec) {
+    var element = null;
+    switch (spec[0]) {
+    case 'all':
+        return spec[1].every(evaluate);
+    case 'any':
+        return spec[1].some(evaluate);
+    case 'none':
+        return !spec[1].some(evaluate);
+    case 'title':
+        return document.title === spec[1];
+    case 'title_contains':
+        return document.title.indexOf(spec[1]) !== -1;
+    case 'urlhash':
+        return window.location.hash.replace(/^#/, '') === spec[1];
+    }
+    element = document.querySelector(spec[1]);
+    if (element === null) {
+        return false;
+    }
+    switch (spec[0]) {
+    case 'present':
+        return true;
+    case 'visible':
+        return getters.displayed(element);
+    case 'text':
+        return getters.text(element).trim() === spec[2];
+    case 'text_contains':
+        return getters.text(element).indexOf(spec[2]) !== -1;
+    case 'class':
+        return element.classList.contains(spec[2]);
+    }
+    throw new Error('Unknown condition: ' + spec[0]);
+}
+return evaluate(arguments[0]);
+'''
+
+
+class _InPageCondition(object):
+    '''
+    Base class of wait conditions evaluated by a single script call, which can be combined
+    by all_of, any_of and none_of into a single script call as well.
+    '''
+
+    def spec(self):
+        '''
+        Returns the condition as a node of the tree evaluated by _CONDITIONS_SCRIPT.
+        '''
+        raise NotImplementedError()
+
+    @property
+    def compatible(self):
+        '''
+        True if the whole condition can be evaluated in the page.
+        '''
+        return True
+
+    def __call__(self, driver):
+        return driver.execute_script(_CONDITIONS_SCRIPT, self.spec())
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(self.__class__.__name__, self.spec() if self.compatible else None)
+
+
+class _element_condition(_InPageCondition):
+    kind = None
+
+    def __init__(self, selector, *args):
+        self.selector = selector
+        self.args = args
+
+    def spec(self):
+        return [self.kind, self.selector] + list(self.args)
+
+
+class element_is_present(_element_condition):
+    '''
+    Wait condition that evaluates to True when an element matching the CSS selector exists.
+    '''
+
+    kind = 'present'
+
+
+class element_is_visible(_element_condition):
+    '''
+    Wait condition that evaluates to True when the first element matching the CSS selector
+    is displayed.
+    '''
+
+    kind = 'visible'
+
+
+class element_text_equal(_element_condition):
+    '''
+    Wait condition that evaluates to True when text of the first element matching the CSS
+    selector, without leading and trailing white space, equals the expected text.
+    '''
+
+    kind = 'text'
+
+    def __init__(self, selector, text):
+        super(element_text_equal, self).__init__(selector, text)
+
+
+class element_text_contains(_element_condition):
+    '''
+    Wait condition that evaluates to True when text of the first element matching the CSS
+    selector contains the expected text.
     '''
 
-    def __init__(self):
-        pass
+    kind = 'text_contains'
 
-    def __call__(self):
-        pass
+    def __init__(self, selector, text):
+        super(element_text_contains, self).__init__(selector, text)
 
 
-class animation_is_running(object):
+class element_has_css_class(_element_condition):
+    '''
+    Wait condition that evaluates to True when the first element matching the CSS selector
+    has the CSS class.
     '''
-    Wait condition that evaluates to True only if there is some animations running
-    on the page.
 
-    TODO To be moved from CaMon.
+    kind = 'class'
+
+    def __init__(self, selector, css_class):
+        super(element_has_css_class, self).__init__(selector, css_class)
+
+
+class _document_condition(_InPageCondition):
+    kind = None
+
+    def __init__(self, value):
+        self.value = value
+
+    def spec(self):
+        return [self.kind, self.value]
+
+
+class title_equal(_document_condition):
     '''
+    Wait condition that evaluates to True when the document title equals the expected one.
+    '''
+
+    kind = 'title'
+
+
+class title_contains(_document_condition):
+    '''
+    Wait condition that evaluates to True when the document title contains the expected text.
+    '''
+
+    kind = 'title_contains'
+
+
+class urlhash_equal(_document_condition):
+    '''
+    Wait condition that evaluates to True when the hash part of the current URL (without #)
+    equals the expected one.
+    '''
+
+    kind = 'urlhash'
+
+
+# CSS selectors equivalent to locators of selenium expected conditions
+_LOCATOR_SELECTORS = {
+    By.CSS_SELECTOR: lambda value: value,
+    By.ID: lambda value: '[id="{0}"]'.format(value),
+    By.NAME: lambda value: '[name="{0}"]'.format(value),
+    By.CLASS_NAME: lambda value: '[class~="{0}"]'.format(value),
+    By.TAG_NAME: lambda value: value,
+}
+
+
+def _translate(condition):
+    '''
+    Returns in-page equivalent of a selenium expected condition, or None if there is none.
+    '''
+    if isinstance(condition, _InPageCondition):
+        return condition
+    if isinstance(condition, expected_conditions.title_is):
+        return title_equal(condition.title)
+    if isinstance(condition, expected_conditions.title_contains):
+        return title_contains(condition.title)
+    locator = getattr(condition, 'locator', None)
+    if locator is None or locator[0] not in _LOCATOR_SELECTORS:
+        return None
+    selector = _LOCATOR_SELECTORS[locator[0]](locator[1])
+    if isinstance(condition, expected_conditions.presence_of_element_located):
+        return element_is_present(selector)
+    if isinstance(condition, expected_conditions.visibility_of_element_located):
+        return element_is_visible(selector)
+    if isinstance(condition, expected_conditions.text_to_be_present_in_element):
+        return element_text_contains(selector, condition.text)
+    return None
+
+
+class _composite(_InPageCondition):
+    '''
+    Base class of condition combinators.
+
+    Conditions that can be evaluated in the page (the in-page conditions of this module,
+    their combinations and the selenium expected conditions with in-page equivalents) are
+    evaluated together with a single script call per poll; the others one by one, only when
+    the outcome is not decided by the in-page ones. Combinators evaluate to True or False,
+    and a WebDriverException raised by a condition counts as the condition not being met.
+    '''
+
+    kind = None
+
+    def __init__(self, *conditions):
+        self.conditions = tuple(conditions)
+        self._in_page = []
+        self._others = []
+        for condition in self.conditions:
+            translated = _translate(condition)
+            if translated is not None and translated.compatible:
+                self._in_page.append(translated)
+            else:
+                self._others.append(translated or condition)
+
+    @property
+    def compatible(self):
+        return not self._others
+
+    def spec(self):
+        return [self.kind, [condition.spec() for condition in self._in_page]]
+
+    def __call__(self, driver):
+        in_page = driver.execute_script(_CONDITIONS_SCRIPT, self.spec()) if self._in_page else None
+        return self._combine(in_page, (_evaluate(condition, driver) for condition in self._others))
+
+    def _combine(self, in_page, others):
+        '''
+        Combines the result of the in-page conditions (None if there are none) with lazily
+        evaluated results of the other conditions.
+        '''
+        raise NotImplementedError()
+
+
+def _evaluate(condition, driver):
+    try:
+        return bool(condition(driver))
+    except WebDriverException:
+        return False
+
+
+class all_of(_composite):
+    '''
+    Wait condition that evaluates to True when all given conditions are met.
+    '''
+
+    kind = 'all'
+
+    def _combine(self, in_page, others):
+        return in_page is not False and all(others)
+
+
+class any_of(_composite):
+    '''
+    Wait condition that evaluates to True when at least one of given conditions is met.
+    '''
+
+    kind = 'any'
+
+    def _combine(self, in_page, others):
+        return in_page is True or any(others)
+
+
+class none_of(_composite):
+    '''
+    Wait condition that evaluates to True when none of given conditions is met.
+    '''
+
+    kind = 'none'
+
+    def _combine(self, in_page, others):
+        return in_page is not False and not any(others)
+
+
+class AdaptiveWait(object):
+    '''
+    Waits for a condition like WebDriverWait, but polls often at first and then less and
+    less often: the interval between polls starts at initial_poll and is multiplied by
+    backoff after every poll, up to max_poll.
+    '''
+
+    def __init__(self, driver, timeout=WAIT_TIMEOUT, initial_poll=POLL_INITIAL, max_poll=POLL_MAX,
+                 backoff=2, ignored_exceptions=(NoSuchElementException,)):
+        '''
+        :param driver: WebDriver
+        :param timeout: number of seconds to wait for
+        :param initial_poll: number of seconds between the first and the second poll
+        :param max_poll: maximum number of seconds between polls
+        :param backoff: factor the interval grows by after every poll
+        :param ignored_exceptions: exceptions raised by the condition that count as not met
+        '''
+        self.driver = driver
+        self.timeout = timeout
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.ignored_exceptions = tuple(ignored_exceptions)
+        self.polls = 0
+
+    def __repr__(self):
+        return '<{0} timeout={1}>'.format(self.__class__.__name__, self.timeout)
+
+    def _wait(self, method, expected, message):
+        deadline = time.time() + self.timeout
+        interval = self.initial_poll
+        self.polls = 0
+        while True:
+            self.polls += 1
+            try:
+                value = method(self.driver)
+                if bool(value) == expected:
+                    return value
+            except self.ignored_exceptions:
+                if not expected:
+                    return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutException(message)
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
 
-    def __init__(self):
-        pass
+    def until(self, method, message=''):
+        '''
+        Calls the method with the driver until it returns a truthy value, which is returned.
+        '''
+        return self._wait(method, True, message)
 
-    def __call__(self):
-        pass
+    def until_not(self, method, message=''):
+        '''
+        Calls the method with the driver until it returns a falsy value or raises one of
+        ignored exceptions.
+        '''
+        return self._wait(method, False, message)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+import unittest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from testing_selenium_extras.aio import (
+    AsyncAssertionMixin, AsyncCommandExecutor, AsyncPageObject, AsyncWebDriver, AsyncWebElement)
+from testing_selenium_extras.fake import FakeWebDriverServer
+from testing_selenium_extras.page_objects import PageComponent, PageElement, PageElements
+from tests.test_round_trips import HTML, URL
+
+logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+
+
+class Header(PageComponent):
+    logo = PageElement('.-logo')
+    links = PageElements('a')
+
+
+class StackOverflowPage(AsyncPageObject):
+    header = Header('.so-header')
+    copyright_label = PageElement('#copyright')
+
+
+class MissingPage(AsyncPageObject):
+    missing = PageElement('#missing')
+
+
+class AsyncTestCase(AsyncAssertionMixin, unittest.TestCase):
+    def setUp(self):
+        self.server = FakeWebDriverServer({URL: HTML}, latency=0.05)
+        self.server.start()
+        self.executor = AsyncCommandExecutor(self.server.url)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.executor.close()
+        self.loop.close()
+        self.server.stop()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    async def check_page(self):
+        driver = await AsyncWebDriver.start(self.executor)
+        try:
+            await driver.get(URL)
+            page = await StackOverflowPage.load(driver, batched=True)
+            logo = await page.header.logo
+            await self.assert_element_visible(logo)
+            await self.assert_element_text_equal(logo, 'Stack Overflow')
+            await self.assert_document_title_equal(driver, 'Stack Overflow')
+            return await page.header.links.extract(attributes=('href',))
+        finally:
+            await driver.quit()
+
+    def test_sessions_run_concurrently(self):
+        async def run():
+            return await asyncio.gather(*[self.check_page() for _ in range(10)])
+
+        started = time.time()
+        results = self.run_async(run())
+        elapsed = time.time() - started
+        self.assertEqual(results[0]['attributes']['href'], ['/', '/questions'])
+        # each check takes 9 round-trips of 50 ms
+        self.assertLess(elapsed, 10 * 9 * 0.05 / 3)
+        self.assertEqual(self.server.sessions, {})
+        self.assertLessEqual(len(self.executor._idle), 10)
+
+    def test_page_object_lookups(self):
+        async def run():
+            driver = await AsyncWebDriver.start(self.executor)
+            await driver.get(URL)
+            page = await StackOverflowPage.load(driver)
+            element = await page.header.element
+            self.assertIsInstance(element, AsyncWebElement)
+            self.assertEqual(await (await page.copyright_label).tag_name(), 'p')
+            self.assertEqual(await page.header.links.count(), 2)
+            with self.assertRaises(NoSuchElementException):
+                await MissingPage.load(driver)
+            with self.assertRaises(TimeoutException):
+                await MissingPage.load(driver, batched=True, timeout=0.1, poll_frequency=0.05)
+            await driver.quit()
+        self.run_async(run())
+
+    def test_assertion_failure(self):
+        async def run():
+            driver = await AsyncWebDriver.start(self.executor)
+            await driver.get(URL)
+            page = await StackOverflowPage.load(driver)
+            with self.assertRaises(AssertionError) as context:
+                await self.assert_element_css_class_contains(await page.header.logo, 'missing')
+            self.assertEqual(context.exception.args[0], 'assert_element_css_class_contains')
+            with self.assertRaises(NotImplementedError):
+                self.assert_element_child_of(await page.header.logo, await page.header.element)
+            with self.assertRaises(NotImplementedError):
+                self.assert_element_visually_equal(await page.header.logo, 'logo.png')
+            with self.assertRaises(NotImplementedError):
+                self.assert_element_visually_not_equal(await page.header.logo, 'logo.png')
+            await driver.quit()
+        self.run_async(run())
+
+    def test_attribute_assertions(self):
+        async def run():
+            driver = await AsyncWebDriver.start(self.executor)
+            await driver.get(URL)
+            logo = await (await StackOverflowPage.load(driver)).header.logo
+            await self.assert_element_attr_equal(logo, 'href', '/')
+            await self.assert_element_attr_not_equal(logo, 'href', '/questions')
+            with self.assertRaises(AssertionError):
+                await self.assert_element_attr_equal(logo, 'class', 'logo')
+            await driver.quit()
+        self.run_async(run())
+
+
+class ConnectionReuseTestCase(unittest.TestCase):
+    '''
+    Runs commands against a bare HTTP server that misbehaves on the second request.
+    '''
+
+    RESPONSE = (b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                b'Content-Length: 25\r\n\r\n{"status": 0, "value": 1}')
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.requests = 0
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_commands(self, second_response):
+        async def handle(reader, writer):
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                length = 0
+                while line not in (b'\r\n', b''):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                    line = await reader.readline()
+                await reader.readexactly(length)
+                self.requests += 1
+                writer.write(second_response if self.requests == 2 else self.RESPONSE)
+                await writer.drain()
+                if self.requests == 2:
+                    break
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            executor = AsyncCommandExecutor('http://127.0.0.1:{0}'.format(port))
+            try:
+                params = dict(sessionId='1', script='return 1', args=[])
+                await executor.execute('executeScript', params)
+                return await executor.execute('executeScript', params)
+            finally:
+                executor.close()
+                server.close()
+        return self.loop.run_until_complete(run())
+
+    def test_closed_idle_connection_retried(self):
+        self.assertEqual(self.run_commands(b'')['value'], 1)
+        self.assertEqual(self.requests, 3)
+
+    def test_partial_response_not_retried(self):
+        with self.assertRaises(asyncio.IncompleteReadError):
+            self.run_commands(self.RESPONSE[:-10])
+        self.assertEqual(self.requests, 2)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.snapshot import ElementSnapshot
+
+
+class StubDriver(object):
+    title = 'Stack Overflow'
+    current_url = 'http://stackoverflow.com/#questions'
+
+
+class SnapshotDriver(object):
+    def __init__(self):
+        self.scripts = []
+
+    def execute_script(self, script, elements, properties, attributes, css_properties):
+        self.scripts.append(script)
+        return [
+            dict(properties=dict(text='Questions', tag_name='a', displayed=True),
+                 attributes={'class': 'nav js-gps-track'}, css={})
+            for _ in elements
+        ]
+
+
+class StubElement(object):
+    def __init__(self, driver):
+        self.parent = driver
+
+
+class AssertionMixinTestCase(unittest.TestCase):
+    def setUp(self):
+        self.assertions = AssertionMixin()
+        self.driver = StubDriver()
+
+    def test_failure_reports_assertion_name(self):
+        with self.assertRaises(AssertionError) as context:
+            self.assertions.assert_document_title_equal(self.driver, 'Server Fault')
+        self.assertEqual(context.exception.args[0], 'assert_document_title_equal')
+
+    def test_title_matches(self):
+        self.assertions.assert_document_title_matches(self.driver, r'Stack')
+        self.assertRaises(AssertionError, self.assertions.assert_document_title_not_matches, self.driver, r'Stack')
+
+    def test_urlhash_matches(self):
+        self.assertions.assert_urlhash_matches(self.driver, r'quest')
+        self.assertRaises(AssertionError, self.assertions.assert_urlhash_matches, self.driver, r'answers')
+
+
+class RectElement(object):
+    def __init__(self, width, height):
+        self.rect = dict(x=10, y=20, width=width, height=height)
+
+
+class RectAssertionsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.assertions = AssertionMixin()
+
+    def test_empty_rects(self):
+        for width, height in ((0, 0), (0, 30), (100, 0), (100, 0.0005)):
+            element = RectElement(width, height)
+            self.assertions.assert_element_rect_empty(element)
+            self.assertRaises(AssertionError, self.assertions.assert_element_rect_not_empty, element)
+
+    def test_non_empty_rects(self):
+        for width, height in ((100, 30), (1, 1), (0.5, 200)):
+            element = RectElement(width, height)
+            self.assertions.assert_element_rect_not_empty(element)
+            self.assertRaises(AssertionError, self.assertions.assert_element_rect_empty, element)
+
+
+class ElementSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.assertions = AssertionMixin()
+        self.driver = SnapshotDriver()
+        self.element = StubElement(self.driver)
+
+    def test_assertions_accept_snapshot(self):
+        snapshot = ElementSnapshot.take(self.element, ['text', 'tag_name', 'displayed'], ['class'])
+        self.assertions.assert_element_text_equal(snapshot, 'Questions')
+        self.assertions.assert_element_tag_name_equal(snapshot, 'a')
+        self.assertions.assert_element_visible(snapshot)
+        self.assertions.assert_element_css_class_contains(snapshot, 'js-gps-track')
+        self.assertEqual(len(self.driver.scripts), 1)
+        self.assertRaises(ValueError, snapshot.value_of_css_property, 'color')
+
+    def test_properties_equal(self):
+        self.assertions.assert_element_properties_equal(
+            self.element, dict(text='Questions', displayed=True), attributes={'class': 'nav js-gps-track'})
+        self.assertRaises(
+            AssertionError, self.assertions.assert_element_properties_equal, self.element, dict(tag_name='div'))
+        self.assertEqual(len(self.driver.scripts), 2)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from selenium.common.exceptions import StaleElementReferenceException
+from testing_selenium_extras.cache import ElementCache, unwrap_element
+
+
+class StubElement(object):
+    def __init__(self, text, stale=False):
+        self._text = text
+        self.stale = stale
+
+    @property
+    def text(self):
+        if self.stale:
+            raise StaleElementReferenceException()
+        return self._text
+
+
+class ElementCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = ElementCache()
+        self.lookups = []
+
+    def resolve(self):
+        element = StubElement('item {0}'.format(len(self.lookups)))
+        self.lookups.append(element)
+        return element
+
+    def test_hit_reuses_handle(self):
+        first = self.cache.get('key', self.resolve)
+        second = self.cache.get('key', self.resolve)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.lookups), 1)
+        self.assertEqual(self.cache.stats(), dict(hits=1, misses=1, stale=0, size=1))
+
+    def test_stale_handle_is_resolved_again(self):
+        element = self.cache.get('key', self.resolve)
+        self.lookups[0].stale = True
+        self.assertEqual(element.text, 'item 1')
+        self.assertIs(unwrap_element(element), self.lookups[1])
+        self.assertEqual(self.cache.stale, 1)
+
+    def test_invalidate(self):
+        self.cache.get('key', self.resolve)
+        self.cache.invalidate()
+        self.cache.get('key', self.resolve)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(len(self.lookups), 2)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from selenium.webdriver.remote.webdriver import WebDriver
+from testing_selenium_extras.executors import PooledRemoteConnection, create_pool_manager
+from testing_selenium_extras.fake import FakeWebDriverServer
+
+URL = 'http://example.com/'
+
+HTML = '<html><head><title>Long page</title></head><body>{0}</body></html>'.format(
+    ''.join('<p class="row">Row {0}</p>'.format(i) for i in range(500)))
+
+
+class PooledRemoteConnectionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeWebDriverServer({URL: HTML})
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connections_reused(self):
+        driver = WebDriver(PooledRemoteConnection(self.server.url), desired_capabilities={})
+        driver.get(URL)
+        self.assertEqual(driver.title, 'Long page')
+        self.assertEqual(len(driver.find_elements_by_css_selector('.row')), 500)
+        driver.quit()
+        self.assertEqual(self.server.connections, 1)
+
+    def test_responses_compressed(self):
+        sizes = []
+        for compress in (True, False):
+            driver = WebDriver(PooledRemoteConnection(self.server.url, compress=compress), desired_capabilities={})
+            driver.get(URL)
+            sent = self.server.bytes_sent
+            self.assertEqual(driver.page_source, HTML)
+            sizes.append(self.server.bytes_sent - sent)
+            driver.quit()
+        self.assertLess(sizes[0] * 5, sizes[1])
+
+    def test_pool_manager_shared(self):
+        manager = create_pool_manager(pool_size=1)
+        drivers = [WebDriver(PooledRemoteConnection(self.server.url, manager), desired_capabilities={})
+                   for _ in range(3)]
+        for driver in drivers:
+            driver.get(URL)
+            driver.quit()
+        self.assertEqual(self.server.connections, 1)
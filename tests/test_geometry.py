@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from testing_selenium_extras import geometry, utils
+
+
+def brute_force_overlaps(rects):
+    return [
+        (i, j)
+        for i in range(len(rects))
+        for j in range(i + 1, len(rects))
+        if min(rects[i][0] + rects[i][2], rects[j][0] + rects[j][2]) - max(rects[i][0], rects[j][0]) > utils.EPSILON and
+        min(rects[i][1] + rects[i][3], rects[j][1] + rects[j][3]) - max(rects[i][1], rects[j][1]) > utils.EPSILON
+    ]
+
+
+class PointsTestCase(unittest.TestCase):
+    def test_edges_are_half_open(self):
+        rect = dict(x=10, y=10, width=20, height=20)
+        self.assertTrue(utils.point_inside_rect((10, 10), rect))
+        self.assertFalse(utils.point_inside_rect((30, 20), rect))
+        self.assertFalse(utils.point_inside_rect((20, 30), rect))
+
+    def test_points_inside_rects_matches_scalar_check(self):
+        rects = [dict(x=10, y=10, width=20, height=20), dict(x=0, y=0, width=15, height=40)]
+        points = [(10, 10), (30, 20), (20, 30), (5, 39), (14.9, 12)]
+        matrix = geometry.points_inside_rects(points, rects)
+        self.assertEqual(matrix.shape, (5, 2))
+        for i, point in enumerate(points):
+            for j, rect in enumerate(rects):
+                self.assertEqual(bool(matrix[i, j]), utils.point_inside_rect(point, rect))
+
+
+class EmptyRectsTestCase(unittest.TestCase):
+    def test_zero_width_or_height(self):
+        rects = [[0, 0, 10, 10], [0, 0, 0, 10], [0, 0, 10, 0], [0, 0, 0.0005, 10], [0, 0, 0.01, 0.01]]
+        self.assertEqual(geometry.empty_rects(rects).tolist(), [False, True, True, True, False])
+
+
+class OverlapsTestCase(unittest.TestCase):
+    def test_touching_and_empty_rects_do_not_overlap(self):
+        rects = [[0, 0, 10, 10], [10, 0, 10, 10], [0, 10, 10, 10], [5, 5, 0, 10]]
+        self.assertEqual(geometry.find_overlaps(rects), [])
+
+    def test_matches_brute_force(self):
+        generator = random.Random(7)
+        rects = [[generator.randint(0, 500), generator.randint(0, 500), generator.randint(0, 60),
+                  generator.randint(0, 60)] for _ in range(300)]
+        self.assertEqual(geometry.find_overlaps(rects), brute_force_overlaps(rects))
+
+    def test_containments(self):
+        rects = [dict(x=0, y=0, width=100, height=100), dict(x=10, y=10, width=20, height=20),
+                 dict(x=90, y=90, width=20, height=20)]
+        self.assertEqual(geometry.find_containments(rects), [(0, 1)])
+        self.assertEqual(geometry.rects_inside_rect(rects, rects[0]).tolist(), [True, True, False])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import struct
+import unittest
+import zlib
+import numpy as np
+from testing_selenium_extras import images
+
+
+def sample_image(height=37, width=53, channels=4):
+    generator = np.random.RandomState(1)
+    image = np.full((height, width, channels), 240, dtype=np.uint8)
+    image[5:30, 10:40] = generator.randint(0, 256, size=(25, 30, channels))
+    return image
+
+
+class PngTestCase(unittest.TestCase):
+    def test_filter_types_round_trip(self):
+        image = sample_image()
+        for filter_type in range(5):
+            decoded = images.decode_png(images.encode_png(image, filter_type=filter_type))
+            self.assertTrue(np.array_equal(decoded, image), 'filter type {0}'.format(filter_type))
+
+    def test_mixed_filters_round_trip(self):
+        # browsers choose the filter of every scanline, mostly up and Paeth
+        image = sample_image(channels=3)
+        filters = np.random.RandomState(2).randint(0, 5, size=image.shape[0])
+        data = images.encode_png(image, filter_type=filters)
+        self.assertTrue(np.array_equal(images.decode_png(data), image))
+
+    def test_paeth_filtered_rows(self):
+        image = np.array([[10, 20, 30], [40, 35, 200]], dtype=np.uint8)[:, :, np.newaxis]
+        # predictions: none, left, left; up, left, left
+        self.assertEqual(images._filter(image.reshape(2, 3), 4, 1).tolist(), [[10, 10, 10], [30, 251, 165]])
+        self.assertTrue(np.array_equal(images.decode_png(images.encode_png(image, filter_type=4)), image))
+
+    def test_decoding_box(self):
+        image = sample_image()
+        for filter_type in (2, [3, 4] * 18 + [1]):
+            data = images.encode_png(image, filter_type=filter_type)
+            for box in [(10, 5, 20, 15), (-5, 30, 100, 20), (60, 0, 10, 10)]:
+                self.assertTrue(np.array_equal(images.decode_png(data, box), images.crop(image, box)))
+
+    def test_invalid_filter_type(self):
+        self.assertRaises(ValueError, images.encode_png, sample_image(), filter_type=5)
+        header = struct.pack('>IIBBBBB', 2, 1, 8, 0, 0, 0, 0)
+        data = images._SIGNATURE + images._chunk(b'IHDR', header) + \
+            images._chunk(b'IDAT', zlib.compress(b'\x05\x01\x02')) + images._chunk(b'IEND', b'')
+        self.assertRaises(ValueError, images.decode_png, data)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+from unittest import mock
+from testing_selenium_extras.journal import (
+    AssertionJournal, JournalingAssertionMixin, read_journal, summarize, PASSED, FAILED)
+
+
+class StubDriver(object):
+    title = 'Stack Overflow'
+    current_url = 'http://stackoverflow.com/#questions'
+
+
+class AssertionJournalTestCase(JournalingAssertionMixin, unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'journal.jsonl')
+        self.journal = AssertionJournal(self.path, batch_size=10, flush_interval=60)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def test_records_are_written_in_batches(self):
+        driver = StubDriver()
+        for _ in range(9):
+            self.assert_document_title_equal(driver, 'Stack Overflow')
+        self.assertFalse(os.path.exists(self.path))
+        self.assertRaises(AssertionError, self.assert_urlhash_equal, driver, 'answers')
+        records = list(read_journal([self.path]))
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[0]['caller'], 'assert_document_title_equal')
+        self.assertEqual(records[0]['outcome'], PASSED)
+        self.assertEqual(records[-1]['outcome'], FAILED)
+        self.assertEqual(records[-1]['params'], dict(actual='questions', expected='answers'))
+        self.assertGreaterEqual(records[-1]['duration'], 0)
+
+    def test_records_are_flushed_by_timer(self):
+        journal = AssertionJournal(self.path, flush_interval=0.05)
+        journal.record('assert_title', PASSED, {})
+        self.assertFalse(os.path.exists(self.path))
+        deadline = time.time() + 5
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([record['caller'] for record in read_journal([self.path])], ['assert_title'])
+        journal.close()
+
+    def test_single_timer_per_journal(self):
+        with mock.patch('threading.Timer', wraps=threading.Timer) as timer_class:
+            for _ in range(35):
+                self.journal.record('assert_title', PASSED, {})
+        self.assertEqual(len(list(read_journal([self.path]))), 30)
+        self.assertEqual(timer_class.call_count, 1)
+        self.journal.close()
+        self.assertEqual(len(list(read_journal([self.path]))), 35)
+        self.assertIsNone(self.journal._timer)
+
+    def test_unreferenced_journal_is_collected_and_flushed(self):
+        journal = AssertionJournal(self.path)
+        journal.record('assert_title', PASSED, {})
+        reference = weakref.ref(journal)
+        del journal
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertEqual(len(list(read_journal([self.path]))), 1)
+
+    def test_concurrent_writers_and_summary(self):
+        other = AssertionJournal(self.path, batch_size=7)
+        driver = StubDriver()
+
+        def work(journal):
+            for _ in range(50):
+                journal.record('assert_document_title_equal', PASSED, dict(title=driver.title), 0.001)
+            journal.record('assert_urlhash_equal', FAILED, dict(driver=driver), 0.003)
+
+        threads = [threading.Thread(target=work, args=(journal,)) for journal in (self.journal, other) * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.journal.close()
+        other.close()
+        summary = summarize(read_journal([self.path]))
+        self.assertEqual(summary['total']['count'], 204)
+        self.assertEqual(summary['total']['failed'], 4)
+        self.assertEqual(summary['callers']['assert_urlhash_equal']['p95'], 0.003)
+        self.assertEqual(summary['callers']['assert_document_title_equal']['passed'], 200)
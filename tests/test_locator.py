@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from selenium.common.exceptions import NoSuchElementException
+from testing_selenium_extras.locator import Locator
+
+
+class ScriptDriver(object):
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.result
+
+
+class LocatorTestCase(unittest.TestCase):
+    def test_chain_resolved_with_single_call(self):
+        driver = ScriptDriver(['row'])
+        locator = Locator.by_css('table').children('tbody').find('tr').filter('.error').last()
+        self.assertEqual(locator.find_element(driver), 'row')
+        self.assertEqual(len(driver.calls), 1)
+        self.assertEqual(driver.calls[0][1], (None, 'table', 'tbody', 'tr', '.error', -1))
+
+    def test_plans_memoized_by_chain_shape(self):
+        first, _ = Locator.by_css('a').parent().compile()
+        second, arguments = Locator.by_name('q').parent().compile()
+        self.assertIs(first, second)
+        self.assertEqual(arguments, ['[name="q"]', None])
+
+    def test_bound_locator(self):
+        driver = ScriptDriver([])
+        locator = Locator.by_link_text('Questions').bind(driver)
+        self.assertRaises(NoSuchElementException, locator.find_element)
+        self.assertRaises(TypeError, Locator.by_id('x').find_elements)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from testing_selenium_extras import utils
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.memoize import DomVersion, MemoizedElement
+
+URL = 'http://example.com/'
+
+HTML = '''
+<html>
+<body>
+<a id="logo" class="logo main" href="/" style="color: red" data-rect="10,10,150,30">Logo</a>
+<a id="help" href="/help">Help</a>
+</body>
+</html>
+'''
+
+# script emulated by the fake driver as a DOM mutation
+MUTATE_SCRIPT = 'document.body.className = "changed";'
+
+
+def mutate(executor):
+    executor.dom_version += 1
+
+
+class MemoizedElementTestCase(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_fake_driver({URL: HTML}, scripts={MUTATE_SCRIPT: mutate})
+        self.driver.get(URL)
+        self.executor = self.driver.command_executor
+        self.element = MemoizedElement(self.driver.find_element_by_id('logo'))
+        self.executor.reset_counts()
+
+    def test_unchanged_dom_hits_cache(self):
+        self.assertEqual(utils.get_css_class_list(self.element), ['logo', 'main'])
+        self.assertEqual(self.executor.round_trips, 1)
+        AssertionMixin().assert_element_css_class_contains(self.element, 'logo')
+        self.assertEqual(self.element.value_of_css_property('color'), 'red')
+        self.assertEqual(self.element.rect['width'], 150)
+        self.assertEqual(self.element.size['height'], 30)
+        self.assertEqual((self.element.hits, self.element.misses), (2, 3))
+        # a read per miss and a version check per hit
+        self.assertEqual(self.executor.round_trips, 5)
+
+    def test_read_only_commands_keep_version(self):
+        self.element = MemoizedElement(self.element.element, DomVersion(self.driver, max_age=60))
+        self.assertEqual(self.element.text, 'Logo')
+        self.assertEqual(self.driver.title, '')
+        self.driver.find_element_by_id('help')
+        self.assertEqual(self.element.text, 'Logo')
+        self.assertEqual((self.element.hits, self.element.misses), (1, 1))
+        self.assertEqual(self.executor.round_trips, 3)
+
+    def test_mutation_invalidates_values(self):
+        self.element = MemoizedElement(self.element.element, DomVersion(self.driver, max_age=60))
+        self.assertEqual(self.element.text, 'Logo')
+        self.driver.execute_script(MUTATE_SCRIPT)
+        self.assertEqual(self.element.text, 'Logo')
+        self.assertEqual((self.element.hits, self.element.misses), (0, 2))
+        self.assertEqual(self.executor.round_trips, 4)
+
+    def test_mutation_by_page_noticed(self):
+        self.assertEqual(self.element.text, 'Logo')
+        self.executor.dom_version += 1
+        self.assertEqual(self.element.text, 'Logo')
+        self.assertEqual((self.element.hits, self.element.misses), (0, 2))
+        self.assertEqual(self.executor.round_trips, 3)
+
+    def test_mutation_by_page_noticed_after_max_age(self):
+        version = DomVersion(self.driver, max_age=60)
+        element = MemoizedElement(self.element.element, version)
+        self.assertEqual(element.text, 'Logo')
+        self.executor.dom_version += 1
+        self.assertEqual(element.text, 'Logo')
+        self.assertEqual((element.hits, element.misses), (1, 1))
+        version.max_age = 0
+        self.assertEqual(element.text, 'Logo')
+        self.assertEqual((element.hits, element.misses), (1, 2))
+
+    def test_tag_name_is_read_once(self):
+        self.assertEqual(self.element.tag_name, 'a')
+        self.executor.dom_version += 1
+        self.assertEqual(self.element.tag_name, 'a')
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_pinned_version(self):
+        version = DomVersion(self.driver)
+        logo = MemoizedElement(self.element.element, version)
+        help_link = MemoizedElement(self.driver.find_element_by_id('help'), version)
+        self.executor.reset_counts()
+        with version.pinned():
+            for _ in range(3):
+                self.assertEqual(logo.get_attribute('href'), '/')
+                self.assertEqual(help_link.text, 'Help')
+        self.assertEqual(self.executor.round_trips, 3)
+        self.assertFalse(version.is_pinned)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import random
+import threading
+import unittest
+import weakref
+from testing_selenium_extras.checks import PageCheck
+from testing_selenium_extras.monitor import LatencyHistogram, Monitor
+from testing_selenium_extras.page_objects import PageObject
+from testing_selenium_extras.pool import DriverPool
+from tests.test_pool import StubDriver
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram(significant_figures=2)
+        size = len(histogram._counts)
+        # 1, 2, ..., 2000 ms in random order; the value of rank ceil(fraction * 2000) is known
+        latencies = [ms / 1000.0 for ms in range(1, 2001)]
+        random.Random(42).shuffle(latencies)
+        for latency in latencies:
+            histogram.record(latency)
+        for fraction, expected in ((0.5, 1.0), (0.9, 1.8), (0.99, 1.98), (0.0005, 0.001)):
+            self.assertAlmostEqual(histogram.percentile(fraction), expected,
+                                   delta=max(0.01 * expected, histogram.resolution))
+        self.assertEqual(len(histogram._counts), size)
+        self.assertEqual(histogram.max, 2.0)
+
+    def test_percentile_of_odd_number_of_latencies(self):
+        histogram = LatencyHistogram()
+        for latency in (0.5, 0.1, 0.4, 0.2, 0.3):
+            histogram.record(latency)
+        # ranks ceil(fraction * 5): 0.5 -> 3, 0.3 -> 2, 0.9 -> 5; buckets are 1% wide
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.3, delta=0.003)
+        self.assertAlmostEqual(histogram.percentile(0.3), 0.2, delta=0.002)
+        self.assertEqual(histogram.percentile(0.9), 0.5)
+
+    def test_latencies_above_range_clamped(self):
+        histogram = LatencyHistogram(highest=1.0)
+        histogram.record(5.0)
+        histogram.record(0.5)
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(histogram.percentile(1.0), 5.0)
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.1)
+        second.record(0.3)
+        first.merge(second)
+        self.assertEqual((first.count, first.min, first.max), (2, 0.1, 0.3))
+        self.assertRaises(ValueError, first.merge, LatencyHistogram(significant_figures=3))
+
+
+class MonitorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = DriverPool(StubDriver, max_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_checks_repeated_on_interval(self):
+        runs = []
+
+        def callback(monitored, result):
+            runs.append(monitored.check.name)
+            if runs.count('fast') == 5:
+                monitor.stop()
+
+        monitor = Monitor(self.pool, callback=callback)
+        fast = monitor.schedule(PageCheck('http://example.com/fast', PageObject, name='fast'), 0.01)
+        failing = monitor.schedule(
+            PageCheck('http://example.com/slow', PageObject, [lambda page: 1 / 0], name='failing'), 10)
+        monitor.run(duration=5)
+        self.assertEqual(fast.runs, 5)
+        self.assertEqual(fast.histogram.count, 5)
+        self.assertEqual((failing.runs, failing.failures), (1, 1))
+        self.assertTrue(failing.last_error.startswith('ZeroDivisionError'))
+        self.assertLessEqual(self.pool.size, 2)
+        self.assertEqual([stats['name'] for stats in monitor.summary()], ['fast', 'failing'])
+
+    def test_run_after_stop(self):
+        def callback(monitored, result):
+            if monitored.runs == 5:
+                monitor.stop()
+
+        monitor = Monitor(self.pool, callback=callback)
+        check = monitor.schedule(PageCheck('http://example.com/', PageObject), 0.01)
+        monitor.run(duration=0.02)
+        self.assertLess(check.runs, 5)
+        monitor.stop()
+        monitor.run(duration=5)
+        self.assertEqual(check.runs, 5)
+
+    def test_page_objects_freed_without_garbage_collection(self):
+        pages = []
+
+        def check(page):
+            page.element_cache.get('key', lambda: object())
+            pages.append(weakref.ref(page))
+
+        monitor = Monitor(self.pool)
+        monitor.schedule(PageCheck('http://example.com/', PageObject, [check]), 0.01)
+        gc.disable()
+        try:
+            threading.Timer(0.1, monitor.stop).start()
+            monitor.run()
+            self.assertTrue(pages)
+            self.assertTrue(all(page() is None for page in pages))
+        finally:
+            gc.enable()
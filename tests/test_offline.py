@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from selenium.common.exceptions import NoSuchElementException
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.offline import DocumentSnapshot
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement, PageElements
+
+URL = 'http://example.com/questions/'
+
+HTML = '''
+<html>
+<head><title>All Questions</title></head>
+<body>
+<header>
+    <a class="logo main" href="/" data-rect="10,10,150,30">Logo</a>
+    <input name="q" type="text" value="selenium" disabled>
+</header>
+<ul id="questions">
+    <li><a href="1">First</a></li>
+    <li><a href="2">Second</a></li>
+    <li style="display: none"><a href="3">Third</a></li>
+</ul>
+<form><input type="checkbox" name="subscribe" checked></form>
+</body>
+</html>
+'''
+
+TABLES_HTML = '''
+<html>
+<body>
+<table><tr><td>a1</td></tr><tr><td>a2</td></tr></table>
+<table><tr><td>b1</td></tr><tr><td>b2</td></tr></table>
+</body>
+</html>
+'''
+
+
+class Header(PageComponent):
+    logo = PageElement('.logo')
+    search_field = PageElement('[name=q]')
+
+
+class QuestionsPage(PageObject):
+    header = Header('header')
+    questions = PageElements('#questions li')
+    subscribe = PageElement('[name=subscribe]')
+
+
+class DocumentSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_fake_driver({URL: HTML, 'http://example.com/tables/': TABLES_HTML})
+        self.driver.get(URL)
+        self.executor = self.driver.command_executor
+        self.executor.reset_counts()
+        self.assertions = AssertionMixin()
+
+    def test_static_assertions_without_round_trips(self):
+        page = QuestionsPage(self.driver).snapshot()
+        self.assertEqual(self.executor.round_trips, 1)
+        page.wait_to_load(batched=True)
+        page.wait_to_load()
+        logo = page.header.logo
+        self.assertions.assert_document_title_equal(page.driver, 'All Questions')
+        self.assertions.assert_urlhash_equal(page.driver, '')
+        self.assertions.assert_element_tag_name_equal(logo, 'a')
+        self.assertions.assert_element_text_equal(logo, 'Logo')
+        self.assertions.assert_element_attr_equal(logo, 'href', 'http://example.com/')
+        self.assertions.assert_element_css_class_contains(logo, 'main')
+        self.assertions.assert_element_child_of(logo, page.driver.find_element_by_tag_name('header'))
+        self.assertions.assert_element_disabled(page.header.search_field)
+        self.assertions.assert_element_selected(page.subscribe)
+        self.assertEqual(page.header.search_field.get_attribute('value'), 'selenium')
+        self.assertEqual(page.header.search_field.get_attribute('disabled'), 'true')
+        self.assertEqual([row.text for row in page.questions], ['First', 'Second', ''])
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_layout_falls_back_to_live_element(self):
+        snapshot = DocumentSnapshot.take(self.driver)
+        logo = snapshot.find_element_by_css_selector('.logo')
+        self.assertions.assert_element_rect_includes_point(logo, (20, 20))
+        self.assertions.assert_element_visible(logo)
+        self.assertEqual(logo.live.get_attribute('class'), 'logo main')
+        self.assertEqual(self.executor.command_counts['findElement'], 1)
+
+    def test_missing_element(self):
+        snapshot = DocumentSnapshot.take(self.driver)
+        self.assertRaises(NoSuchElementException, snapshot.find_element_by_id, 'missing')
+        self.assertEqual(snapshot.find_elements_by_xpath('//li/a')[1].text, 'Second')
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_text_keeps_line_breaks_between_blocks(self):
+        snapshot = DocumentSnapshot.take(self.driver)
+        questions = snapshot.find_element_by_id('questions')
+        self.assertEqual(questions.text, 'First\nSecond')
+        self.assertEqual(questions.live.text, questions.text)
+        self.assertEqual(snapshot.find_element_by_tag_name('header').text, 'Logo')
+
+    def test_positional_xpath_predicate_per_parent(self):
+        self.driver.get('http://example.com/tables/')
+        snapshot = DocumentSnapshot.take(self.driver)
+        self.assertEqual([row.text for row in snapshot.find_elements_by_xpath('//tr[1]')], ['a1', 'b1'])
+        self.assertEqual([row.text for row in snapshot.find_elements_by_xpath('//table/tr[2]')], ['a2', 'b2'])
+        self.assertEqual([cell.text for cell in snapshot.find_elements_by_xpath('//td')], ['a1', 'a2', 'b1', 'b2'])
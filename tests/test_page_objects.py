@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement
+
+
+class Header(PageComponent):
+    logo = PageElement('.logo')
+    search_field = PageElement('[name=q]')
+
+
+class SamplePage(PageObject):
+    header = Header('header')
+    footer = PageElement('#footer')
+
+
+class ExtendedPage(SamplePage):
+    footer = None
+    sidebar = PageElement('#sidebar')
+
+
+class Toolbar(PageComponent):
+    buttons = PageElement('button, a.button')
+
+
+class ToolbarPage(PageObject):
+    header = Header('header')
+    toolbar = Toolbar('#top, #bottom')
+
+
+class FindDriver(object):
+    '''
+    Driver stub returning the selectors or selector chains elements are looked up by.
+    '''
+
+    def __init__(self):
+        self.selectors = []
+
+    def find_element_by_css_selector(self, selector):
+        self.selectors.append(selector)
+        return selector
+
+    def execute_script(self, script, chain):
+        self.selectors.append(chain)
+        return chain
+
+
+class ProbeDriver(object):
+    '''
+    Driver stub answering load probes with a fixed sequence of results.
+    '''
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(args)
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+class BatchedLoadTestCase(unittest.TestCase):
+    def test_single_script_call_per_poll(self):
+        driver = ProbeDriver(['footer'], [])
+        SamplePage.load(driver, batched=True, poll_frequency=0)
+        self.assertEqual(len(driver.scripts), 2)
+        probe = sorted(driver.scripts[0][0])
+        self.assertEqual(probe, [
+            ['footer', '#footer', None],
+            ['header', 'header', [['header.logo', '.logo', None], ['header.search_field', '[name=q]', None]]],
+        ])
+
+    def test_timeout_reports_missing_elements(self):
+        driver = ProbeDriver(['header.logo'])
+        with self.assertRaises(TimeoutException) as context:
+            SamplePage.load(driver, batched=True, timeout=0, poll_frequency=0)
+        self.assertIn('header.logo', context.exception.msg)
+
+    def test_component_probed_from_its_selector_chain(self):
+        driver = ProbeDriver([])
+        SamplePage(driver).header.wait_to_load(batched=True, poll_frequency=0)
+        self.assertEqual(driver.scripts, [([
+            ['header', 'header', [['header.logo', '.logo', None], ['header.search_field', '[name=q]', None]]],
+        ],)])
+
+
+class DescriptorRegistryTestCase(unittest.TestCase):
+    def test_inherited_descriptors(self):
+        names = [name for name, _ in ExtendedPage.get_descriptors()]
+        self.assertEqual(sorted(names), ['header', 'sidebar'])
+        self.assertEqual(ExtendedPage.sidebar.name, 'sidebar')
+
+    def test_component_descriptors(self):
+        self.assertEqual([name for name, _ in Header.get_descriptors()], ['logo', 'search_field'])
+
+
+class ScopedSelectorTestCase(unittest.TestCase):
+    def test_nested_element_found_with_single_lookup(self):
+        driver = FindDriver()
+        page = ToolbarPage(driver)
+        self.assertEqual(page.header.search_field, ['header', '[name=q]'])
+        self.assertEqual(page.header.element, 'header')
+        self.assertEqual(driver.selectors, [['header', '[name=q]'], 'header'])
+
+    def test_selector_lists_are_not_expanded(self):
+        self.assertEqual(ToolbarPage(FindDriver()).toolbar.buttons, ['#top, #bottom', 'button, a.button'])
+
+    def test_cached_elements(self):
+        driver = FindDriver()
+        page = ToolbarPage(driver, cache_elements=True)
+        page.header.logo
+        page.header.logo
+        self.assertEqual(driver.selectors, [['header', '.logo']])
+        self.assertEqual(page.element_cache.hits, 1)
+
+
+class ComponentScopeTestCase(unittest.TestCase):
+    '''
+    Elements of a component are looked up inside its first match only, by sequential and
+    batched loads alike.
+    '''
+
+    def create_driver(self, html):
+        driver = create_fake_driver({'http://example.com/': html})
+        driver.get('http://example.com/')
+        return driver
+
+    def test_element_of_first_match(self):
+        driver = self.create_driver(
+            '<header><a class="logo">First</a><input name="q"></header>'
+            '<header><a class="logo">Second</a><input name="q"></header><div id="footer"></div>')
+        page = SamplePage.load(driver)
+        self.assertEqual(page.header.logo.text, 'First')
+        SamplePage.load(driver, batched=True)
+
+    def test_element_missing_in_first_match(self):
+        driver = self.create_driver(
+            '<header><input name="q"></header>'
+            '<header><a class="logo">Second</a><input name="q"></header><div id="footer"></div>')
+        self.assertRaises(NoSuchElementException, SamplePage.load, driver)
+        with self.assertRaises(TimeoutException) as context:
+            SamplePage.load(driver, batched=True, timeout=0, poll_frequency=0)
+        self.assertIn('header.logo', context.exception.msg)
+
+    def test_component_batched_load(self):
+        driver = self.create_driver('<header><a class="logo">First</a><input name="q"></header>')
+        SamplePage(driver).header.wait_to_load(batched=True, timeout=0, poll_frequency=0)
+
+    def test_component_batched_load_in_first_match(self):
+        driver = self.create_driver(
+            '<header><input name="q"></header>'
+            '<header><a class="logo">Second</a><input name="q"></header>')
+        with self.assertRaises(TimeoutException) as context:
+            SamplePage(driver).header.wait_to_load(batched=True, timeout=0, poll_frequency=0)
+        self.assertEqual(context.exception.msg, 'Elements not found: header.logo')
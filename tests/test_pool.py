@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from testing_selenium_extras.checks import (
+    DurationHistory, PageCheck, PageCheckExecutor, ScheduledCheckExecutor, plan_checks)
+from testing_selenium_extras.page_objects import PageObject
+from testing_selenium_extras.pool import DriverPool
+
+
+class StubDriver(object):
+    def __init__(self):
+        self.urls = []
+        self.quit_called = False
+        self.broken = False
+
+    @property
+    def current_url(self):
+        if self.broken:
+            raise WebDriverException('session deleted')
+        return self.urls[-1] if self.urls else 'about:blank'
+
+    def get(self, url):
+        if self.broken:
+            raise WebDriverException('session deleted')
+        self.urls.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class DriverPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.lock = threading.Lock()
+
+    def factory(self):
+        with self.lock:
+            driver = StubDriver()
+            self.created.append(driver)
+            return driver
+
+    def test_drivers_are_reused_and_recycled(self):
+        pool = DriverPool(self.factory, max_size=1, max_uses=2)
+        for _ in range(3):
+            with pool.session():
+                pass
+        self.assertEqual(len(self.created), 2)
+        self.assertTrue(self.created[0].quit_called)
+
+    def test_pool_is_bounded(self):
+        pool = DriverPool(self.factory, max_size=1)
+        pool.acquire()
+        self.assertRaises(TimeoutException, pool.acquire, timeout=0.01)
+
+    def test_unhealthy_driver_replaced(self):
+        pool = DriverPool(self.factory, max_size=1)
+        driver = pool.acquire()
+        driver.broken = True
+        pool.release(driver, failed=True)
+        self.assertIsNot(pool.acquire(), driver)
+        self.assertTrue(driver.quit_called)
+
+    def test_executor_runs_checks_concurrently(self):
+        pool = DriverPool(self.factory, max_size=3)
+        checks = [
+            PageCheck('http://example.com/{0}'.format(i), PageObject, [lambda page: page.driver.current_url])
+            for i in range(9)
+        ]
+        results = PageCheckExecutor(pool).run(checks)
+        self.assertEqual([r.values[0] for r in results], [c.url for c in checks])
+        self.assertTrue(all(r.passed for r in results))
+        self.assertLessEqual(len(self.created), 3)
+        pool.close()
+        self.assertTrue(all(d.quit_called for d in self.created))
+
+    def test_executor_releases_driver_when_check_raises(self):
+        class InterruptedCheck(PageCheck):
+            def run(self, driver):
+                raise KeyboardInterrupt()
+
+        pool = DriverPool(self.factory, max_size=1)
+        executor = PageCheckExecutor(pool)
+        self.assertRaises(KeyboardInterrupt, executor.run_check, InterruptedCheck('http://example.com/', PageObject))
+        # released, and checked before reuse
+        self.assertIs(pool.acquire(timeout=0.01), self.created[0])
+
+
+class ScheduledCheckExecutorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'durations.json')
+        self.pool = DriverPool(StubDriver, max_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def sleeping_check(self, name, seconds):
+        return PageCheck('http://example.com/' + name, PageObject, [lambda page: time.sleep(seconds)], name=name)
+
+    def test_longest_checks_planned_first(self):
+        queues = plan_checks(['a', 'b', 'c', 'd', 'e'], [1, 5, 3, 3, 2], 2)
+        self.assertEqual(queues, [[1, 4], [2, 3, 0]])
+
+    def test_history_persisted(self):
+        history = DurationHistory(self.path)
+        checks = [self.sleeping_check('a', 0.02), self.sleeping_check('b', 0)]
+        results = ScheduledCheckExecutor(self.pool, history).run(checks)
+        self.assertTrue(all(r.passed for r in results))
+        loaded = DurationHistory(self.path)
+        self.assertEqual(sorted(loaded.durations), ['a', 'b'])
+        self.assertGreater(loaded.estimate(checks[0]), loaded.estimate(checks[1]))
+        self.assertEqual(loaded.estimate(self.sleeping_check('c', 0)), sum(loaded.durations.values()) / 2)
+
+    def test_concurrent_saves(self):
+        histories = [DurationHistory(self.path) for _ in range(4)]
+        for index, history in enumerate(histories):
+            history.durations = dict(check=float(index))
+        threads = [threading.Thread(target=history.save) for history in histories for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIn(DurationHistory(self.path).durations['check'], [0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(os.listdir(self.directory), ['durations.json'])
+
+    def test_idle_worker_steals_work(self):
+        history = DurationHistory()
+        # estimates make one worker get all the short checks, which actually take longer
+        history.durations = dict(long=1.0, short0=0.2, short1=0.2, short2=0.2, short3=0.2)
+        checks = [self.sleeping_check('long', 0)] + [
+            self.sleeping_check('short{0}'.format(i), 0.05) for i in range(4)]
+        executor = ScheduledCheckExecutor(self.pool, history)
+        results = executor.run(checks)
+        self.assertEqual([r.check for r in results], checks)
+        self.assertGreater(executor.steals, 0)
+
+    def test_driver_creation_error_raised(self):
+        def factory():
+            raise RuntimeError('browser did not start')
+
+        pool = DriverPool(factory, max_size=2)
+        checks = [self.sleeping_check(name, 0) for name in 'abc']
+        self.assertRaises(RuntimeError, ScheduledCheckExecutor(pool).run, checks)
+
+    def test_driver_released_as_failed_when_check_raises(self):
+        class InterruptedCheck(PageCheck):
+            def run(self, driver):
+                raise KeyboardInterrupt()
+
+        pool = DriverPool(StubDriver, max_size=1)
+        checks = [InterruptedCheck('http://example.com/', PageObject, name='interrupted')]
+        self.assertRaises(KeyboardInterrupt, ScheduledCheckExecutor(pool).run, checks)
+        self.assertEqual(len(pool._suspect), 1)
+        pool.close()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import io
+import itertools
+import json
+import unittest
+from unittest import mock
+from selenium.webdriver.remote.webdriver import WebDriver
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras import profiling
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement
+from testing_selenium_extras.profiling import CommandProfiler
+
+
+class StubExecutor(object):
+    '''
+    Command executor answering the few commands needed by the tests.
+    '''
+
+    responses = {
+        'newSession': {'status': 0, 'sessionId': 'session', 'value': {}},
+        'executeScript': {'status': 0, 'value': {'ELEMENT': 'logo'}},
+        'isElementDisplayed': {'status': 0, 'value': True},
+        'get': {'status': 0, 'value': None},
+    }
+
+    def execute(self, command, params):
+        return dict(self.responses[command])
+
+
+class NewElementExecutor(StubExecutor):
+    '''
+    Stub executor returning a new element on every lookup.
+    '''
+
+    def __init__(self):
+        self.elements = itertools.count()
+
+    def execute(self, command, params):
+        if command == 'executeScript':
+            return {'status': 0, 'value': {'ELEMENT': 'logo{0}'.format(next(self.elements))}}
+        return super(NewElementExecutor, self).execute(command, params)
+
+
+class Header(PageComponent):
+    logo = PageElement('.logo')
+
+
+class SamplePage(PageObject):
+    header = Header('header')
+
+
+class CommandProfilerTestCase(unittest.TestCase):
+    def test_commands_attributed_to_descriptor_and_assertion(self):
+        driver = WebDriver(StubExecutor(), desired_capabilities={})
+        profiler = CommandProfiler()
+        profiler.instrument(driver)
+        page = SamplePage(driver)
+        AssertionMixin().assert_element_visible(page.header.logo)
+
+        summary = profiler.summary()
+        self.assertEqual(summary['total']['count'], 2)
+        self.assertEqual(summary['commands']['executeScript']['count'], 1)
+        self.assertEqual(summary['assertions']['assert_element_visible']['count'], 1)
+        self.assertEqual(summary['descriptors']['SamplePage.header.logo']['count'], 2)
+        self.assertIsNone(summary['total']['bytes_received'])
+
+        output = io.StringIO()
+        profiler.export(output)
+        self.assertEqual(json.loads(output.getvalue())['total']['count'], 2)
+
+    def test_payloads_measured_on_request(self):
+        driver = WebDriver(StubExecutor(), desired_capabilities={})
+        profiler = CommandProfiler(measure_payloads=True)
+        profiler.instrument(driver)
+        AssertionMixin().assert_element_visible(SamplePage(driver).header.logo)
+        summary = profiler.summary()
+        self.assertGreater(summary['total']['bytes_sent'], 0)
+        self.assertGreater(summary['total']['bytes_received'], 0)
+
+    def test_payloads_not_serialized_by_default(self):
+        driver = WebDriver(StubExecutor(), desired_capabilities={})
+        CommandProfiler().instrument(driver)
+        with mock.patch.object(profiling, '_payload_size') as payload_size:
+            AssertionMixin().assert_element_visible(SamplePage(driver).header.logo)
+        self.assertFalse(payload_size.called)
+
+    def test_element_owners_bounded_and_forgotten_on_navigation(self):
+        driver = WebDriver(NewElementExecutor(), desired_capabilities={})
+        executor = CommandProfiler(max_element_owners=3).instrument(driver)
+        page = SamplePage(driver)
+        elements = [page.header.logo for _ in range(5)]
+        self.assertEqual(list(executor._element_owners), [element.id for element in elements[2:]])
+        driver.get('http://example.com/')
+        self.assertEqual(len(executor._element_owners), 0)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement
+from testing_selenium_extras.replay import CommandRecorder, ReplayMismatchError, create_replay_driver
+
+URL = 'http://example.com/'
+
+HTML = '''
+<html>
+<head><title>Example</title></head>
+<body>
+<header><a class="logo" href="/">Logo</a><input name="q" disabled></header>
+</body>
+</html>
+'''
+
+
+class Header(PageComponent):
+    logo = PageElement('.logo')
+    search_field = PageElement('[name=q]')
+
+
+class SamplePage(PageObject):
+    header = Header('header')
+
+
+class OtherPage(PageObject):
+    header = Header('#header')
+
+
+def run(driver, page_class=SamplePage):
+    assertions = AssertionMixin()
+    driver.get(URL)
+    page = page_class.load(driver)
+    assertions.assert_document_title_equal(driver, 'Example')
+    assertions.assert_element_text_equal(page.header.logo, 'Logo')
+    assertions.assert_element_disabled(page.header.search_field)
+
+
+class ReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        driver = create_fake_driver({URL: HTML})
+        fp = io.StringIO()
+        recorder = CommandRecorder.install(driver, fp)
+        run(driver)
+        recorder.uninstall(driver)
+        self.recorded = recorder.count
+        self.recording = fp.getvalue()
+
+    def test_replay_serves_recorded_responses(self):
+        driver = create_replay_driver(io.StringIO(self.recording))
+        run(driver)
+        driver.quit()
+        executor = driver.command_executor
+        self.assertTrue(executor.finished)
+        self.assertEqual(executor.mismatches, [])
+        self.assertEqual(executor.position, self.recorded)
+
+    def test_failing_assertion_is_reproduced(self):
+        driver = create_replay_driver(io.StringIO(self.recording))
+        driver.get(URL)
+        SamplePage.load(driver)
+        self.assertRaises(AssertionError, AssertionMixin().assert_document_title_equal, driver, 'Other')
+
+    def test_mismatch_is_reported(self):
+        driver = create_replay_driver(io.StringIO(self.recording))
+        self.assertRaises(ReplayMismatchError, run, driver, OtherPage)
+        report = driver.command_executor.report()
+        self.assertIn('expected executeScript {"args": [["header", ".logo"]]', report)
+        self.assertIn('got executeScript {"args": [["#header", ".logo"]]', report)
+        self.assertIn('recorded commands were not replayed', report)
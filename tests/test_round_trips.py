@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+'''
+Round-trip budgets of page objects, assertions and wait conditions, measured with the fake driver.
+'''
+
+import unittest
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.page_objects import PageObject, PageComponent, PageElement, PageElements
+from testing_selenium_extras.snapshot import ElementSnapshot
+from testing_selenium_extras import waits
+
+URL = 'http://stackoverflow.com/'
+
+HTML = '''
+<html>
+<head><title>Stack Overflow</title></head>
+<body>
+<header class="so-header">
+    <a class="-logo" href="/" data-rect="10,10,150,30">Stack Overflow</a>
+    <nav><a id="nav-questions" class="nav js-gps-track" href="/questions" style="color: red">Questions</a></nav>
+    <input name="q" type="text">
+</header>
+<div id="content"><span class="hidden" style="display: none">hidden</span></div>
+<div id="footer"><p id="copyright">&copy; Stack Exchange</p></div>
+</body>
+</html>
+'''
+
+
+class Header(PageComponent):
+    logo = PageElement('.-logo')
+    link_questions = PageElement('#nav-questions')
+    search_field = PageElement('[name=q]')
+
+
+class Footer(PageComponent):
+    copyright_label = PageElement('#copyright')
+
+
+class StackOverflowPage(PageObject):
+    header = Header('header.so-header')
+    footer = Footer('#footer')
+
+
+class RoundTripTestCase(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_fake_driver({URL: HTML})
+        self.driver.get(URL)
+        self.executor = self.driver.command_executor
+        self.executor.reset_counts()
+        self.assertions = AssertionMixin()
+
+    def test_sequential_load(self):
+        StackOverflowPage.load(self.driver)
+        self.assertEqual(self.executor.command_counts['executeScript'], 4)
+        self.assertEqual(self.executor.round_trips, 4)
+
+    def test_batched_load(self):
+        StackOverflowPage.load(self.driver, batched=True)
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_nested_element_single_lookup(self):
+        page = StackOverflowPage(self.driver)
+        self.assertEqual(page.header.link_questions.text, 'Questions')
+        self.assertEqual(self.executor.round_trips, 2)
+
+    def test_cached_elements(self):
+        page = StackOverflowPage(self.driver, cache_elements=True)
+        for _ in range(5):
+            page.header.link_questions
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_stale_cached_element_is_found_again(self):
+        page = StackOverflowPage(self.driver, cache_elements=True)
+        link = page.header.link_questions
+        self.driver.get(URL)
+        self.assertEqual(link.tag_name, 'a')
+        self.assertEqual(page.element_cache.stale, 1)
+
+    def test_element_assertions(self):
+        link = StackOverflowPage(self.driver).header.link_questions
+        self.executor.reset_counts()
+        self.assertions.assert_element_visible(link)
+        self.assertions.assert_element_text_equal(link, 'Questions')
+        self.assertions.assert_element_tag_name_equal(link, 'a')
+        self.assertions.assert_element_css_class_contains(link, 'js-gps-track')
+        self.assertions.assert_element_css_property_equal(link, 'color', 'red')
+        self.assertions.assert_element_enabled(link)
+        self.assertEqual(self.executor.round_trips, 6)
+
+    def test_snapshot_assertions(self):
+        link = StackOverflowPage(self.driver).header.link_questions
+        self.executor.reset_counts()
+        self.assertions.assert_element_properties_equal(
+            link, dict(displayed=True, text='Questions', tag_name='a', enabled=True),
+            attributes={'class': 'nav js-gps-track'}, css_properties={'color': 'red'})
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_rect_assertions(self):
+        logo = StackOverflowPage(self.driver).header.logo
+        self.assertions.assert_element_rect_includes_point(logo, (20, 20))
+        snapshot = ElementSnapshot.take(logo, ['rect'])
+        self.assertions.assert_element_rect_not_includes_point(snapshot, (200, 20))
+
+    def test_document_assertions(self):
+        self.assertions.assert_document_title_equal(self.driver, 'Stack Overflow')
+        self.assertions.assert_alert_is_not_present(self.driver)
+        self.assertEqual(self.executor.round_trips, 2)
+
+    def test_wait_conditions(self):
+        self.assertTrue(waits.ajax_call_is_pending()(self.driver))
+        self.assertTrue(waits.animation_is_running()(self.driver))
+        self.assertEqual(self.executor.round_trips, 2)
+
+    def test_missing_element(self):
+        self.assertRaises(NoSuchElementException, self.driver.find_element_by_css_selector, '#missing')
+        element = self.driver.find_element_by_css_selector('#content span')
+        self.assertFalse(element.is_displayed())
+        self.driver.get(URL)
+        self.assertRaises(StaleElementReferenceException, element.is_displayed)
+
+
+RESULTS_URL = 'http://stackoverflow.com/search'
+
+RESULTS_HTML = '''
+<html>
+<body>
+<table id="results">{0}</table>
+</body>
+</html>
+'''.format(''.join(
+    '<tr data-id="{0}" data-rect="0,{1},500,20"><td>Result {0}</td></tr>'.format(i, i * 20) for i in range(1000)))
+
+
+class ResultsTable(PageComponent):
+    rows = PageElements('tr', chunk_size=300)
+
+
+class ResultsPage(PageObject):
+    results = ResultsTable('#results')
+
+
+class CollectionRoundTripTestCase(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_fake_driver({RESULTS_URL: RESULTS_HTML})
+        self.driver.get(RESULTS_URL)
+        self.executor = self.driver.command_executor
+        self.executor.reset_counts()
+
+    def test_batched_load_skips_collections(self):
+        ResultsPage.load(self.driver, batched=True)
+        ResultsPage.load(self.driver)
+        self.assertEqual(self.executor.command_counts['executeScript'], 1)
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_extract_columns(self):
+        columns = ResultsPage(self.driver).results.rows.extract(['text', 'rect'], attributes=['data-id'])
+        self.assertEqual(self.executor.round_trips, 1)
+        self.assertEqual(len(columns['properties']['text']), 1000)
+        self.assertEqual(columns['properties']['text'][999], 'Result 999')
+        self.assertEqual(columns['properties']['rect'][1], [0, 20, 500, 20])
+        self.assertEqual(columns['attributes']['data-id'][:2], ['0', '1'])
+
+    def test_layout_assertions(self):
+        page = ResultsPage(self.driver)
+        assertions = AssertionMixin()
+        assertions.assert_elements_not_overlapping(page.results.rows)
+        self.assertEqual(self.executor.round_trips, 1)
+        assertions.assert_elements_inside_element(page.results.rows[:1], ElementSnapshot.take(page.results.rows[0]))
+        self.assertRaises(AssertionError, assertions.assert_elements_inside_element, page.results.rows[:3],
+                          page.results.rows[0])
+
+    def test_chunked_iteration(self):
+        rows = ResultsPage(self.driver).results.rows
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(sum(1 for _ in rows), 1000)
+        self.assertEqual(self.executor.round_trips, 4)
+
+    def test_indexing(self):
+        rows = ResultsPage(self.driver).results.rows
+        self.assertEqual(rows[-1].get_attribute('data-id'), '999')
+        self.assertEqual([row.get_attribute('data-id') for row in rows[301:303]], ['301', '302'])
+        self.assertRaises(IndexError, rows.__getitem__, 1000)
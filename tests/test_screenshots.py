@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from testing_selenium_extras import images
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.screenshots import ScreenshotOnFailureMixin, ScreenshotWriter
+
+URL = 'http://example.com/'
+
+HTML = '''
+<html>
+<head><title>Example</title></head>
+<body><a class="logo" href="/" data-rect="10,20,150,30">Logo</a></body>
+</html>
+'''
+
+
+class BlockedScreenshotWriter(ScreenshotWriter):
+    def __init__(self, *args, **kwargs):
+        super(BlockedScreenshotWriter, self).__init__(*args, **kwargs)
+        self.unblocked = threading.Event()
+
+    def _write(self, *args):
+        self.unblocked.wait()
+        super(BlockedScreenshotWriter, self)._write(*args)
+
+
+class ScreenshotOnFailureTestCase(ScreenshotOnFailureMixin, unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+        self.directory = tempfile.mkdtemp()
+        self.screenshot_writer = ScreenshotWriter(self.directory)
+        self.driver = create_fake_driver({URL: HTML})
+        self.driver.get(URL)
+
+    def tearDown(self):
+        self.screenshot_writer.close()
+        shutil.rmtree(self.directory)
+
+    def test_element_failure_is_cropped(self):
+        logo = self.driver.find_element_by_css_selector('.logo')
+        self.assertRaises(AssertionError, self.assert_element_text_equal, logo, 'Other')
+        self.screenshot_writer.flush()
+        path, = self.screenshot_writer.written
+        self.assertIn('test_element_failure_is_cropped-assert_element_text_equal', path)
+        with open(path, 'rb') as fp:
+            self.assertEqual(images.decode_png(fp.read()).shape, (30, 150, 3))
+
+    def test_document_failure_takes_whole_screenshot(self):
+        self.assertRaises(AssertionError, self.assert_document_title_equal, self.driver, 'Other')
+        self.screenshot_writer.close()
+        path, = self.screenshot_writer.written
+        with open(path, 'rb') as fp:
+            self.assertEqual(images.decode_png(fp.read()).shape, (600, 800, 3))
+
+    def test_success_takes_no_screenshot(self):
+        self.assert_document_title_equal(self.driver, 'Example')
+        self.screenshot_writer.flush()
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class ScreenshotWriterTestCase(unittest.TestCase):
+    def test_full_queue_drops_screenshots_when_not_blocking(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        screenshot = create_fake_driver({}).get_screenshot_as_base64()
+        writer = BlockedScreenshotWriter(directory, max_pending=1, block=False)
+        results = [writer.submit('screenshot-{0}'.format(i), screenshot) for i in range(4)]
+        writer.unblocked.set()
+        writer.close()
+        self.assertGreaterEqual(writer.dropped, 2)
+        self.assertEqual(results.count(False), writer.dropped)
+        self.assertEqual(len(os.listdir(directory)), 4 - writer.dropped)
+
+
+class PngTestCase(unittest.TestCase):
+    def test_round_trip_and_crop(self):
+        image = (np.arange(4 * 6 * 4) % 256).astype(np.uint8).reshape(4, 6, 4)
+        decoded = images.decode_png(images.encode_png(image))
+        self.assertTrue((decoded == image).all())
+        self.assertEqual(images.crop(decoded, (-2, 1, 4, 10)).shape, (3, 2, 4))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import unittest
+from selenium.common.exceptions import TimeoutException
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.timeline import _compile_targets
+from tests.test_page_objects import ProbeDriver, SamplePage, ToolbarPage
+from tests.test_round_trips import HTML, URL, StackOverflowPage
+
+
+class LoadTimelineTestCase(unittest.TestCase):
+    def test_targets_include_nested_elements(self):
+        self.assertEqual(sorted(_compile_targets(ToolbarPage)), [
+            ['header', ['header']],
+            ['header.logo', ['header', '.logo']],
+            ['header.search_field', ['header', '[name=q]']],
+            ['toolbar', ['#top, #bottom']],
+            ['toolbar.buttons', ['#top, #bottom', 'button, a.button']],
+        ])
+
+    def test_timeline_collected_while_polling(self):
+        driver = ProbeDriver(
+            [['footer'], 12.5, {'header': [12.5, True], 'header.logo': [40.0, False],
+                                'header.search_field': [12.5, True]}],
+            [[], 12.5, {'header': [12.5, True], 'header.logo': [40.0, False],
+                        'header.search_field': [12.5, True], 'footer': [85.25, False]}])
+        page = SamplePage.load(driver, timeline=True, poll_frequency=0)
+        self.assertEqual(len(driver.scripts), 2)
+        self.assertEqual(driver.scripts[0][1], driver.scripts[1][1])
+        timeline = page.load_timeline
+        self.assertEqual([entry.name for entry in timeline],
+                         ['header', 'header.search_field', 'header.logo', 'footer'])
+        self.assertEqual(timeline.critical.name, 'footer')
+        self.assertEqual(timeline.duration, 85.25)
+        self.assertIn('85.2 ms  footer', timeline.format())
+        fp = io.StringIO()
+        timeline.export(fp)
+        exported = json.loads(fp.getvalue())
+        self.assertEqual(exported['entries'][0], dict(name='header', appeared=12.5, initial=True))
+
+    def test_timeout_reports_missing_elements(self):
+        driver = ProbeDriver([['footer'], 0, {}])
+        with self.assertRaises(TimeoutException) as context:
+            SamplePage.load(driver, timeline=True, timeout=0, poll_frequency=0)
+        self.assertIn('footer', context.exception.msg)
+        # the observer of the load is disconnected
+        self.assertEqual(driver.scripts[-1], (driver.scripts[0][1],))
+
+    def test_fake_driver(self):
+        driver = create_fake_driver({URL: HTML})
+        driver.get(URL)
+        driver.command_executor.reset_counts()
+        page = StackOverflowPage.load(driver, timeline=True)
+        self.assertEqual(driver.command_executor.round_trips, 1)
+        self.assertTrue(all(entry.initial for entry in page.load_timeline))
+        self.assertIsNone(page.load_timeline.critical)
+        self.assertIsNone(page.load_timeline.duration)
+        self.assertIn('critical=None', repr(page.load_timeline))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from testing_selenium_extras.utils import nearest_rank, percentile
+
+
+class PercentileTestCase(unittest.TestCase):
+    def test_odd_number_of_values(self):
+        values = [1, 2, 3, 4, 5]
+        # ranks ceil(fraction * 5): 0.5 -> 3 (2.5), 0.3 -> 2 (1.5), 0.9 -> 5 (4.5), 0.2 -> 1
+        self.assertEqual(percentile(values, 0.5), 3)
+        self.assertEqual(percentile(values, 0.3), 2)
+        self.assertEqual(percentile(values, 0.9), 5)
+        self.assertEqual(percentile(values, 0.2), 1)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 1), 5)
+        self.assertEqual(percentile([10, 20, 30, 40, 50, 60, 70], 0.5), 40)
+        self.assertEqual(percentile([10, 20, 30, 40, 50, 60, 70], 0.95), 70)
+
+    def test_exact_ranks(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.07), 7)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(nearest_rank(0.95, 20), 19)
+
+    def test_no_values(self):
+        self.assertIsNone(percentile([], 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
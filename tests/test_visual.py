@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from testing_selenium_extras import images, visual
+from testing_selenium_extras.assertions import AssertionMixin
+from testing_selenium_extras.fake import create_fake_driver
+from testing_selenium_extras.page_objects import PageComponent, PageElement, PageObject
+from testing_selenium_extras.visual import BaselineStore, compare_images, tile_hashes
+
+URL = 'http://example.com/'
+
+HTML = '''
+<html>
+<head><title>Example</title></head>
+<body>
+<header data-rect="0,0,800,70"><a class="logo" href="/" data-rect="10,20,150,30">Logo</a></header>
+</body>
+</html>
+'''
+
+
+class Header(PageComponent):
+    logo = PageElement('.logo')
+
+
+class HomePage(PageObject):
+    header = Header('header')
+
+
+def sample_image(height=70, width=100, channels=3):
+    return np.random.RandomState(1).randint(0, 256, size=(height, width, channels)).astype(np.uint8)
+
+
+class CompareImagesTestCase(unittest.TestCase):
+    def test_single_value_change_changes_tile_hash(self):
+        image = sample_image()
+        changed = image.copy()
+        changed[40, 70, 1] ^= 1
+        different = tile_hashes(image) != tile_hashes(changed)
+        self.assertEqual(different.shape, (3, 4))
+        self.assertEqual(np.argwhere(different).tolist(), [[1, 2]])
+
+    def test_identical_images_skip_decoding(self):
+        image = sample_image()
+        hashes = tile_hashes(image)
+
+        def expected():
+            raise AssertionError('expected image decoded')
+        diff = compare_images(image, expected, actual_hashes=hashes, expected_hashes=hashes.copy())
+        self.assertEqual(diff, (visual.IDENTICAL, [], 0.0, 0))
+
+    def test_differences_within_tolerance(self):
+        image = sample_image()
+        noisy = image.copy()
+        noisy[:10, :10] = np.clip(noisy[:10, :10].astype(np.int16) + 3, 0, 255)
+        diff = compare_images(noisy, image)
+        self.assertEqual(diff.status, visual.SIMILAR)
+        self.assertEqual(diff.diff_ratio, 0.0)
+        self.assertEqual(diff.max_difference, 3)
+
+    def test_changed_tiles_clipped_to_image(self):
+        image = sample_image()
+        changed = image.copy()
+        changed[65:70, 90:100] = 255 - changed[65:70, 90:100]
+        changed[0, 0] = 255 - changed[0, 0]
+        diff = compare_images(changed, image, pixel_tolerance=0)
+        self.assertEqual(diff.status, visual.DIFFERENT)
+        self.assertEqual(diff.changed_tiles, [(0, 0, 32, 32), (64, 64, 32, 6), (96, 64, 4, 6)])
+        self.assertAlmostEqual(diff.diff_ratio, 51.0 / 7000, delta=1.0 / 7000)
+
+    def test_resized_image(self):
+        diff = compare_images(sample_image(width=90), sample_image())
+        self.assertEqual(diff.status, visual.RESIZED)
+
+
+class BaselineStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+        self.directory = tempfile.mkdtemp()
+        self.store = BaselineStore(os.path.join(self.directory, 'baselines'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_baseline_keeps_tile_hashes(self):
+        image = sample_image()
+        self.store.save('header', image)
+        data, hashes = self.store.load('header')
+        self.assertTrue(np.array_equal(images.decode_png(data), image))
+        self.assertTrue(np.array_equal(hashes, tile_hashes(image)))
+        self.assertIsNone(BaselineStore(self.store.directory, tile_size=16).load('header')[1])
+
+    def test_baseline_created_then_compared(self):
+        image = sample_image()
+        self.assertEqual(self.store.compare('header', image).status, visual.CREATED)
+        self.assertEqual(self.store.compare('header', image).status, visual.IDENTICAL)
+        changed = image.copy()
+        changed[:8, :8] = 0
+        self.assertEqual(self.store.compare('header', changed).status, visual.DIFFERENT)
+        with open(self.store.path('header', '.diff'), 'rb') as fp:
+            highlighted = images.decode_png(fp.read())
+        self.assertEqual(highlighted[0, 0].tolist(), [255, 0, 0])
+        self.assertTrue(os.path.exists(self.store.path('header', '.actual')))
+
+    def test_update_replaces_baseline(self):
+        self.store.update = True
+        self.store.compare('header', sample_image())
+        self.assertEqual(self.store.compare('header', sample_image(width=90)).status, visual.RESIZED)
+        self.assertEqual(self.store.compare('header', sample_image(width=90)).status, visual.IDENTICAL)
+        self.assertFalse(os.path.exists(self.store.path('header', '.actual')))
+
+    def test_compare_without_recording(self):
+        self.assertRaises(IOError, self.store.compare, 'header', sample_image(), record=False)
+
+
+class VisualAssertionsTestCase(AssertionMixin, unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('testing_selenium_extras').addHandler(logging.NullHandler())
+        self.directory = tempfile.mkdtemp()
+        self.visual_baselines = BaselineStore(self.directory)
+        self.driver = create_fake_driver({URL: HTML})
+        self.driver.get(URL)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_component_captured(self):
+        page = HomePage(self.driver)
+        self.assertEqual(visual.capture(page.header).shape, (70, 800, 3))
+        self.assertEqual(visual.capture(page.header.logo).shape, (30, 150, 3))
+        self.assertEqual(self.driver.command_executor.command_counts['elementScreenshot'], 2)
+
+    def test_page_screenshot_cropped_without_element_screenshots(self):
+        screenshot = sample_image(height=600, width=800)
+        executor = self.driver.command_executor
+        executor.screenshot = images.encode_png(screenshot, filter_type=4)
+        # the fake driver then answers element screenshots as an unknown command
+        executor._command_elementScreenshot = None
+        page = HomePage(self.driver)
+        self.assertTrue(np.array_equal(visual.capture(page.header.logo), screenshot[20:50, 10:160]))
+        self.assertTrue(np.array_equal(visual.capture(page.header), screenshot[:70]))
+        self.assertEqual(executor.command_counts['elementScreenshot'], 1)
+        self.assertEqual(executor.command_counts['screenshot'], 2)
+
+    def test_component_visually_equal(self):
+        page = HomePage(self.driver)
+        self.assert_element_visually_equal(page.header, 'header')
+        self.assert_element_visually_equal(page.header, 'header')
+        self.visual_baselines.save('header', np.zeros((70, 800, 3), dtype=np.uint8))
+        self.assertRaises(AssertionError, self.assert_element_visually_equal, page.header, 'header')
+        self.assert_element_visually_not_equal(page.header, 'header')
+
+    def test_element_visually_not_equal(self):
+        logo = self.driver.find_element_by_css_selector('.logo')
+        self.assertRaises(IOError, self.assert_element_visually_not_equal, logo, 'logo')
+        self.assert_element_visually_equal(logo, 'logo')
+        self.assertRaises(AssertionError, self.assert_element_visually_not_equal, logo, 'logo')
+
+    def test_tolerated_fraction_of_differences(self):
+        logo = self.driver.find_element_by_css_selector('.logo')
+        baseline = np.full((30, 150, 3), 255, dtype=np.uint8)
+        baseline[:3, :15] = 0
+        self.visual_baselines.save('logo', baseline)
+        self.assertRaises(AssertionError, self.assert_element_visually_equal, logo, 'logo')
+        self.assert_element_visually_equal(logo, 'logo', max_diff_ratio=0.01)
+
+    def test_baselines_required(self):
+        self.visual_baselines = None
+        logo = self.driver.find_element_by_css_selector('.logo')
+        self.assertRaises(ValueError, self.assert_element_visually_equal, logo, 'logo')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from testing_selenium_extras import waits
+from testing_selenium_extras.fake import create_fake_driver
+
+URL = 'http://example.com/#questions'
+
+HTML = '''
+<html>
+<head><title>All Questions</title></head>
+<body>
+<div id="results" class="loaded">12 results</div>
+<div id="spinner" style="display: none">Loading</div>
+</body>
+</html>
+'''
+
+
+class FakeClock(object):
+    '''
+    Replacement of the time module whose sleep() only advances time() and records the interval.
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class CompositeConditionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_fake_driver({URL: HTML})
+        self.driver.get(URL)
+        self.executor = self.driver.command_executor
+        self.executor.reset_counts()
+
+    def test_conditions_are_evaluated_with_single_script_call(self):
+        condition = waits.all_of(
+            waits.title_equal('All Questions'),
+            waits.urlhash_equal('questions'),
+            waits.element_has_css_class('#results', 'loaded'),
+            waits.element_text_contains('#results', 'results'),
+            waits.none_of(waits.element_is_visible('#spinner'), waits.element_is_present('.error')),
+            expected_conditions.visibility_of_element_located((By.ID, 'results')),
+        )
+        self.assertTrue(condition.compatible)
+        self.assertTrue(condition(self.driver))
+        self.assertFalse(waits.any_of(waits.title_contains('Answers'), waits.element_is_visible('#spinner'))(
+            self.driver))
+        self.assertEqual(self.executor.round_trips, 2)
+
+    def test_other_conditions_are_evaluated_only_when_needed(self):
+        calls = []
+
+        def other(driver):
+            calls.append(driver)
+            return True
+
+        self.assertFalse(waits.all_of(waits.title_equal('Other'), other)(self.driver))
+        self.assertEqual(calls, [])
+        self.assertTrue(waits.all_of(waits.title_equal('All Questions'), other)(self.driver))
+        self.assertFalse(waits.none_of(waits.title_equal('Other'), other)(self.driver))
+        self.assertTrue(waits.any_of(expected_conditions.alert_is_present(), waits.title_equal('All Questions'))(
+            self.driver))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.executor.round_trips, 4)
+
+
+class PageSettlesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.results = [True]
+        self.driver = create_fake_driver({URL: HTML}, scripts={waits._SETTLE_SCRIPT: self.settle})
+        self.driver.get(URL)
+        self.executor = self.driver.command_executor
+        self.executor.reset_counts()
+
+    def settle(self, executor, kind, timeout, quiet_period):
+        self.calls.append((kind, timeout, quiet_period))
+        return self.results.pop(0)
+
+    def test_ajax_call_is_pending(self):
+        self.assertIs(waits.ajax_call_is_pending()(self.driver), True)
+        self.assertEqual(self.calls, [('requests', 10000, 100)])
+        self.assertEqual(self.executor.command_counts['executeAsyncScript'], 1)
+        self.assertEqual(self.executor.round_trips, 1)
+
+    def test_animation_is_running(self):
+        self.results = [False]
+        self.assertIs(waits.animation_is_running(timeout=0.25)(self.driver), False)
+        self.assertEqual(self.calls, [('animations', 250, 0)])
+
+    def test_timeouts_converted_to_milliseconds(self):
+        waits.ajax_call_is_pending(timeout=1.5, quiet_period=0.0125)(self.driver)
+        self.assertEqual(self.calls, [('requests', 1500, 12)])
+        self.assertIsInstance(self.calls[0][1], int)
+
+    def test_wait_until_settled(self):
+        self.results = [False, True]
+        wait = waits.AdaptiveWait(self.driver, timeout=1, initial_poll=0.001)
+        self.assertIs(wait.until(waits.ajax_call_is_pending(timeout=0.1)), True)
+        self.assertEqual(len(self.calls), 2)
+        self.results = [False] * 4
+        wait = waits.AdaptiveWait(self.driver, timeout=1, initial_poll=0.25, max_poll=0.5)
+        with mock.patch.object(waits, 'time', FakeClock()):
+            self.assertRaises(TimeoutException, wait.until, waits.animation_is_running(timeout=0.01))
+        self.assertEqual(wait.polls, 4)
+
+
+class AdaptiveWaitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(waits, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backoff(self):
+        polls = []
+        wait = waits.AdaptiveWait(None, timeout=2, initial_poll=0.25, max_poll=1)
+        self.assertRaises(TimeoutException, wait.until, lambda driver: polls.append(self.clock.now))
+        # intervals double up to max_poll; the last one is cut short by the timeout
+        self.assertEqual(self.clock.sleeps, [0.25, 0.5, 1, 0.25])
+        self.assertEqual(polls, [0, 0.25, 0.75, 1.75, 2])
+        self.assertEqual(wait.polls, 5)
+
+    def test_returns_value(self):
+        values = iter([None, 0, 'ready'])
+        wait = waits.AdaptiveWait(None, timeout=1, initial_poll=0.125)
+        self.assertEqual(wait.until(lambda driver: next(values)), 'ready')
+        self.assertEqual(wait.polls, 3)
+        self.assertEqual(self.clock.sleeps, [0.125, 0.25])
+
+    def test_until_not(self):
+        values = iter([True, True, None])
+        wait = waits.AdaptiveWait(None, timeout=1, initial_poll=0.5, backoff=3)
+        self.assertIsNone(wait.until_not(lambda driver: next(values)))
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])